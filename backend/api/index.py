@@ -11,6 +11,7 @@ print(my_path)
 # sys.exit(0)
 
 import traceback
+import click
 from loguru import logger
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
@@ -273,6 +274,49 @@ def create_app():
         logger.info(f"Generated TypeScript routes at {ts_output_path}")
         logger.info(f"Generated TypeScript language data at {lang_output_path}")
 
+    @app.cli.command("process-sourcefile-jobs")
+    @click.option("--once", is_flag=True, help="Exit when the queue is empty.")
+    @click.option("--max-jobs", type=int, default=None, help="Exit after this many jobs.")
+    @click.option("--worker-id", default=None, help="Defaults to hostname:pid.")
+    def process_sourcefile_jobs_command(once, max_jobs, worker_id):
+        """Run a worker for queued sourcefile processing jobs."""
+        from utils.sourcefile_jobs import run_worker
+
+        jobs_run = run_worker(worker_id=worker_id, once=once, max_jobs=max_jobs)
+        logger.info(f"Processed {jobs_run} sourcefile jobs")
+
+    @app.cli.command("move-audio-to-store")
+    @click.option("--batch-size", type=int, default=None, help="Row ids per query.")
+    @click.option("--limit", type=int, default=None, help="Stop after this many rows.")
+    def move_audio_to_store_command(batch_size, limit):
+        """Move audio bytes out of Postgres into AUDIO_BLOB_STORE (resumable)."""
+        from utils.audio_blob_migration import move_audio_to_store
+
+        kwargs = {"batch_size": batch_size} if batch_size else {}
+        moved = move_audio_to_store(limit=limit, **kwargs)
+        logger.info(f"Moved audio to the blob store: {moved}")
+
+    @app.cli.command("verify-audio-store")
+    def verify_audio_store_command():
+        """Check that every moved audio blob is in the store with the right hash."""
+        from utils.audio_blob_migration import verify_audio_store
+
+        report = verify_audio_store()
+        for table, row_id in report.missing:
+            logger.error(f"Missing blob for {table} {row_id}")
+        for table, row_id in report.corrupt:
+            logger.error(f"Corrupt blob for {table} {row_id}")
+        if not report.ok:
+            raise SystemExit(1)
+
+    @app.cli.command("purge-llm-cache")
+    def purge_llm_cache_command():
+        """Delete expired LLM responses from the database cache tier."""
+        from utils.llm_cache import purge_expired_llm_responses
+
+        deleted = purge_expired_llm_responses()
+        logger.info(f"Purged {deleted} expired LLM responses")
+
     logger.info("Application initialized successfully")
     return app
 
@@ -99,6 +99,9 @@ VALID_SOURCEFILE_TYPES = {
 
 MAX_NUMBER_UPLOAD_FILES = 20  # Maximum number of files that can be uploaded at once
 
+# Maximum phrase surfaces looked up by one batch preview request
+MAX_PHRASE_PREVIEWS_PER_REQUEST = 200
+
 # Maximum length for slugs
 SOURCEDIR_SLUG_MAX_LENGTH = 1024  # Characters allowed in URL slugs
 SOURCEFILE_SLUG_MAX_LENGTH = 1024  # Characters allowed in URL slugs
@@ -127,9 +130,60 @@ SEGMENTATION_PER_LANG_DEFAULTS: dict[str, str] = {
     "th": "pythainlp",  # Prefer PyThaiNLP for Thai when ICU is unavailable
     # Add more language-specific defaults if needed, e.g. "zh": "jieba"
 }
+# segment_many() only spreads a text across a process pool above this size
+SEGMENTATION_PARALLEL_MIN_CHARS: int = 200_000
 
 # Known-word fast path (Aho–Corasick) default. Env RECOGNITION_KNOWN_WORD_SEARCH overrides when provided.
 RECOGNITION_KNOWN_WORD_SEARCH_DEFAULT: bool = True
+# Max compiled known-word automata kept in memory per process (see utils/known_word_automata.py)
+KNOWN_WORD_AUTOMATON_CACHE_SIZE: int = 32
+
+# LLM response cache (see utils/llm_cache.py). TTLs are per prompt template, in
+# seconds; 0 disables caching for that template. Env LLM_CACHE_ENABLED=0 bypasses it.
+LLM_CACHE_DEFAULT_TTL_SECONDS: int = 30 * 24 * 3600
+LLM_CACHE_TTL_SECONDS: dict[str, int] = {
+    "quick_search_for_wordform": 7 * 24 * 3600,
+    "metadata_for_lemma": 30 * 24 * 3600,
+    "metadata_for_lemmas": 30 * 24 * 3600,
+    "extract_tricky_wordforms": 30 * 24 * 3600,
+    "extract_phrases_from_text": 30 * 24 * 3600,
+    "translate_to_english": 90 * 24 * 3600,
+    "extract_text_from_html": 90 * 24 * 3600,
+}
+# Max responses kept in memory per process
+LLM_CACHE_MEMORY_SIZE: int = 256
+
+# Batched lemma metadata generation (see utils/store_utils.generate_lemma_metadata_batch):
+# lemmas per LLM call (bounded by the response token limit), and total attempts per lemma
+LEMMA_METADATA_BATCH_SIZE: int = 5
+LEMMA_METADATA_BATCH_ATTEMPTS: int = 2
+# Worker threads per process for background lemma metadata warmup (Learn summary)
+LEMMA_METADATA_WARMUP_WORKERS: int = 4
+# Most lemmas one request may queue for warmup (the top candidates); the rest
+# get defaults until a later request, so a big page can't flood the pool
+LEMMA_METADATA_WARMUP_MAX_LEMMAS: int = 20
+
+# How long a request waits for another request's identical lemma/wordform
+# generation before giving up (see utils/single_flight.py)
+SINGLE_FLIGHT_TIMEOUT_SECONDS: int = 90
+
+# Background sourcefile processing jobs (see utils/sourcefile_jobs.py).
+# Failed steps are retried up to SOURCEFILE_JOB_MAX_ATTEMPTS times in total,
+# waiting RETRY_BASE * 2^(attempt-1) seconds (capped at RETRY_MAX) in between
+SOURCEFILE_JOB_MAX_ATTEMPTS: int = 3
+SOURCEFILE_JOB_RETRY_BASE_SECONDS: int = 15
+SOURCEFILE_JOB_RETRY_MAX_SECONDS: int = 300
+# A running job whose worker hasn't renewed its lock for this long is presumed
+# lost (crashed/killed worker) and can be claimed again. Workers renew the lock
+# every SOURCEFILE_JOB_HEARTBEAT_SECONDS while a job runs
+SOURCEFILE_JOB_LOCK_TIMEOUT_SECONDS: int = 15 * 60
+SOURCEFILE_JOB_HEARTBEAT_SECONDS: int = 60
+# How long an idle worker sleeps between polls of the job table
+SOURCEFILE_JOB_POLL_SECONDS: float = 2.0
+# On Vercel, a cron request drains the queue (GET /sys/cron/process-sourcefile-jobs).
+# It stops claiming new jobs after this long, leaving room under the function's
+# maxDuration (300s in vercel.json) for the job it's already running
+SOURCEFILE_JOB_CRON_SECONDS: int = 120
 
 # Thai tokenizer engine default for PyThaiNLP when no env PYTHAINLP_ENGINE is provided
 PYTHAINLP_ENGINE_DEFAULT: str = "newmm"
@@ -167,6 +221,17 @@ LEMMA_AUDIO_SAMPLES: int = 3
 # Number of distinct audio samples to store per sentence (server default)
 SENTENCE_AUDIO_SAMPLES: int = 3
 
+# Most ElevenLabs requests in flight at once per process, shared by all
+# requests generating audio variants (each missing voice is one request)
+TTS_MAX_CONCURRENCY: int = 4
+
+# Cache lifetime for audio fetched by variant id (`?variant_id=`). A variant's
+# bytes never change, so these responses are also marked immutable
+AUDIO_VARIANT_CACHE_MAX_AGE_SECONDS: int = 365 * 24 * 3600
+# Row ids per query when moving legacy audio bytes into the blob store
+# (`flask move-audio-to-store`, see utils/audio_blob_migration.py)
+AUDIO_BLOB_MOVE_BATCH_SIZE: int = 100
+
 # Auto-generation policy: public never auto-generates; authenticated may auto-generate 1 sample
 # TODO remove this. we don't ever want to allow non-logged-in users to be able to generate
 PUBLIC_AUTO_GENERATE_SENTENCE_AUDIO_SAMPLES: int = 1
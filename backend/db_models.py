@@ -1,4 +1,5 @@
 from peewee import (
+    Case,
     Model,
     CharField,
     TextField,
@@ -13,15 +14,27 @@ from peewee import (
     ForeignKeyField,
     DeferredForeignKey,
     UUIDField,
+    SQL,
+    EXCLUDED,
+    chunked,
 )
 from playhouse.postgres_ext import JSONField
 from datetime import datetime
-from typing import Optional
+import io
+from typing import BinaryIO, Callable, Iterable, Optional, Sequence
 from slugify import slugify
 
+from utils.blob_store import (
+    DEFAULT_AUDIO_MIME_TYPE,
+    BlobNotFound,
+    StoredBlob,
+    content_hash_of,
+    get_audio_blob_store,
+)
 from utils.db_connection import database
 from config import (
     SOURCEDIR_SLUG_MAX_LENGTH,
+    SOURCEFILE_JOB_MAX_ATTEMPTS,
     SOURCEFILE_SLUG_MAX_LENGTH,
     VALID_SOURCEFILE_TYPES,
 )
@@ -41,13 +54,41 @@ class AuthUser(Model):
         schema = "auth"
 
 
+# (model, lookup field names) -> conflict target fields, or None when the
+# lookup only covers part of a unique index (see BaseModel._conflict_target)
+_CONFLICT_TARGETS: dict[tuple[type, frozenset], Optional[tuple]] = {}
+
+# Rows per INSERT in bulk_update_or_create, well under Postgres' parameter limit
+UPSERT_BATCH_SIZE = 500
+
+
 class BaseModel(Model):
     """Base model class that should be used for all models."""
 
     created_at = DateTimeField(default=datetime.now)
     updated_at = DateTimeField(default=datetime.now)
 
+    # Fields prepare_for_write() fills in, so writes needn't provide them
+    derived_fields: tuple[str, ...] = ()
+
+    def prepare_for_write(self) -> None:
+        """Fill in fields derived from others (norms, slugs) before a write.
+
+        Called by save() and by the upserts in update_or_create(), so both
+        store the same values. Override in models with derived fields, and
+        list the ones it always fills in `derived_fields`.
+        """
+
+    @classmethod
+    def after_write(cls, instances: Sequence["BaseModel"]) -> None:
+        """Hook run after save() or an upsert has written `instances`."""
+
+    @classmethod
+    def after_delete(cls, instances: Sequence["BaseModel"]) -> None:
+        """Hook run after delete_instance() has deleted `instances`."""
+
     def save(self, *args, **kwargs):
+        self.prepare_for_write()
         self.updated_at = datetime.now()
 
         # Check if this is a new instance (not yet in the database)
@@ -59,34 +100,103 @@ class BaseModel(Model):
             and hasattr(self, "created_by")
             and not getattr(self, "created_by", None)
         ):
-            try:
-                # Import Flask's g object within the method to avoid circular imports
-                from flask import g
-                import uuid
-
-                # Check if g has user_id and set it on the model if valid UUID
-                if hasattr(g, "user_id") and g.user_id:
-                    try:
-                        _ = uuid.UUID(str(g.user_id))
-                        self.created_by = g.user_id
-                    except Exception:
-                        # Ignore non-UUID test ids
-                        pass
-            except (ImportError, RuntimeError):
-                # Flask context might not be available (e.g., in scripts, tests)
-                pass
-
-        return super().save(*args, **kwargs)
+            user_id = self.current_user_id()
+            if user_id:
+                self.created_by = user_id
+
+        result = super().save(*args, **kwargs)
+        self.after_write([self])
+        return result
+
+    def delete_instance(self, *args, **kwargs):
+        result = super().delete_instance(*args, **kwargs)
+        self.after_delete([self])
+        return result
+
+    @staticmethod
+    def current_user_id() -> Optional[str]:
+        """The logged-in user's id from Flask's g (for `created_by`), if it's a UUID."""
+        try:
+            # Import Flask's g object within the method to avoid circular imports
+            from flask import g
+            import uuid
+
+            # Check if g has user_id and return it if valid UUID
+            if hasattr(g, "user_id") and g.user_id:
+                try:
+                    _ = uuid.UUID(str(g.user_id))
+                    return g.user_id
+                except Exception:
+                    # Ignore non-UUID test ids
+                    pass
+        except (ImportError, RuntimeError):
+            # Flask context might not be available (e.g., in scripts, tests)
+            pass
+        return None
 
     class Meta:
         database = database
 
+    @classmethod
+    def _conflict_target(cls, lookup_fields: Iterable[str]) -> Optional[tuple]:
+        """The unique index columns to upsert on for these lookup fields (cached).
+
+        Returns None if the lookup only covers part of a unique index, where
+        ON CONFLICT can't be used. Raises ValueError if no unique index covers it.
+        """
+        key = (cls, frozenset(lookup_fields))
+        if key not in _CONFLICT_TARGETS:
+            lookup = {cls._meta.combined[name] for name in key[1]}  # type: ignore
+            # Tuple indexes only; ModelIndex ones (e.g. partial) can't be inferred
+            unique = [
+                tuple(cls._meta.fields[name] for name in index[0])  # type: ignore
+                for index in cls._meta.indexes  # type: ignore
+                if isinstance(index, tuple) and index[1]
+            ] + [
+                (field,)
+                for field in cls._meta.sorted_fields  # type: ignore
+                if field.unique
+            ]
+            if not any(lookup <= set(fields) for fields in unique):
+                raise ValueError("Lookup fields must be covered by a unique constraint")
+            _CONFLICT_TARGETS[key] = next(
+                (fields for fields in unique if lookup == set(fields)), None
+            )
+        return _CONFLICT_TARGETS[key]
+
+    @classmethod
+    def _fills_required_fields(cls, data: dict) -> bool:
+        """Whether `data` (with defaults and derived fields) fills every NOT NULL
+        column, as the INSERT half of an upsert must even if the row exists.
+
+        Only inspects `data` and the field declarations; no instance is built.
+        """
+
+        def filled(field) -> bool:
+            if field.name in cls.derived_fields:
+                return True
+            for name in (field.name, field.column_name):
+                if name in data:
+                    return data[name] is not None
+            return field.default is not None
+
+        return all(
+            filled(field)
+            for field in cls._meta.sorted_fields  # type: ignore
+            if not field.null and not field.primary_key
+        )
+
     @classmethod
     def update_or_create(cls, lookup: dict, updates: dict):
         """
         Implementation of update-or-create pattern that explicitly separates
         lookup vs update fields.
 
+        Runs as a single INSERT ... ON CONFLICT DO UPDATE (see
+        bulk_update_or_create), so concurrent callers can't race each other
+        into an IntegrityError. Partial updates that couldn't be inserted as a
+        new row (missing NOT NULL fields) fall back to get-then-save.
+
         Args:
             lookup: Fields used for existence check (should have unique constraint)
             updates: Fields to update/create
@@ -94,30 +204,139 @@ class BaseModel(Model):
         Returns:
             Tuple of (instance, created)
         """
-        # Validate that lookup fields have unique constraint
-        if not any(
-            index[1]  # index[1] is unique flag
-            and set(lookup.keys()).issubset(set(index[0]))
-            for index in cls._meta.indexes  # type: ignore
+        if cls._conflict_target(lookup) is None or not cls._fills_required_fields(
+            {**lookup, **updates}
         ):
-            raise ValueError("Lookup fields must be covered by a unique constraint")
+            # Only part of a unique index, or a partial update: look the row up
+            with cls._meta.database.atomic():  # type: ignore
+                try:
+                    instance = cls.get(**lookup)
+                    if updates:
+                        for field, value in updates.items():
+                            setattr(instance, field, value)
+                        instance.save()
+                    return instance, False
+                except cls.DoesNotExist:  # type: ignore
+                    return cls.create(**lookup, **updates), True
+        return cls.bulk_update_or_create([{**lookup, **updates}], list(lookup))[0]
 
+    @classmethod
+    def bulk_update_or_create(
+        cls, rows: Sequence[dict], lookup_fields: Sequence[str]
+    ) -> list[tuple]:
+        """Update-or-create many rows with INSERT ... ON CONFLICT DO UPDATE.
+
+        Each row holds the lookup fields (which must be exactly a unique index)
+        plus the fields to update/create; all rows must have the same keys.
+        New rows get `created_at` and `created_by` as in save(); existing rows
+        get the update fields and a fresh `updated_at`. Fields that
+        prepare_for_write() derives are only filled in on existing rows where
+        they're NULL (so e.g. an existing slug is kept).
+        If several rows share lookup values, the last one wins.
+
+        Returns:
+            List of (instance, created), one per row in `rows`
+        """
+        conflict_target = cls._conflict_target(lookup_fields)
+        if conflict_target is None:
+            raise ValueError("Lookup fields must match a unique constraint exactly")
+        if not rows:
+            return []
+
+        now = datetime.now()
+        user_id = cls.current_user_id() if "created_by" in cls._meta.fields else None  # type: ignore
+        update_fields = [
+            cls._meta.combined[name]  # type: ignore
+            for name in rows[0]
+            if name not in lookup_fields and name in cls._meta.combined  # type: ignore
+        ]
+
+        def key_of(instance) -> tuple:
+            return tuple(instance.__data__.get(field.name) for field in conflict_target)
+
+        # Build (and normalize) each row as save() would, deduping on the lookup
+        row_keys = []
+        to_insert = {}
+        derived = set()
+        for row in rows:
+            instance = cls(**row)
+            before = dict(instance.__data__)
+            instance.prepare_for_write()
+            derived.update(
+                name
+                for name, value in instance.__data__.items()
+                if before.get(name) != value
+            )
+            instance.created_at = now
+            instance.updated_at = now
+            if user_id and not instance.__data__.get("created_by"):
+                instance.created_by = user_id
+            row_keys.append(key_of(instance))
+            to_insert[row_keys[-1]] = instance.__data__
+
+        # Keep the update fields (and updated_at) of existing rows; with no
+        # update fields, the no-op SET still lets RETURNING give us the row
+        update = {field: getattr(EXCLUDED, field.column_name) for field in update_fields}
+        update[cls.updated_at] = (
+            EXCLUDED.updated_at if update_fields else cls.updated_at
+        )
+        for name in sorted(derived):
+            field = cls._meta.fields[name]  # type: ignore
+            if field not in update and field not in conflict_target:
+                update[field] = fn.COALESCE(field, getattr(EXCLUDED, field.column_name))
+
+        columns = list(next(iter(to_insert.values())))
+        saved = {}
         with cls._meta.database.atomic():  # type: ignore
-            try:
-                # Try to get existing record
-                instance = cls.get(**lookup)
-                if updates:
-                    for field, value in updates.items():
-                        setattr(instance, field, value)
-                    instance.save()
-                return instance, False
-            except cls.DoesNotExist:  # type: ignore
-                # Create new record with combined lookup and updates
-                return cls.create(**lookup, **updates), True
+            for batch in chunked(to_insert.values(), UPSERT_BATCH_SIZE):
+                query = (
+                    cls.insert_many(
+                        [tuple(data.get(name) for name in columns) for data in batch],
+                        fields=[cls._meta.fields[name] for name in columns],  # type: ignore
+                    )
+                    .on_conflict(conflict_target=list(conflict_target), update=update)
+                    .returning(cls, SQL("(xmax = 0)").alias("created"))
+                )
+                for instance in query.execute():
+                    created = bool(instance.__dict__.pop("created"))
+                    saved[key_of(instance)] = (instance, created)
+        cls.after_write([instance for instance, _ in saved.values()])
+        return [saved[key] for key in row_keys]
+
+
+def _best_match_query(
+    model,
+    text_field,
+    norm_field,
+    text: str,
+    target_language_code: str,
+    fold_accents: bool,
+):
+    """Rows sharing `text`'s normalized form, closest first (exact, case, accents).
+
+    Backs Wordform.find_best_match and Lemma.find_best_match, which use the
+    (target_language_code, *_norm) index.
+    """
+    from utils.word_utils import ensure_nfc, normalize_text
+
+    text = ensure_nfc(text)
+    query = model.select().where(
+        (model.target_language_code == target_language_code)
+        & (norm_field == normalize_text(text))
+    )
+    if not fold_accents:
+        query = query.where(fn.Lower(text_field) == text.lower())
+    rank = Case(
+        None,
+        ((text_field == text, 0), (fn.Lower(text_field) == text.lower(), 1)),
+        2,
+    )
+    return query.order_by(rank, model.id).limit(1)
 
 
 class Lemma(BaseModel):
     lemma = CharField()  # the dictionary form
+    lemma_norm = CharField(null=True)  # normalize_text(lemma), kept in sync by save()
     target_language_code = CharField()  # 2-letter language code (e.g. "el" for Greek)
     part_of_speech = CharField(default="unknown")  # e.g. "verb", "adjective", "noun"
     translations = JSONField(default=list)  # list[str] of English translations
@@ -145,7 +364,44 @@ class Lemma(BaseModel):
     )
 
     class Meta:
-        indexes = ((("lemma", "target_language_code"), True),)  # Unique index
+        indexes = (
+            (("lemma", "target_language_code"), True),  # Unique index
+            (("target_language_code", "lemma_norm"), False),
+        )
+
+    derived_fields = ("lemma_norm",)
+
+    def prepare_for_write(self) -> None:
+        """Keep lemma_norm in sync with lemma."""
+        from utils.word_utils import normalize_text
+
+        self.lemma_norm = normalize_text(str(self.lemma)) if self.lemma is not None else None
+
+    @classmethod
+    def after_write(cls, instances) -> None:
+        # Lemma text is part of the lexicon index entries, so it's stale too
+        from utils.lexicon_index import mark_lexicon_changed
+
+        mark_lexicon_changed(str(lemma.target_language_code) for lemma in instances)
+
+    @classmethod
+    def after_delete(cls, instances) -> None:
+        cls.after_write(instances)
+
+    @classmethod
+    def find_best_match(
+        cls, lemma: str, target_language_code: str, fold_accents: bool = True
+    ):
+        """Query for the best stored match for `lemma`, as a single indexed lookup.
+
+        Ranked like Wordform.find_best_match: exact, then case-insensitive, then
+        (unless `fold_accents=False`) accent-insensitive matches on `lemma_norm`.
+
+        Returns a query (limited to one row) so callers can add joins/columns.
+        """
+        return _best_match_query(
+            cls, cls.lemma, cls.lemma_norm, lemma, target_language_code, fold_accents
+        )
 
     @staticmethod
     def check_metadata_completeness(metadata: dict) -> bool:
@@ -322,6 +578,7 @@ class Lemma(BaseModel):
 
 class Wordform(BaseModel):
     wordform = CharField(null=True)  # the sanitized form if valid, None if invalid
+    wordform_norm = CharField(null=True)  # normalize_text(wordform), kept in sync by save()
     lemma_entry = ForeignKeyField(
         Lemma, backref="wordforms", null=True, on_delete="CASCADE"
     )  # reference to the lemma entry
@@ -339,20 +596,37 @@ class Wordform(BaseModel):
     )
 
     class Meta:
-        indexes = ((("wordform", "target_language_code"), True),)  # Unique index
+        indexes = (
+            (("wordform", "target_language_code"), True),  # Unique index
+            (("target_language_code", "wordform_norm"), False),
+        )
 
-    def save(self, *args, **kwargs):
-        """Override save to ensure wordform is in NFC form."""
+    derived_fields = ("wordform_norm",)
+
+    def prepare_for_write(self) -> None:
+        """Ensure wordform is in NFC form and wordform_norm is in sync."""
         # Import here to avoid circular imports
         import unicodedata
+        from utils.word_utils import normalize_text
 
         # Ensure wordform is in NFC form if it exists
         if self.wordform is not None:
             # Convert to string first to ensure compatibility with unicodedata.normalize
             self.wordform = unicodedata.normalize("NFC", str(self.wordform))
+            self.wordform_norm = normalize_text(self.wordform)
+        else:
+            self.wordform_norm = None
+
+    @classmethod
+    def after_write(cls, instances) -> None:
+        # Let the lexicon index for each language (in every worker) know it's stale
+        from utils.lexicon_index import mark_lexicon_changed
 
-        # Call parent save method
-        return super().save(*args, **kwargs)
+        mark_lexicon_changed(str(w.target_language_code) for w in instances)
+
+    @classmethod
+    def after_delete(cls, instances) -> None:
+        cls.after_write(instances)
 
     @classmethod
     def get_or_create_from_metadata(
@@ -399,7 +673,7 @@ class Wordform(BaseModel):
             "is_lemma": metadata.get("is_lemma", False),
         }
 
-        return cls.update_or_create(
+        wordform_model, created = cls.update_or_create(
             lookup={
                 "wordform": wordform,
                 "target_language_code": target_language_code,
@@ -407,6 +681,12 @@ class Wordform(BaseModel):
             updates=updates,
         )
 
+        # Keep the form -> lemma index up to date
+        if lemma_entry is not None:
+            LemmaForm.sync_for_lemma(lemma_entry)
+        LemmaForm.sync_for_wordform(wordform_model)
+        return wordform_model, created
+
     def to_dict(self) -> dict:
         """Convert wordform model to dictionary format matching the old metadata schema."""
         return {
@@ -419,18 +699,35 @@ class Wordform(BaseModel):
             "is_lemma": self.is_lemma,
         }
 
+    @classmethod
+    def find_best_match(
+        cls, wordform: str, target_language_code: str, fold_accents: bool = True
+    ):
+        """Query for the best stored match for `wordform`, as a single indexed lookup.
+
+        Candidates share its `wordform_norm` (case- and accent-folded), and are
+        ranked exact match first, then case-insensitive, then accent-insensitive.
+        With `fold_accents=False` only exact and case-insensitive matches qualify.
+
+        Returns a query (limited to one row) so callers can add joins/columns.
+        """
+        return _best_match_query(
+            cls,
+            cls.wordform,
+            cls.wordform_norm,
+            wordform,
+            target_language_code,
+            fold_accents,
+        )
+
     @classmethod
     def find_by_text(
         cls, wordform: str, target_language_code: str
     ) -> Optional["Wordform"]:
-        """Find a wordform by its text, case-insensitive."""
-        try:
-            return cls.get(
-                fn.Lower(cls.wordform) == wordform.lower(),
-                cls.target_language_code == target_language_code,
-            )
-        except DoesNotExist:
-            return None
+        """Find a wordform by its text, case-insensitive (exact matches first)."""
+        return cls.find_best_match(
+            wordform, target_language_code, fold_accents=False
+        ).first()
 
     @classmethod
     def get_all_wordforms_for(
@@ -540,6 +837,123 @@ class Wordform(BaseModel):
         return query
 
 
+class LemmaForm(BaseModel):
+    """Inverted index from a known surface form to its lemma.
+
+    Holds the same forms as `Lemma.get_all_wordforms()` (headword, Wordform rows,
+    single-word related forms), so finding the lemma for a form is one indexed
+    query. Kept up to date by `sync_for_lemma()` / `sync_for_wordform()` on the
+    lemma and wordform write paths.
+    """
+
+    lemma = ForeignKeyField(Lemma, backref="form_index", on_delete="CASCADE")
+    wordform = ForeignKeyField(
+        Wordform, backref="form_index", null=True, on_delete="CASCADE"
+    )  # set for rows derived from a Wordform
+    target_language_code = CharField()
+    form = CharField()  # NFC surface form
+    form_lower = CharField()  # form.lower(), the lookup key
+    source = CharField()  # "headword", "wordform" or "related"
+
+    class Meta:
+        indexes = (
+            (("lemma", "form", "source"), True),  # Unique index
+            (("target_language_code", "form_lower"), False),
+        )
+
+    @staticmethod
+    def _row(lemma: Lemma, form: str, source: str, wordform=None) -> dict:
+        import unicodedata
+
+        form_nfc = unicodedata.normalize("NFC", form)
+        return {
+            "lemma": lemma,
+            "wordform": wordform,
+            "target_language_code": lemma.target_language_code,
+            "form": form_nfc,
+            "form_lower": form_nfc.lower(),
+            "source": source,
+        }
+
+    @classmethod
+    def sync_for_lemma(cls, lemma: Lemma) -> None:
+        """Rebuild the headword and related-form rows for a lemma."""
+        cls.sync_for_lemmas([lemma])
+
+    @classmethod
+    def sync_for_lemmas(cls, lemmas: list[Lemma]) -> None:
+        """Rebuild the headword and related-form rows for several lemmas at once."""
+        if not lemmas:
+            return
+        rows = []
+        for lemma in lemmas:
+            rows.append(cls._row(lemma, str(lemma.lemma), "headword"))
+            for related in lemma.related_words_phrases_idioms or []:
+                if (
+                    isinstance(related, dict)
+                    and related.get("lemma")
+                    and " " not in related["lemma"]
+                ):
+                    rows.append(cls._row(lemma, related["lemma"], "related"))
+
+        with cls._meta.database.atomic():  # type: ignore
+            cls.delete().where(
+                (cls.lemma.in_([lemma.id for lemma in lemmas]))
+                & (cls.source.in_(["headword", "related"]))
+            ).execute()
+            cls.insert_many(rows).on_conflict_ignore().execute()
+
+    @classmethod
+    def sync_for_wordform(cls, wordform: Wordform) -> None:
+        """Point the row for a Wordform at its current lemma (or drop it)."""
+        cls.sync_for_wordforms([wordform])
+
+    @classmethod
+    def sync_for_wordforms(cls, wordforms: list[Wordform]) -> None:
+        """Point the rows for several Wordforms at their current lemmas (or drop them).
+
+        Reads `wordform.lemma_entry`, so attach the lemmas first to avoid a
+        query per wordform.
+        """
+        if not wordforms:
+            return
+        rows = [
+            cls._row(
+                wordform.lemma_entry,
+                str(wordform.wordform),
+                "wordform",
+                wordform=wordform,
+            )
+            for wordform in wordforms
+            if wordform.wordform and wordform.lemma_entry_id  # type: ignore
+        ]
+        with cls._meta.database.atomic():  # type: ignore
+            cls.delete().where(
+                cls.wordform.in_([wordform.id for wordform in wordforms])
+            ).execute()
+            if rows:
+                cls.insert_many(rows).on_conflict_ignore().execute()
+
+    @classmethod
+    def find_lemma(cls, form: str, target_language_code: str) -> Optional[str]:
+        """Return the (alphabetically first) lemma that has `form`, case-insensitively."""
+        import unicodedata
+
+        form_lower = unicodedata.normalize("NFC", form).lower()
+        row = (
+            Lemma.select(Lemma.lemma)
+            .join(cls, on=(cls.lemma == Lemma.id))  # type: ignore
+            .where(
+                (cls.target_language_code == target_language_code)
+                & (cls.form_lower == form_lower)
+            )
+            .order_by(fn.Lower(Lemma.lemma))
+            .limit(1)
+            .first()
+        )
+        return row.lemma if row else None
+
+
 class Sentence(BaseModel):
     target_language_code = CharField()  # 2-letter language code (e.g. "el" for Greek)
     sentence = TextField()  # the actual sentence text
@@ -563,14 +977,15 @@ class Sentence(BaseModel):
         AuthUser, backref="sentences", null=True, on_delete="CASCADE"
     )
 
-    def save(self, *args, **kwargs):
+    derived_fields = ("slug",)
+
+    def prepare_for_write(self) -> None:
         # Generate slug from sentence if not set
         if not self.slug:
             self.slug = slugify(str(self.sentence))
             # Truncate slug if it exceeds max length
             if len(self.slug) > 255:
                 self.slug = self.slug[:255]
-        return super().save(*args, **kwargs)
 
     @property
     def lemma_words(self) -> list[str]:
@@ -695,14 +1110,15 @@ class Phrase(BaseModel):
         AuthUser, backref="phrases", null=True, on_delete="CASCADE"
     )
 
-    def save(self, *args, **kwargs):
+    derived_fields = ("slug",)
+
+    def prepare_for_write(self) -> None:
         # Generate slug from canonical_form if not set
         if not self.slug:
             self.slug = slugify(str(self.canonical_form))
             # Truncate slug if it exceeds max length
             if len(self.slug) > 255:
                 self.slug = self.slug[:255]
-        return super().save(*args, **kwargs)
 
     class Meta:
         indexes = (
@@ -811,12 +1227,159 @@ class Phrase(BaseModel):
         return query
 
 
-class LemmaAudio(BaseModel):
+# GIN index for raw-form lookups (see utils.phrase_utils.find_phrases_by_surfaces).
+# raw_forms is a json column, so the index is on its jsonb cast.
+Phrase.add_index(
+    Phrase.index(SQL("(raw_forms::jsonb)"), using="GIN", name="phrase_raw_forms_jsonb")
+)
+
+
+def audio_content_hash(audio_data) -> str:
+    """sha256 hex digest of audio bytes (the `content_hash` of audio variants)."""
+    return content_hash_of(bytes(audio_data))
+
+
+def _put_audio(data: bytes, mime_type: str) -> tuple[StoredBlob, bool]:
+    """Write audio to the blob store if there is one; returns (blob, stored)."""
+    store = get_audio_blob_store()
+    if store is None:
+        return StoredBlob(content_hash_of(data), len(data), mime_type), False
+    return store.put(data, mime_type), True
+
+
+def open_stored_audio(
+    content_hash: Optional[str], load_legacy: Callable[[], Optional[bytes]]
+) -> Optional[BinaryIO]:
+    """Open audio from the blob store, else from its legacy bytea column.
+
+    `load_legacy` is only called for rows that haven't been moved to the
+    store yet (or when no store is configured).
+    """
+    store = get_audio_blob_store()
+    if store is not None and content_hash:
+        try:
+            return store.open(content_hash)
+        except BlobNotFound:
+            pass
+    data = load_legacy()
+    return None if data is None else io.BytesIO(bytes(data))
+
+
+class StoredAudioModel(BaseModel):
+    """Base for audio variants, whose bytes live in the blob store.
+
+    The row keeps the sha256 `content_hash` (the store key, and the HTTP ETag),
+    size and mime type. Rows written while no store was configured keep their
+    bytes in the legacy `audio_data` column until `flask move-audio-to-store`
+    moves them (see utils/blob_store.py).
+
+    Assigning `audio_data` stages bytes for the next save(); reading it (or
+    `open_audio()`) fetches them from wherever they are.
+    """
+
+    legacy_audio_data = BlobField(null=True, column_name="audio_data")
+    content_hash = CharField(max_length=64, null=True)
+    audio_size = IntegerField(null=True)  # in bytes
+    mime_type = CharField(default=DEFAULT_AUDIO_MIME_TYPE)
+
+    @property
+    def audio_data(self) -> Optional[bytes]:
+        staged = self.__dict__.get("_staged_audio")
+        if staged is not None:
+            return staged
+        stream = self.open_audio()
+        if stream is None:
+            return None
+        try:
+            return stream.read()
+        finally:
+            stream.close()
+
+    @audio_data.setter
+    def audio_data(self, value: Optional[bytes]) -> None:
+        self.__dict__["_staged_audio"] = None if value is None else bytes(value)
+
+    def open_audio(self) -> Optional[BinaryIO]:
+        """A readable file object with the audio, or None if there is none."""
+        loaded = "legacy_audio_data" in self.__data__
+        if loaded and self.legacy_audio_data is not None:
+            return io.BytesIO(bytes(self.legacy_audio_data))
+
+        def load_legacy() -> Optional[bytes]:
+            if loaded:
+                return None  # the column was selected, and it's empty
+            model = type(self)
+            return (
+                model.select(model.legacy_audio_data)
+                .where(model.id == self.get_id())
+                .scalar()
+            )
+
+        return open_stored_audio(self.content_hash, load_legacy)
+
+    @classmethod
+    def _fields_without_audio(cls) -> list:
+        return [f for f in cls._meta.sorted_fields if f.name != "legacy_audio_data"]
+
+    @classmethod
+    def select_without_audio(cls):
+        """select() of every column except the legacy audio bytes.
+
+        For listing variants; `open_audio()` still works on the results.
+        """
+        return cls.select(*cls._fields_without_audio())
+
+    @classmethod
+    def insert_variants(cls, rows: Sequence[dict]) -> list["StoredAudioModel"]:
+        """Insert new variants in one transaction, skipping voices already stored.
+
+        Each row holds the model's fields, with the bytes as `audio_data`; all
+        rows must have the same keys. A variant whose owner already has its
+        voice (e.g. stored by a concurrent request) hits the unique
+        (owner, metadata->>'voice_name') index and is skipped.
+
+        Returns:
+            The inserted variants (without their audio bytes)
+        """
+        if not rows:
+            return []
+        now = datetime.now()
+        to_insert = []
+        for row in rows:
+            instance = cls(**row)
+            instance.prepare_for_write()  # moves the bytes to the blob store
+            instance.created_at = now
+            instance.updated_at = now
+            to_insert.append(instance.__data__)
+
+        columns = list(to_insert[0])
+        with cls._meta.database.atomic():  # type: ignore
+            query = (
+                cls.insert_many(
+                    [tuple(data.get(name) for name in columns) for data in to_insert],
+                    fields=[cls._meta.fields[name] for name in columns],  # type: ignore
+                )
+                .on_conflict_ignore()
+                .returning(*cls._fields_without_audio())
+            )
+            inserted = list(query.execute())
+        cls.after_write(inserted)
+        return inserted
+
+    def prepare_for_write(self) -> None:
+        data = self.__dict__.pop("_staged_audio", None)
+        if data is not None:
+            blob, stored = _put_audio(data, self.mime_type or DEFAULT_AUDIO_MIME_TYPE)
+            self.content_hash = blob.content_hash
+            self.audio_size = blob.size
+            self.legacy_audio_data = None if stored else data
+
+
+class LemmaAudio(StoredAudioModel):
     """Stored audio variants (by provider/voice) for a lemma."""
 
     lemma = ForeignKeyField(Lemma, backref="audio_variants", on_delete="CASCADE")
     provider = CharField(default="elevenlabs")
-    audio_data = BlobField()
     metadata = JSONField()
     created_by = ForeignKeyField(
         AuthUser, backref="lemma_audio", null=True, on_delete="CASCADE"
@@ -829,12 +1392,11 @@ class LemmaAudio(BaseModel):
         )
 
 
-class SentenceAudio(BaseModel):
+class SentenceAudio(StoredAudioModel):
     """Stored audio variants (by provider/voice) for a sentence."""
 
     sentence = ForeignKeyField(Sentence, backref="audio_variants", on_delete="CASCADE")
     provider = CharField(default="elevenlabs")
-    audio_data = BlobField()
     metadata = JSONField()
     created_by = ForeignKeyField(
         AuthUser, backref="sentence_audio", null=True, on_delete="CASCADE"
@@ -847,6 +1409,26 @@ class SentenceAudio(BaseModel):
         )
 
 
+# One variant per voice: StoredAudioModel.insert_variants() relies on these
+# to skip voices that a concurrent request has already stored
+LemmaAudio.add_index(
+    LemmaAudio.index(
+        LemmaAudio.lemma,
+        SQL("(metadata->>'voice_name')"),
+        unique=True,
+        name="lemmaaudio_lemma_id_voice_name",
+    )
+)
+SentenceAudio.add_index(
+    SentenceAudio.index(
+        SentenceAudio.sentence,
+        SQL("(metadata->>'voice_name')"),
+        unique=True,
+        name="sentenceaudio_sentence_id_voice_name",
+    )
+)
+
+
 class LemmaExampleSentence(BaseModel):
     lemma = ForeignKeyField(Lemma, backref="example_sentences", on_delete="CASCADE")
     sentence = ForeignKeyField(Sentence, backref="lemma_examples", on_delete="CASCADE")
@@ -884,14 +1466,15 @@ class Sourcedir(BaseModel):
         AuthUser, backref="sourcedirs", null=True, on_delete="CASCADE"
     )
 
-    def save(self, *args, **kwargs):
+    derived_fields = ("slug",)
+
+    def prepare_for_write(self) -> None:
         # Generate slug from path if not set
         if not self.slug:
             self.slug = slugify(str(self.path))
             # Truncate slug if it exceeds max length
             if len(self.slug) > SOURCEDIR_SLUG_MAX_LENGTH:
                 self.slug = self.slug[:SOURCEDIR_SLUG_MAX_LENGTH]
-        return super().save(*args, **kwargs)
 
     class Meta:
         database = database
@@ -905,8 +1488,7 @@ class Sourcefile(BaseModel):
     sourcedir = ForeignKeyField(Sourcedir, backref="sourcefiles", on_delete="CASCADE")
     filename = CharField(max_length=1024)  # just the filename part
     description = TextField(null=True)  # description of the file content
-    image_data = BlobField(null=True)  # the original image
-    audio_data = BlobField(null=True)  # optional mp3 audio
+    # image_data/audio_data are properties backed by SourcefileBlob (below)
     text_target = TextField()  # the source text in target language
     text_english = TextField()  # the English translation
     audio_filename = CharField(
@@ -927,7 +1509,117 @@ class Sourcefile(BaseModel):
     title_target = CharField(max_length=2048, null=True)  # title in target language
     ai_generated = BooleanField(default=False)  # whether this file was generated by AI
 
+    # The original image/audio bytes live in SourcefileBlob, so selecting
+    # sourcefiles never transfers them. Reading one of these loads just that
+    # column (once per instance); assigning stages it for the next save().
+
+    def _load_blob(self, name: str) -> Optional[bytes]:
+        blobs = self.__dict__.setdefault("_blobs", {})
+        if name not in blobs:
+            if name == "audio_data":
+                stream = self.open_audio()
+                try:
+                    blobs[name] = None if stream is None else stream.read()
+                finally:
+                    if stream is not None:
+                        stream.close()
+            else:
+                blobs[name] = self._select_blob_column(name)
+        return blobs[name]
+
+    def _select_blob_column(self, name: str):
+        if self.get_id() is None:
+            return None
+        return (
+            SourcefileBlob.select(getattr(SourcefileBlob, name))
+            .where(SourcefileBlob.sourcefile == self.get_id())
+            .scalar()
+        )
+
+    def open_audio(self) -> Optional[BinaryIO]:
+        """A readable file object with the audio (from the blob store), or None."""
+        blobs = self.__dict__.get("_blobs", {})
+        if "audio_data" in blobs:
+            data = blobs["audio_data"]
+            return None if data is None else io.BytesIO(bytes(data))
+        return open_stored_audio(
+            self._select_blob_column("audio_hash"),
+            lambda: self._select_blob_column("audio_data"),
+        )
+
+    def _stage_blob(self, name: str, value: Optional[bytes]) -> None:
+        self.__dict__.setdefault("_blobs", {})[name] = value
+        self.__dict__.setdefault("_pending_blobs", set()).add(name)
+
+    @property
+    def image_data(self) -> Optional[bytes]:
+        """The original image, if any."""
+        return self._load_blob("image_data")
+
+    @image_data.setter
+    def image_data(self, value: Optional[bytes]) -> None:
+        self._stage_blob("image_data", value)
+
+    @property
+    def audio_data(self) -> Optional[bytes]:
+        """The mp3 audio, if any."""
+        return self._load_blob("audio_data")
+
+    @audio_data.setter
+    def audio_data(self, value: Optional[bytes]) -> None:
+        self._stage_blob("audio_data", value)
+
+    def media_flags(self) -> dict[str, bool]:
+        """Whether there's an image and audio, without transferring either."""
+        blobs = self.__dict__.get("_blobs", {})
+        stored = (
+            SourcefileBlob.select(
+                SourcefileBlob.image_data.is_null(False),
+                SourcefileBlob.audio_hash.is_null(False),
+            )
+            .where(SourcefileBlob.sourcefile == self.get_id())
+            .tuples()
+            .first()
+            if self.get_id() is not None
+            else None
+        ) or (False, False)
+        return {
+            name: blobs[field] is not None if field in blobs else bool(flag)
+            for name, field, flag in (
+                ("has_image", "image_data", stored[0]),
+                ("has_audio", "audio_data", stored[1]),
+            )
+        }
+
     def save(self, *args, **kwargs):
+        # The row and its staged image/audio (written by after_write) together,
+        # so a failed blob write doesn't leave a sourcefile without its media
+        with self._meta.database.atomic():
+            return super().save(*args, **kwargs)
+
+    @classmethod
+    def after_write(cls, instances) -> None:
+        # Write any staged image/audio bytes to SourcefileBlob
+        for instance in instances:
+            pending = instance.__dict__.pop("_pending_blobs", set())
+            if not pending:
+                continue
+            updates = {name: instance.__dict__["_blobs"][name] for name in pending}
+            if "audio_data" in updates:
+                updates.update(SourcefileBlob.audio_columns(updates["audio_data"]))
+            if any(value is not None for value in updates.values()):
+                SourcefileBlob.update_or_create(
+                    lookup={"sourcefile": instance.get_id()}, updates=updates
+                )
+            else:
+                # Clearing only; don't create an empty row
+                SourcefileBlob.update(**updates).where(
+                    SourcefileBlob.sourcefile == instance.get_id()
+                ).execute()
+
+    derived_fields = ("slug",)
+
+    def prepare_for_write(self) -> None:
         # Always generate slug from current filename
         self.slug = slugify(str(self.filename))
         # Validate sourcefile_type
@@ -936,7 +1628,6 @@ class Sourcefile(BaseModel):
                 f"Invalid sourcefile_type: {self.sourcefile_type}. "
                 f"Must be one of: {', '.join(sorted(VALID_SOURCEFILE_TYPES))}"
             )
-        return super().save(*args, **kwargs)
 
     class Meta:
         indexes = (
@@ -945,6 +1636,50 @@ class Sourcefile(BaseModel):
         )
 
 
+# Backs the directory ordering used by navigation and listings
+Sourcefile.add_index(
+    Sourcefile.index(
+        Sourcefile.sourcedir,
+        fn.LOWER(Sourcefile.filename),
+        name="sourcefile_sourcedir_id_lower_filename",
+    )
+)
+
+
+class SourcefileBlob(BaseModel):
+    """The original image/audio bytes for a sourcefile (see Sourcefile.image_data).
+
+    Kept out of the sourcefile row because they're large (images up to 4MB,
+    audio up to 60MB) and only file serving, OCR and transcription need them.
+    """
+
+    sourcefile = ForeignKeyField(
+        Sourcefile, backref="blob_entries", unique=True, on_delete="CASCADE"
+    )
+    image_data = BlobField(null=True)  # the original image
+    # Optional mp3 audio, kept in the blob store under audio_hash (see
+    # StoredAudioModel); audio_data only holds rows not yet moved there
+    audio_data = BlobField(null=True)
+    audio_hash = CharField(max_length=64, null=True)
+    audio_size = IntegerField(null=True)
+    audio_mime_type = CharField(null=True)
+
+    @staticmethod
+    def audio_columns(data: Optional[bytes]) -> dict:
+        """Column values for storing `data` as the audio (writing it to the store)."""
+        if data is None:
+            return dict.fromkeys(
+                ("audio_data", "audio_hash", "audio_size", "audio_mime_type")
+            )
+        blob, stored = _put_audio(bytes(data), DEFAULT_AUDIO_MIME_TYPE)
+        return {
+            "audio_data": None if stored else bytes(data),
+            "audio_hash": blob.content_hash,
+            "audio_size": blob.size,
+            "audio_mime_type": blob.mime_type,
+        }
+
+
 class SourcefileWordform(BaseModel):
     sourcefile = ForeignKeyField(
         Sourcefile, backref="wordform_entries", on_delete="CASCADE"
@@ -975,6 +1710,142 @@ class SourcefilePhrase(BaseModel):
         indexes = ((("sourcefile", "phrase"), True),)  # Unique index
 
 
+class SourcefileRecognition(BaseModel):
+    """Cached text tab data for a sourcefile (recognized words, links, wordforms).
+
+    Valid only while `text_hash`, `engine` and `links_stamp` match the current
+    NFC text, segmentation engine and linked wordforms respectively.
+    """
+
+    sourcefile = ForeignKeyField(
+        Sourcefile, backref="recognition_cache", unique=True, on_delete="CASCADE"
+    )  # one cache row per sourcefile
+    text_hash = CharField(max_length=64)  # sha256 of the NFC-normalized text_target
+    engine = CharField()  # e.g. "icu", "pythainlp", "naive" (+ cache format version)
+    links_stamp = CharField(max_length=64)  # md5 of the links' count and updated_ats
+    recognized_words = JSONField()  # list[dict] as returned by create_interactive_word_data
+    enhanced_text = TextField(null=True)  # HTML from create_interactive_word_links
+    wordforms = JSONField(null=True)  # list[dict] from Wordform.get_all_wordforms_for
+
+
+class SourcefileJob(BaseModel):
+    """A queued processing step for a sourcefile (see utils/sourcefile_jobs.py).
+
+    Workers claim `queued` rows whose `run_after` has passed with
+    FOR UPDATE SKIP LOCKED. A failed attempt goes back to `queued` with a later
+    `run_after` until `max_attempts` is used up, then becomes `failed`.
+    """
+
+    sourcefile = ForeignKeyField(Sourcefile, backref="jobs", on_delete="CASCADE")
+    step = CharField()  # "text_extraction", "translation", "wordforms", "phrases" or "process"
+    params = JSONField(null=True)  # e.g. language_level, max_new_words
+    status = CharField(default="queued")  # queued, running, succeeded, failed
+    attempts = IntegerField(default=0)
+    max_attempts = IntegerField(default=SOURCEFILE_JOB_MAX_ATTEMPTS)
+    run_after = DateTimeField(default=datetime.now)
+    locked_by = CharField(null=True)  # worker id while running
+    locked_at = DateTimeField(null=True)
+    finished_at = DateTimeField(null=True)
+    last_error = TextField(null=True)
+    result = JSONField(null=True)  # per-step results, e.g. wordforms_count
+
+    class Meta:
+        indexes = ((("status", "run_after"), False),)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.get_id(),
+            "step": self.step,
+            "status": self.status,
+            "params": self.params or {},
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_after": self.run_after.isoformat() if self.run_after else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result or {},
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+# At most one queued/running job per sourcefile and step, so repeated clicks
+# (or a retrying client) join the existing job instead of piling up
+SourcefileJob.add_index(
+    SourcefileJob.index(
+        SourcefileJob.sourcefile,
+        SourcefileJob.step,
+        unique=True,
+        where=SQL("status IN ('queued', 'running')"),
+        name="sourcefilejob_active_step",
+    )
+)
+
+
+class LLMResponse(BaseModel):
+    """Persisted LLM responses, shared across processes (see utils/llm_cache.py).
+
+    `cache_key` is a sha256 over the prompt template contents, the context, the
+    model and the response mode, so editing a template never serves old output.
+    """
+
+    cache_key = CharField(max_length=64)
+    prompt_template = CharField()  # template name, for inspection/purging
+    model = CharField()
+    response_json = BooleanField()
+    response = JSONField()  # str or dict, as returned by generate_gpt_from_template
+    extra = JSONField(null=True)
+    expires_at = DateTimeField(null=True)
+
+    class Meta:
+        indexes = (
+            (("cache_key",), True),
+            (("expires_at",), False),
+        )
+
+
+class LexiconVersion(BaseModel):
+    """Per-language counter bumped by every lemma/wordform write (see utils/lexicon_index.py).
+
+    Lets each worker check its in-memory lexicon index with a one-row lookup
+    instead of an aggregate over the language's wordforms.
+    """
+
+    target_language_code = CharField(unique=True)
+    version = IntegerField(default=0)
+
+    @classmethod
+    def bump(cls, target_language_codes: Iterable[str]) -> None:
+        """Increment the counter for each language, creating missing rows."""
+        # Sorted, so concurrent bumps of several languages lock rows in one order
+        codes = sorted(set(target_language_codes))
+        if not codes:
+            return
+        now = datetime.now()
+        cls.insert_many(
+            [
+                {
+                    "target_language_code": code,
+                    "version": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for code in codes
+            ]
+        ).on_conflict(
+            conflict_target=[cls.target_language_code],
+            update={cls.version: cls.version + 1, cls.updated_at: EXCLUDED.updated_at},
+        ).execute()
+
+    @classmethod
+    def current(cls, target_language_code: str) -> int:
+        """The counter for a language, or 0 if nothing has been written yet."""
+        return (
+            cls.select(cls.version)
+            .where(cls.target_language_code == target_language_code)
+            .scalar()
+            or 0
+        )
+
+
 class Profile(BaseModel):
     """User profile linked to Supabase auth.users."""
 
@@ -1114,6 +1985,7 @@ def get_models():
     return [
         Lemma,
         Wordform,
+        LemmaForm,
         Sentence,
         SentenceLemma,
         Phrase,
@@ -1123,8 +1995,13 @@ def get_models():
         RelatedPhrase,
         Sourcedir,
         Sourcefile,
+        SourcefileBlob,
         SourcefileWordform,
         SourcefilePhrase,
+        SourcefileRecognition,
+        SourcefileJob,
+        LLMResponse,
+        LexiconVersion,
         Profile,
         UserLemma,
     ]  # Order matters for foreign key dependencies
@@ -0,0 +1,55 @@
+"""Create sourcefilerecognition table caching recognized-word spans per sourcefile.
+
+The text tab previously re-segmented the whole text and rebuilt recognized
+words on every request. Rows here are keyed by a hash of the NFC text, the
+segmentation engine and a stamp of the linked wordforms, and are recomputed
+lazily whenever any of those change. No backfill is needed.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+from playhouse.postgres_ext import JSONField
+
+
+def migrate(migrator: Migrator, database: pw.Database, **kwargs):
+    class BaseModel(pw.Model):
+        created_at = pw.DateTimeField()
+        updated_at = pw.DateTimeField()
+
+        class Meta:
+            table_name = "basemodel"
+
+    class Sourcefile(BaseModel):
+        class Meta:
+            table_name = "sourcefile"
+
+    class SourcefileRecognition(BaseModel):
+        sourcefile = pw.ForeignKeyField(Sourcefile, backref="recognition_cache")
+        text_hash = pw.CharField(max_length=64)
+        engine = pw.CharField()
+        links_stamp = pw.CharField(max_length=64)
+        recognized_words = JSONField()
+
+        class Meta:
+            table_name = "sourcefilerecognition"
+
+    with database.atomic():
+        migrator.create_model(SourcefileRecognition)
+        migrator.sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS sourcefilerecognition_sourcefile_id ON sourcefilerecognition (sourcefile_id)"
+        )
+        migrator.sql(
+            "ALTER TABLE sourcefilerecognition DROP CONSTRAINT IF EXISTS sourcefilerecognition_sourcefile_id_fkey"
+        )
+        migrator.sql(
+            "ALTER TABLE sourcefilerecognition ADD CONSTRAINT sourcefilerecognition_sourcefile_id_fkey FOREIGN KEY (sourcefile_id) REFERENCES sourcefile(id) ON DELETE CASCADE"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, **kwargs):
+    class SourcefileRecognition(pw.Model):
+        class Meta:
+            table_name = "sourcefilerecognition"
+
+    with database.atomic():
+        migrator.remove_model(SourcefileRecognition, cascade=True)
@@ -0,0 +1,92 @@
+"""Add wordform.wordform_norm and lemma.lemma_norm with composite indexes.
+
+Lookups used to compare `lower(wordform)`, which no index covered, and the
+"accent-insensitive" fallback never matched. The new columns hold the same
+case- and accent-folded form as `utils.word_utils.normalize_text` (kept in sync
+by the models' save()), so lookups become one indexed query on
+`(target_language_code, *_norm)`.
+
+Existing rows are backfilled in chunks. The normalization has to happen in
+Python (Postgres has no equivalent of stripping combining marks without the
+unaccent extension), so rows are read in id order and written back with one
+UPDATE ... FROM (VALUES ...) per chunk.
+"""
+
+import unicodedata
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def _normalize_text(text: str) -> str:
+    # Frozen copy of utils.word_utils.normalize_text, so this migration doesn't
+    # change if the app code does
+    text = text.lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return unicodedata.normalize("NFKC", text)
+
+
+def _queue_backfill(
+    migrator: Migrator,
+    database: pw.Database,
+    table: str,
+    source_column: str,
+    norm_column: str,
+):
+    """Queue one UPDATE ... FROM (VALUES ...) per chunk of rows, read by id."""
+    last_id = 0
+    while True:
+        rows = database.execute_sql(
+            f"SELECT id, {source_column} FROM {table} "
+            f"WHERE id > %s AND {source_column} IS NOT NULL ORDER BY id LIMIT %s",
+            (last_id, BACKFILL_CHUNK_SIZE),
+        ).fetchall()
+        if not rows:
+            break
+        values_sql = ", ".join(["(%s, %s)"] * len(rows))
+        params = []
+        for row_id, value in rows:
+            params.extend([row_id, _normalize_text(value)])
+        migrator.sql(
+            f"UPDATE {table} AS t SET {norm_column} = v.norm "
+            f"FROM (VALUES {values_sql}) AS v(id, norm) WHERE t.id = v.id",
+            *params,
+        )
+        last_id = rows[-1][0]
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            "ALTER TABLE wordform ADD COLUMN IF NOT EXISTS wordform_norm VARCHAR(255)"
+        )
+        migrator.sql("ALTER TABLE lemma ADD COLUMN IF NOT EXISTS lemma_norm VARCHAR(255)")
+
+        _queue_backfill(migrator, database, "wordform", "wordform", "wordform_norm")
+        _queue_backfill(migrator, database, "lemma", "lemma", "lemma_norm")
+
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS wordform_target_language_code_wordform_norm "
+            "ON wordform (target_language_code, wordform_norm)"
+        )
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS lemma_target_language_code_lemma_norm "
+            "ON lemma (target_language_code, lemma_norm)"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP INDEX IF EXISTS wordform_target_language_code_wordform_norm")
+        migrator.sql("DROP INDEX IF EXISTS lemma_target_language_code_lemma_norm")
+        migrator.sql("ALTER TABLE wordform DROP COLUMN IF EXISTS wordform_norm")
+        migrator.sql("ALTER TABLE lemma DROP COLUMN IF EXISTS lemma_norm")
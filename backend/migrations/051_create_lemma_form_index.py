@@ -0,0 +1,132 @@
+"""Create lemmaform, an inverted index from known surface forms to lemmas.
+
+`get_lemma_for_wordform` used to fall back to loading every lemma for the
+language and scanning each one's wordforms and related words. This table holds
+the same forms (headwords, wordform rows, single-word related forms), keyed by
+`(target_language_code, form_lower)`, so a miss costs one indexed query.
+
+The table is backfilled here from existing rows. After that the app keeps it in
+sync on the lemma/wordform write paths.
+"""
+
+import json
+import unicodedata
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def _lemma_form_row(lemma_id, wordform_id, target_language_code, form, source):
+    form_nfc = unicodedata.normalize("NFC", form)
+    return (lemma_id, wordform_id, target_language_code, form_nfc, form_nfc.lower(), source)
+
+
+def _iter_chunks(database: pw.Database, sql: str):
+    last_id = 0
+    while True:
+        rows = database.execute_sql(sql, (last_id, BACKFILL_CHUNK_SIZE)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _queue_insert(migrator: Migrator, rows: list):
+    if not rows:
+        return
+    values_sql = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))
+    migrator.sql(
+        "INSERT INTO lemmaform "
+        "(lemma_id, wordform_id, target_language_code, form, form_lower, source) "
+        f"VALUES {values_sql} ON CONFLICT DO NOTHING",
+        *[value for row in rows for value in row],
+    )
+
+
+def _queue_backfill(migrator: Migrator, database: pw.Database):
+    """Queue chunked inserts for headwords, related forms and wordform rows.
+
+    Lower-casing is done in Python (as the app does) rather than with SQL lower(),
+    which depends on the database's collation.
+    """
+    for chunk in _iter_chunks(
+        database,
+        "SELECT id, target_language_code, lemma, related_words_phrases_idioms "
+        "FROM lemma WHERE id > %s ORDER BY id LIMIT %s",
+    ):
+        rows = []
+        for lemma_id, lang, lemma, related_list in chunk:
+            if lemma:
+                rows.append(_lemma_form_row(lemma_id, None, lang, lemma, "headword"))
+            if isinstance(related_list, str):
+                related_list = json.loads(related_list)
+            for related in related_list if isinstance(related_list, list) else []:
+                if (
+                    isinstance(related, dict)
+                    and related.get("lemma")
+                    and " " not in related["lemma"]
+                ):
+                    rows.append(
+                        _lemma_form_row(lemma_id, None, lang, related["lemma"], "related")
+                    )
+        _queue_insert(migrator, rows)
+
+    for chunk in _iter_chunks(
+        database,
+        "SELECT id, lemma_entry_id, target_language_code, wordform FROM wordform "
+        "WHERE id > %s ORDER BY id LIMIT %s",
+    ):
+        _queue_insert(
+            migrator,
+            [
+                _lemma_form_row(lemma_id, wordform_id, lang, wordform, "wordform")
+                for wordform_id, lemma_id, lang, wordform in chunk
+                if lemma_id and wordform
+            ],
+        )
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            """
+            CREATE TABLE IF NOT EXISTS lemmaform (
+                id SERIAL PRIMARY KEY,
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                lemma_id INTEGER NOT NULL REFERENCES lemma(id) ON DELETE CASCADE,
+                wordform_id INTEGER REFERENCES wordform(id) ON DELETE CASCADE,
+                target_language_code VARCHAR(255) NOT NULL,
+                form VARCHAR(255) NOT NULL,
+                form_lower VARCHAR(255) NOT NULL,
+                source VARCHAR(255) NOT NULL
+            )
+            """
+        )
+        migrator.sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS lemmaform_lemma_id_form_source "
+            "ON lemmaform (lemma_id, form, source)"
+        )
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS lemmaform_target_language_code_form_lower "
+            "ON lemmaform (target_language_code, form_lower)"
+        )
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS lemmaform_wordform_id ON lemmaform (wordform_id)"
+        )
+
+        _queue_backfill(migrator, database)
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP TABLE IF EXISTS lemmaform")
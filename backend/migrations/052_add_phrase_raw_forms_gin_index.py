@@ -0,0 +1,29 @@
+"""Add a GIN index on phrase.raw_forms (as jsonb) for raw-form lookups.
+
+`phrase_preview_api` used to scan every phrase for the language in Python when
+the canonical form missed. `raw_forms` is a json column, so the index is on the
+`raw_forms::jsonb` expression, which the `@>` (contains) and `?|` (contains any)
+lookups in utils.phrase_utils use.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS phrase_raw_forms_jsonb "
+            "ON phrase USING GIN ((raw_forms::jsonb))"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP INDEX IF EXISTS phrase_raw_forms_jsonb")
@@ -0,0 +1,47 @@
+"""Create llmresponse, the shared tier of the LLM response cache.
+
+See utils/llm_cache.py. Rows are keyed by a sha256 of the prompt template
+contents, context, model and response mode, and expire per template.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            """
+            CREATE TABLE IF NOT EXISTS llmresponse (
+                id SERIAL PRIMARY KEY,
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                cache_key VARCHAR(64) NOT NULL,
+                prompt_template VARCHAR(255) NOT NULL,
+                model VARCHAR(255) NOT NULL,
+                response_json BOOLEAN NOT NULL,
+                response JSON NOT NULL,
+                extra JSON,
+                expires_at TIMESTAMP
+            )
+            """
+        )
+        migrator.sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS llmresponse_cache_key "
+            "ON llmresponse (cache_key)"
+        )
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS llmresponse_expires_at "
+            "ON llmresponse (expires_at)"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP TABLE IF EXISTS llmresponse")
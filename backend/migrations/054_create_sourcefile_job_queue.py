@@ -0,0 +1,60 @@
+"""Create sourcefilejob, the queue for background sourcefile processing.
+
+Text extraction, translation and wordform/phrase extraction used to run inside
+the HTTP request. The processing endpoints now enqueue a row here and a worker
+(`flask process-sourcefile-jobs`) claims it with FOR UPDATE SKIP LOCKED.
+See utils/sourcefile_jobs.py.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            """
+            CREATE TABLE IF NOT EXISTS sourcefilejob (
+                id SERIAL PRIMARY KEY,
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                sourcefile_id INTEGER NOT NULL REFERENCES sourcefile(id) ON DELETE CASCADE,
+                step VARCHAR(255) NOT NULL,
+                params JSON,
+                status VARCHAR(255) NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                run_after TIMESTAMP NOT NULL DEFAULT now(),
+                locked_by VARCHAR(255),
+                locked_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                last_error TEXT,
+                result JSON
+            )
+            """
+        )
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS sourcefilejob_sourcefile_id "
+            "ON sourcefilejob (sourcefile_id)"
+        )
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS sourcefilejob_status_run_after "
+            "ON sourcefilejob (status, run_after)"
+        )
+        # At most one queued/running job per sourcefile and step
+        migrator.sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS sourcefilejob_active_step "
+            "ON sourcefilejob (sourcefile_id, step) "
+            "WHERE status IN ('queued', 'running')"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP TABLE IF EXISTS sourcefilejob")
@@ -0,0 +1,98 @@
+"""Move sourcefile.image_data/audio_data into a separate sourcefileblob table.
+
+Images (up to 4MB) and audio (up to 60MB) were inline columns, so every
+`SELECT * FROM sourcefile` - listings, navigation, lookups by slug - sent them
+over the wire. Now only file serving and OCR/transcription read them (see
+Sourcefile.image_data in db_models.py).
+
+Existing bytes are copied with INSERT ... SELECT, so they never leave the
+server, before the old columns are dropped. The copy is split into statements
+of MOVE_CHUNK_SIZE ids only to bound each statement's size: peewee_migrate runs
+the whole migration in one transaction, so nothing is committed until the end
+and an interrupted run starts over. On a large table, expect it to take a
+while and to need room for a second copy of the bytes until it commits.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+# Small, as a statement can copy this many 60MB files
+MOVE_CHUNK_SIZE = 50
+
+
+def _chunk_bounds(database: pw.Database, where: str):
+    """(first_id, last_id) for chunks of MOVE_CHUNK_SIZE sourcefiles matching `where`."""
+    ids = [
+        row[0]
+        for row in database.execute_sql(
+            f"SELECT id FROM sourcefile WHERE {where} ORDER BY id"
+        ).fetchall()
+    ]
+    for start in range(0, len(ids), MOVE_CHUNK_SIZE):
+        chunk = ids[start : start + MOVE_CHUNK_SIZE]
+        yield chunk[0], chunk[-1]
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            """
+            CREATE TABLE IF NOT EXISTS sourcefileblob (
+                id SERIAL PRIMARY KEY,
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                sourcefile_id INTEGER NOT NULL REFERENCES sourcefile(id) ON DELETE CASCADE,
+                image_data BYTEA,
+                audio_data BYTEA
+            )
+            """
+        )
+        migrator.sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS sourcefileblob_sourcefile_id "
+            "ON sourcefileblob (sourcefile_id)"
+        )
+
+        has_blob_columns = database.execute_sql(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'sourcefile' AND column_name = 'audio_data'"
+        ).fetchone()
+        if has_blob_columns:
+            for first_id, last_id in _chunk_bounds(
+                database, "image_data IS NOT NULL OR audio_data IS NOT NULL"
+            ):
+                migrator.sql(
+                    "INSERT INTO sourcefileblob (sourcefile_id, image_data, audio_data) "
+                    "SELECT id, image_data, audio_data FROM sourcefile "
+                    "WHERE id BETWEEN %s AND %s "
+                    "AND (image_data IS NOT NULL OR audio_data IS NOT NULL) "
+                    "ON CONFLICT (sourcefile_id) DO NOTHING",
+                    first_id,
+                    last_id,
+                )
+
+        migrator.sql("ALTER TABLE sourcefile DROP COLUMN IF EXISTS image_data")
+        migrator.sql("ALTER TABLE sourcefile DROP COLUMN IF EXISTS audio_data")
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("ALTER TABLE sourcefile ADD COLUMN IF NOT EXISTS image_data BYTEA")
+        migrator.sql("ALTER TABLE sourcefile ADD COLUMN IF NOT EXISTS audio_data BYTEA")
+        for first_id, last_id in _chunk_bounds(
+            database, "id IN (SELECT sourcefile_id FROM sourcefileblob)"
+        ):
+            migrator.sql(
+                "UPDATE sourcefile AS s "
+                "SET image_data = b.image_data, audio_data = b.audio_data "
+                "FROM sourcefileblob AS b "
+                "WHERE b.sourcefile_id = s.id AND s.id BETWEEN %s AND %s",
+                first_id,
+                last_id,
+            )
+        migrator.sql("DROP TABLE IF EXISTS sourcefileblob")
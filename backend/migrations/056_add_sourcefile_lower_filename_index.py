@@ -0,0 +1,27 @@
+"""Index sourcefile (sourcedir_id, lower(filename)).
+
+Sourcefile navigation (utils.sourcedir_utils._navigation_rows) and directory
+listings order a directory's files by LOWER(filename), which no index covered.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            "CREATE INDEX IF NOT EXISTS sourcefile_sourcedir_id_lower_filename "
+            "ON sourcefile (sourcedir_id, lower(filename))"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP INDEX IF EXISTS sourcefile_sourcedir_id_lower_filename")
@@ -0,0 +1,47 @@
+"""Add content_hash (sha256 hex of audio_data) to lemmaaudio and sentenceaudio.
+
+The audio endpoints use it as a strong ETag (utils/audio_http.py), so a
+matching If-None-Match gets a 304 without reading the blob. New variants get
+it from the models' save(); existing rows are hashed in Postgres, in chunks
+of ids so no single UPDATE holds every blob.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+BACKFILL_CHUNK_SIZE = 500
+TABLES = ("lemmaaudio", "sentenceaudio")
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        for table in TABLES:
+            migrator.sql(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)"
+            )
+            ids = [
+                row[0]
+                for row in database.execute_sql(
+                    f"SELECT id FROM {table} ORDER BY id"
+                ).fetchall()
+            ]
+            for start in range(0, len(ids), BACKFILL_CHUNK_SIZE):
+                chunk = ids[start : start + BACKFILL_CHUNK_SIZE]
+                migrator.sql(
+                    f"UPDATE {table} SET content_hash = encode(sha256(audio_data), 'hex') "
+                    "WHERE id BETWEEN %s AND %s AND audio_data IS NOT NULL",
+                    chunk[0],
+                    chunk[-1],
+                )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        for table in TABLES:
+            migrator.sql(f"ALTER TABLE {table} DROP COLUMN IF EXISTS content_hash")
@@ -0,0 +1,97 @@
+"""Prepare the audio tables for the content-addressed blob store.
+
+Audio bytes move out of Postgres into the blob store (utils/blob_store.py),
+keyed by their sha256. Rows then only keep the hash, size and mime type:
+
+- lemmaaudio/sentenceaudio already have content_hash (057); this adds
+  audio_size and mime_type, and makes audio_data nullable, since it's emptied
+  once a row's bytes are in the store
+- sourcefileblob gets audio_hash, audio_size and audio_mime_type
+
+Existing rows are backfilled in Postgres, in chunks of ids. Moving the bytes
+themselves needs the store, so that's done by `flask move-audio-to-store`
+(resumable) and checked by `flask verify-audio-store`, not here.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+BACKFILL_CHUNK_SIZE = 500
+VARIANT_TABLES = ("lemmaaudio", "sentenceaudio")
+
+
+def _id_chunks(database: pw.Database, table: str, where: str):
+    ids = [
+        row[0]
+        for row in database.execute_sql(
+            f"SELECT id FROM {table} WHERE {where} ORDER BY id"
+        ).fetchall()
+    ]
+    for start in range(0, len(ids), BACKFILL_CHUNK_SIZE):
+        chunk = ids[start : start + BACKFILL_CHUNK_SIZE]
+        yield chunk[0], chunk[-1]
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        for table in VARIANT_TABLES:
+            migrator.sql(f"ALTER TABLE {table} ALTER COLUMN audio_data DROP NOT NULL")
+            migrator.sql(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS audio_size INTEGER"
+            )
+            migrator.sql(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS mime_type "
+                "VARCHAR(255) NOT NULL DEFAULT 'audio/mpeg'"
+            )
+            for first_id, last_id in _id_chunks(
+                database, table, "audio_data IS NOT NULL"
+            ):
+                migrator.sql(
+                    f"UPDATE {table} SET audio_size = octet_length(audio_data) "
+                    "WHERE id BETWEEN %s AND %s AND audio_data IS NOT NULL",
+                    first_id,
+                    last_id,
+                )
+
+        migrator.sql(
+            "ALTER TABLE sourcefileblob "
+            "ADD COLUMN IF NOT EXISTS audio_hash VARCHAR(64), "
+            "ADD COLUMN IF NOT EXISTS audio_size INTEGER, "
+            "ADD COLUMN IF NOT EXISTS audio_mime_type VARCHAR(255)"
+        )
+        for first_id, last_id in _id_chunks(
+            database, "sourcefileblob", "audio_data IS NOT NULL"
+        ):
+            migrator.sql(
+                "UPDATE sourcefileblob SET "
+                "audio_hash = encode(sha256(audio_data), 'hex'), "
+                "audio_size = octet_length(audio_data), "
+                "audio_mime_type = 'audio/mpeg' "
+                "WHERE id BETWEEN %s AND %s AND audio_data IS NOT NULL",
+                first_id,
+                last_id,
+            )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Drop the new columns.
+
+    Rows already moved to the blob store have no bytes left in audio_data, so
+    audio_data stays nullable; copy those back before relying on it.
+    """
+    if fake:
+        return
+
+    with database.atomic():
+        for table in VARIANT_TABLES:
+            migrator.sql(f"ALTER TABLE {table} DROP COLUMN IF EXISTS audio_size")
+            migrator.sql(f"ALTER TABLE {table} DROP COLUMN IF EXISTS mime_type")
+        migrator.sql(
+            "ALTER TABLE sourcefileblob "
+            "DROP COLUMN IF EXISTS audio_hash, "
+            "DROP COLUMN IF EXISTS audio_size, "
+            "DROP COLUMN IF EXISTS audio_mime_type"
+        )
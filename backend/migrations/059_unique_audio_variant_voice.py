@@ -0,0 +1,45 @@
+"""One audio variant per voice for each lemma and sentence.
+
+ensure_lemma/sentence_audio_variants now insert every new voice in one
+statement and rely on a unique (owner, metadata->>'voice_name') index to skip
+voices a concurrent request stored first, instead of checking each voice
+beforehand.
+
+Duplicates left by earlier races are deleted first, keeping the oldest row
+(lowest id) for each voice. Rows without a voice_name are left alone, as NULLs
+don't conflict.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+# table -> owner column
+VARIANT_TABLES = {"lemmaaudio": "lemma_id", "sentenceaudio": "sentence_id"}
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        for table, owner in VARIANT_TABLES.items():
+            migrator.sql(
+                f"DELETE FROM {table} a USING {table} b "
+                f"WHERE a.{owner} = b.{owner} "
+                "AND a.metadata->>'voice_name' = b.metadata->>'voice_name' "
+                "AND a.id > b.id"
+            )
+            migrator.sql(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_{owner}_voice_name "
+                f"ON {table} ({owner}, (metadata->>'voice_name'))"
+            )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Drop the unique indexes (deleted duplicates are not restored)."""
+    if fake:
+        return
+
+    with database.atomic():
+        for table, owner in VARIANT_TABLES.items():
+            migrator.sql(f"DROP INDEX IF EXISTS {table}_{owner}_voice_name")
@@ -0,0 +1,38 @@
+"""Cache the whole text tab (enhanced text and wordforms) in sourcefilerecognition.
+
+Previously only the recognized-word spans were cached, and validating them
+needed the linked wordforms, so every request still loaded the wordforms and
+rebuilt the enhanced-text HTML. The cache row now also holds those, and its
+`links_stamp` is computed in SQL from the links' count and `updated_at`s,
+so a hit is a single query.
+
+Existing rows carry the old stamp format and cache version, so they are
+recomputed on their next request. No backfill is needed.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            "ALTER TABLE sourcefilerecognition ADD COLUMN IF NOT EXISTS enhanced_text TEXT"
+        )
+        migrator.sql(
+            "ALTER TABLE sourcefilerecognition ADD COLUMN IF NOT EXISTS wordforms JSONB"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("ALTER TABLE sourcefilerecognition DROP COLUMN IF EXISTS wordforms")
+        migrator.sql(
+            "ALTER TABLE sourcefilerecognition DROP COLUMN IF EXISTS enhanced_text"
+        )
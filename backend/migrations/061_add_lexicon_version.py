@@ -0,0 +1,43 @@
+"""Create lexiconversion, a per-language counter for the lexicon index.
+
+See utils/lexicon_index.py. Lemma and wordform writes bump their language's
+row, and each worker compares it with the version its in-memory index was
+built at. Previously that check was a COUNT/MAX over the language's
+wordforms on every request, which also missed lemma edits.
+
+No backfill is needed: a missing row reads as version 0, and every worker
+rebuilds its index once on start-up anyway.
+"""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql(
+            """
+            CREATE TABLE IF NOT EXISTS lexiconversion (
+                id SERIAL PRIMARY KEY,
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                target_language_code VARCHAR(255) NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        migrator.sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS lexiconversion_target_language_code "
+            "ON lexiconversion (target_language_code)"
+        )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    if fake:
+        return
+
+    with database.atomic():
+        migrator.sql("DROP TABLE IF EXISTS lexiconversion")
@@ -1,6 +1,7 @@
 """Shared test fixtures and configuration."""
 
 import os
+from contextlib import contextmanager
 from urllib.parse import urlparse
 
 # This has to come at the top, before we import config variables
@@ -16,6 +17,7 @@ from flask import Flask
 from db_models import (
     Lemma,
     Wordform,
+    LemmaForm,
     Sentence,
     SentenceLemma,
     Phrase,
@@ -26,8 +28,13 @@ from db_models import (
     RelatedPhrase,
     Sourcedir,
     Sourcefile,
+    SourcefileBlob,
     SourcefileWordform,
     SourcefilePhrase,
+    SourcefileRecognition,
+    SourcefileJob,
+    LLMResponse,
+    LexiconVersion,
     Profile,
     UserLemma,
 )
@@ -54,6 +61,7 @@ from views.lemma_api import lemma_api_bp
 from views.phrase_api import phrase_api_bp
 from views.sourcedir_api import sourcedir_api_bp
 from views.sourcefile_api import sourcefile_api_bp
+from views.sourcefile_api_processing import sourcefile_processing_api_bp
 from views.sentence_api import sentence_api_bp
 from views.learn_api import learn_api_bp
 from tests.mocks.search_mocks import mock_quick_search_for_wordform
@@ -68,6 +76,7 @@ from utils.env_config import (
 MODELS = [
     Lemma,
     Wordform,
+    LemmaForm,
     Sentence,
     LemmaAudio,
     SentenceAudio,
@@ -78,8 +87,13 @@ MODELS = [
     RelatedPhrase,
     Sourcedir,
     Sourcefile,
+    SourcefileBlob,
     SourcefileWordform,
     SourcefilePhrase,
+    SourcefileRecognition,
+    SourcefileJob,
+    LLMResponse,
+    LexiconVersion,
     Profile,
     UserLemma,
 ]
@@ -180,6 +194,31 @@ def clean_tables(fixture_for_testing_db):
     yield
 
 
+@pytest.fixture
+def count_queries(fixture_for_testing_db):
+    """Record the SQL run against the test database.
+
+    Use as `with count_queries() as statements:`; each block records into a
+    fresh list, and nothing is recorded outside it.
+    """
+    database_class = type(fixture_for_testing_db)
+    execute_sql = database_class.execute_sql
+
+    @contextmanager
+    def recording():
+        statements = []
+
+        def counting_execute_sql(self, sql, *args, **kwargs):
+            statements.append(sql)
+            return execute_sql(self, sql, *args, **kwargs)
+
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr(database_class, "execute_sql", counting_execute_sql)
+            yield statements
+
+    return recording
+
+
 @pytest.fixture
 def test_data(fixture_for_testing_db):
     """Create test data in the database."""
@@ -219,6 +258,7 @@ def client(fixture_for_testing_db):
     app.register_blueprint(phrase_api_bp)
     app.register_blueprint(sourcedir_api_bp)
     app.register_blueprint(sourcefile_api_bp)
+    app.register_blueprint(sourcefile_processing_api_bp)
     app.register_blueprint(sentence_api_bp)
     app.register_blueprint(learn_api_bp)
 
@@ -304,6 +344,8 @@ def mock_tts_autouse(monkeypatch):
         if mp3_filen:
             with open(mp3_filen, "wb") as f:
                 f.write(b"fake mp3 data")
+        # Like ElevenLabs, return the audio as an iterator of chunks
+        return iter([b"fake mp3 data"])
 
     monkeypatch.setattr(
         "gjdutils.outloud_text_to_speech.outloud_elevenlabs", _fake_outloud
@@ -368,6 +410,25 @@ def mock_llm_autouse(monkeypatch):
                 "example_usage": [],
                 "example_wordforms": ["test"],
             }, {}
+        if template_name == "metadata_for_lemmas":
+            lemmas = (kwargs.get("context_d") or {}).get("lemmas", [])
+            return {
+                "lemmas": [
+                    {
+                        "input_lemma": lemma,
+                        "lemma": lemma,
+                        "translations": ["test"],
+                        "part_of_speech": "noun",
+                        "etymology": "",
+                        "commonality": 0.5,
+                        "guessability": 0.5,
+                        "register": "neutral",
+                        "example_usage": [],
+                        "example_wordforms": [lemma],
+                    }
+                    for lemma in lemmas
+                ]
+            }, {}
         if template_name == "generate_sentence_flashcards":
             # Minimal, well-formed fake sentences for Learn flow
             return {
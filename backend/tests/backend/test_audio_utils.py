@@ -1,4 +1,6 @@
 from pathlib import Path
+import threading
+
 import pytest
 from unittest.mock import MagicMock
 from tests.mocks.audio_mocks import mock_openai_whisper, mock_elevenlabs
@@ -22,6 +24,7 @@ from db_models import (
     LemmaAudio,
 )
 from config import MAX_AUDIO_SIZE_FOR_STORAGE
+from tests.fixtures_for_tests import create_test_sentence
 from utils.exceptions import AuthenticationRequiredForGenerationError
 
 
@@ -177,20 +180,75 @@ def test_ensure_audio_data(mock_elevenlabs):
     ]
 
 
-@pytest.mark.skip(reason="Low-value unit test - requires complex db binding; audio tested via API")
 def test_ensure_model_audio_data_for_sourcefiles(
-    mock_elevenlabs, fixture_for_testing_db, test_sourcedir, client
+    fixture_for_testing_db, test_sourcedir, client, monkeypatch
 ):
-    """Ensure legacy sourcefile audio generation behaves as expected."""
-    pass
+    """Existing sourcefile audio is detected without downloading it."""
 
+    def make_sourcefile(filename, audio_data):
+        sourcefile = Sourcefile.create(
+            sourcedir=test_sourcedir,
+            filename=filename,
+            text_target="Γεια σου",
+            text_english="",
+            metadata={},
+            sourcefile_type="audio",
+            audio_data=audio_data,
+        )
+        return Sourcefile.get_by_id(sourcefile.id)
 
-@pytest.mark.skip(reason="Low-value unit test - requires complex db binding; audio tested via API")
-def test_ensure_sentence_audio_variants(
-    mock_elevenlabs, fixture_for_testing_db, client
-):
-    """Test sentence audio variant generation."""
-    pass
+    with_audio = make_sourcefile("with.mp3", b"mp3 bytes")
+    without_audio = make_sourcefile("without.mp3", None)
+
+    def no_download(self, name):
+        pytest.fail(f"{name} was downloaded")
+
+    monkeypatch.setattr(Sourcefile, "_load_blob", no_download)
+    with client.application.test_request_context():
+        ensure_model_audio_data(with_audio)  # already has audio: nothing to do
+        with pytest.raises(AuthenticationRequiredForGenerationError):
+            ensure_model_audio_data(without_audio)
+
+
+def test_ensure_sentence_audio_variants(fixture_for_testing_db, client, monkeypatch):
+    """Missing voices are generated concurrently and stored once each."""
+    sentence = create_test_sentence(fixture_for_testing_db)  # has a TestVoice variant
+
+    # Every call waits for the other two, so this fails (rather than hangs) if
+    # the voices are generated one after another
+    all_started = threading.Barrier(3)
+
+    def concurrent_outloud(text, api_key, mp3_filen=None, bot_name=None, **kwargs):
+        assert mp3_filen is None  # audio is kept in memory
+        all_started.wait(timeout=5)
+        return iter([bot_name.encode(), b" audio"])
+
+    monkeypatch.setattr("utils.audio_utils.outloud_elevenlabs", concurrent_outloud)
+
+    with client.application.test_request_context():
+        variants, created = ensure_sentence_audio_variants(
+            sentence, n=4, enforce_auth=False
+        )
+
+    assert created == 3
+    new_variants = [v for v in variants if v.metadata["voice_name"] != "TestVoice"]
+    assert len(new_variants) == 3
+    for variant in new_variants:
+        voice_name = variant.metadata["voice_name"]
+        assert variant.audio_data == f"{voice_name} audio".encode()
+
+    # A voice the sentence already has is skipped by the unique index
+    voice_name = new_variants[0].metadata["voice_name"]
+    duplicate = {
+        "sentence": sentence,
+        "provider": "elevenlabs",
+        "audio_data": b"again",
+        "metadata": {"voice_name": voice_name},
+    }
+    other = {**duplicate, "metadata": {"voice_name": "OtherVoice"}}
+    inserted = SentenceAudio.insert_variants([duplicate, other])
+    assert [v.metadata["voice_name"] for v in inserted] == ["OtherVoice"]
+    assert SentenceAudio.select().where(SentenceAudio.sentence == sentence).count() == 5
 
 
 @pytest.mark.skip(reason="Low-value unit test - requires complex db binding; audio tested via API")
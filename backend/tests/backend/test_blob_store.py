@@ -0,0 +1,159 @@
+import hashlib
+import io
+
+import pytest
+
+from db_models import SentenceAudio, Sourcedir, Sourcefile, SourcefileBlob
+from tests.fixtures_for_tests import TEST_TARGET_LANGUAGE_CODE, create_test_sentence
+from utils.audio_blob_migration import move_audio_to_store, verify_audio_store
+from utils.blob_store import BlobNotFound, FilesystemBlobStore, S3BlobStore
+
+AUDIO = b"test audio data"
+AUDIO_HASH = hashlib.sha256(AUDIO).hexdigest()
+
+
+@pytest.fixture
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUDIO_BLOB_STORE", f"file://{tmp_path}")
+    return tmp_path
+
+
+def _legacy_column(model, row_id):
+    return model.select(model.legacy_audio_data).where(model.id == row_id).scalar()
+
+
+def test_filesystem_store_is_content_addressed(tmp_path):
+    store = FilesystemBlobStore(tmp_path)
+
+    blob = store.put(AUDIO)
+    assert store.put(AUDIO) == blob
+    assert blob == (AUDIO_HASH, 15, "audio/mpeg")
+    shard = tmp_path / AUDIO_HASH[:2] / AUDIO_HASH[2:4]
+    assert store.path_for(AUDIO_HASH) == shard / AUDIO_HASH
+    assert store.get(AUDIO_HASH) == AUDIO
+
+    store.delete(AUDIO_HASH)
+    assert not store.exists(AUDIO_HASH)
+    with pytest.raises(BlobNotFound):
+        store.open(AUDIO_HASH)
+
+
+class _FakeS3Client:
+    """The part of boto3's S3 client that S3BlobStore uses."""
+
+    class NoSuchKey(Exception):
+        response = {"Error": {"Code": "NoSuchKey"}}
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[(Bucket, Key)] = (bytes(Body), ContentType)
+
+    def _get(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NoSuchKey(Key)
+        return self.objects[(Bucket, Key)]
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self._get(Bucket, Key)[0])}
+
+    def head_object(self, Bucket, Key):
+        self._get(Bucket, Key)
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def test_s3_store_shards_keys_under_prefix():
+    client = _FakeS3Client()
+    store = S3BlobStore("audio", "/hz/", client=client)
+
+    store.put(AUDIO)
+    key = f"hz/{AUDIO_HASH[:2]}/{AUDIO_HASH[2:4]}/{AUDIO_HASH}"
+    assert client.objects[("audio", key)] == (AUDIO, "audio/mpeg")
+    assert store.get(AUDIO_HASH) == AUDIO
+    store.delete(AUDIO_HASH)
+    assert not store.exists(AUDIO_HASH)
+    with pytest.raises(BlobNotFound):
+        store.open(AUDIO_HASH)
+
+
+def test_audio_is_written_to_and_served_from_the_store(
+    client, fixture_for_testing_db, blob_dir
+):
+    sentence = create_test_sentence(fixture_for_testing_db)
+    variant = SentenceAudio.get(SentenceAudio.sentence == sentence)
+
+    # Only the hash, size and type are in Postgres
+    assert _legacy_column(SentenceAudio, variant.id) is None
+    assert (variant.content_hash, variant.audio_size) == (AUDIO_HASH, len(AUDIO))
+    assert FilesystemBlobStore(blob_dir).get(AUDIO_HASH) == AUDIO
+
+    response = client.get(
+        f"/api/lang/sentence/{TEST_TARGET_LANGUAGE_CODE}/{sentence.id}"
+        f"/audio?variant_id={variant.id}",
+        headers={"Range": "bytes=5-9"},
+    )
+    assert response.status_code == 206
+    assert response.data == b"audio"
+
+    # A blob missing from the store is a 404, not an empty (cacheable) body
+    store = FilesystemBlobStore(blob_dir)
+    store.delete(AUDIO_HASH)
+    response = client.get(
+        f"/api/lang/sentence/{TEST_TARGET_LANGUAGE_CODE}/{sentence.id}"
+        f"/audio?variant_id={variant.id}"
+    )
+    assert response.status_code == 404
+    assert "immutable" not in response.headers["Cache-Control"]
+    store.put(AUDIO)
+
+    sourcedir = Sourcedir.create(
+        path="blobs", target_language_code=TEST_TARGET_LANGUAGE_CODE
+    )
+    sourcefile = Sourcefile.create(
+        sourcedir=sourcedir,
+        filename="talk.mp3",
+        text_target="",
+        text_english="",
+        metadata={},
+        sourcefile_type="audio",
+        audio_data=AUDIO,
+    )
+    blob_row = SourcefileBlob.get(SourcefileBlob.sourcefile == sourcefile)
+    assert (blob_row.audio_data, blob_row.audio_hash) == (None, AUDIO_HASH)
+    reloaded = Sourcefile.get_by_id(sourcefile.id)
+    assert reloaded.media_flags()["has_audio"]
+    assert reloaded.audio_data == AUDIO
+
+
+def test_move_audio_to_store_resumes_and_verifies(
+    fixture_for_testing_db, tmp_path, monkeypatch
+):
+    # Written before a store was configured
+    sentences = [
+        create_test_sentence(
+            fixture_for_testing_db, lemma_words=[f"lemma{i}"], sentence=f"Sentence {i}"
+        )
+        for i in range(3)
+    ]
+    assert all(_legacy_column(SentenceAudio, v.id) for v in SentenceAudio.select())
+    store = FilesystemBlobStore(tmp_path)
+
+    # An interrupted run picks up where it stopped
+    assert move_audio_to_store(store, batch_size=2, limit=2) == {"sentenceaudio": 2}
+    assert move_audio_to_store(store, batch_size=2) == {"sentenceaudio": 1}
+    assert move_audio_to_store(store) == {}
+    assert not any(_legacy_column(SentenceAudio, v.id) for v in SentenceAudio.select())
+
+    report = verify_audio_store(store)
+    assert (report.checked, report.ok) == (3, True)
+
+    # All three variants have the same bytes, so share one blob
+    monkeypatch.setenv("AUDIO_BLOB_STORE", f"file://{tmp_path}")
+    assert SentenceAudio.get(SentenceAudio.sentence == sentences[0]).audio_data == AUDIO
+    store.path_for(AUDIO_HASH).write_bytes(b"truncated")
+    assert len(verify_audio_store(store).corrupt) == 3
+    store.delete(AUDIO_HASH)
+    assert len(verify_audio_store(store).missing) == 3
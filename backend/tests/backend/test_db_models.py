@@ -1,5 +1,13 @@
 import pytest
-from db_models import Sourcefile, Sourcedir, Lemma, Wordform, Phrase
+from db_models import (
+    Sourcefile,
+    SourcefileBlob,
+    Sourcedir,
+    Lemma,
+    LemmaForm,
+    Wordform,
+    Phrase,
+)
 
 
 def test_json_field_handling(fixture_for_testing_db):
@@ -65,3 +73,250 @@ def test_json_field_handling(fixture_for_testing_db):
     # Verify nested JSON structures
     assert isinstance(phrase.component_words, list)
     assert phrase.component_words[0]["notes"] == "test note"
+
+
+def test_lemma_form_index_backs_get_lemma_for_wordform(fixture_for_testing_db):
+    """Headwords, wordforms and single-word related forms resolve via one indexed lookup."""
+    from utils.store_utils import get_lemma_for_wordform, save_lemma_metadata
+
+    save_lemma_metadata(
+        "τρώω",
+        {
+            "translations": ["eat"],
+            "related_words_phrases_idioms": [
+                {"lemma": "τροφή", "translation": "food"},
+                {"lemma": "τρώω τα λόγια μου", "translation": "mumble"},
+            ],
+        },
+        "el",
+    )
+    wordform, _ = Wordform.get_or_create_from_metadata(
+        wordform="έφαγα",
+        target_language_code="el",
+        metadata={"lemma": "τρώω", "translations": ["I ate"]},
+    )
+
+    assert get_lemma_for_wordform("ΈΦΑΓΑ", "el") == "τρώω"
+    # Related forms are found even though there is no Wordform row for them
+    assert get_lemma_for_wordform("Τροφή", "el") == "τρώω"
+    # Multi-word related entries are not indexed
+    assert get_lemma_for_wordform("τρώω τα λόγια μου", "el") is None
+    assert get_lemma_for_wordform("τροφή", "es") is None
+
+    # Re-pointing the wordform at another lemma moves its index row
+    Wordform.get_or_create_from_metadata(
+        wordform="έφαγα",
+        target_language_code="el",
+        metadata={"lemma": "φάω", "translations": ["I ate"]},
+    )
+    assert [
+        (row.lemma.lemma, row.source)
+        for row in LemmaForm.select().where(LemmaForm.wordform == wordform)
+    ] == [("φάω", "wordform")]
+
+    # Dropping a related form from the metadata removes it from the index
+    save_lemma_metadata("τρώω", {"related_words_phrases_idioms": []}, "el")
+    assert LemmaForm.find_lemma("τροφή", "el") is None
+
+
+def test_update_or_create_is_a_single_upsert(count_queries):
+    with count_queries() as statements:
+        lemma, created = Lemma.update_or_create(
+            lookup={"lemma": "Νέος", "target_language_code": "el"},
+            updates={"translations": ["new"]},
+        )
+    assert created is True
+    # The upsert, then after_write() bumping the lexicon version
+    assert [sql.split()[0] for sql in statements] == ["INSERT", "INSERT"]
+    assert "ON CONFLICT" in statements[0]
+    assert "lexiconversion" in statements[1]
+    assert lemma.lemma_norm == "νεος"
+    assert not lemma.is_dirty()
+
+    with count_queries() as statements:
+        again, created = Lemma.update_or_create(
+            lookup={"lemma": "Νέος", "target_language_code": "el"},
+            updates={"translations": ["young"]},
+        )
+    assert len(statements) == 2
+    assert created is False
+    assert again.id == lemma.id
+    assert again.translations == ["young"]
+    assert again.created_at == lemma.created_at
+    assert again.updated_at > lemma.updated_at
+
+    # No updates leaves the row (and updated_at) alone
+    with count_queries() as statements:
+        unchanged, created = Lemma.update_or_create(
+            lookup={"lemma": "Νέος", "target_language_code": "el"}, updates={}
+        )
+    assert len(statements) == 2
+    assert created is False
+    assert unchanged.updated_at == again.updated_at
+
+
+def test_update_or_create_keeps_derived_fields_and_created_by(
+    fixture_for_testing_db, monkeypatch
+):
+    user_id = "123e4567-e89b-12d3-a456-426614174000"
+    fixture_for_testing_db.execute_sql(
+        "INSERT INTO auth.users (id) VALUES (%s) ON CONFLICT DO NOTHING", (user_id,)
+    )
+    monkeypatch.setattr(Phrase, "current_user_id", staticmethod(lambda: user_id))
+    phrase, created = Phrase.update_or_create(
+        lookup={"canonical_form": "τι κάνεις", "target_language_code": "el"},
+        updates={"raw_forms": [], "translations": [], "part_of_speech": "phrase"},
+    )
+    assert created is True
+    assert phrase.slug == "ti-kaneis"
+    assert str(phrase.created_by_id) == user_id
+
+    Phrase.update(slug="custom").where(Phrase.id == phrase.id).execute()
+    monkeypatch.setattr(Phrase, "current_user_id", staticmethod(lambda: None))
+    phrase, created = Phrase.update_or_create(
+        lookup={"canonical_form": "τι κάνεις", "target_language_code": "el"},
+        updates={
+            "raw_forms": ["τι κάνεις;"],
+            "translations": ["how are you"],
+            "part_of_speech": "phrase",
+        },
+    )
+    assert created is False
+    assert phrase.slug == "custom"  # as save() keeps an existing slug
+    assert str(phrase.created_by_id) == user_id
+
+    # A partial update can't be inserted (raw_forms is NOT NULL), so it falls
+    # back to updating the fetched row
+    phrase, created = Phrase.update_or_create(
+        lookup={"canonical_form": "τι κάνεις", "target_language_code": "el"},
+        updates={"usage_notes": "informal"},
+    )
+    assert (created, phrase.usage_notes, phrase.raw_forms) == (
+        False,
+        "informal",
+        ["τι κάνεις;"],
+    )
+
+
+
+def test_fills_required_fields_only_inspects_the_data(monkeypatch):
+    def fail(self):
+        raise AssertionError("the check must not prepare an instance")
+
+    monkeypatch.setattr(Phrase, "prepare_for_write", fail)
+    # slug is derived and the timestamps have defaults
+    assert Phrase._fills_required_fields(
+        {
+            "canonical_form": "τι κάνεις",
+            "target_language_code": "el",
+            "raw_forms": [],
+            "translations": [],
+            "part_of_speech": "phrase",
+        }
+    )
+    assert not Phrase._fills_required_fields(
+        {"canonical_form": "τι κάνεις", "target_language_code": "el"}
+    )
+    # FKs count under either name, and an explicit None doesn't fill a field
+    assert SourcefileBlob._fills_required_fields({"sourcefile_id": 1})
+    assert not SourcefileBlob._fills_required_fields({"sourcefile": None})
+
+
+def test_bulk_update_or_create(fixture_for_testing_db):
+    lemma = Lemma.create(lemma="νέος", target_language_code="el")
+    existing = Wordform.create(
+        wordform="νέα", target_language_code="el", translations=["new (f)"]
+    )
+
+    results = Wordform.bulk_update_or_create(
+        [
+            {"wordform": "νέος", "target_language_code": "el", "lemma_entry": lemma},
+            {"wordform": "νέα", "target_language_code": "el", "lemma_entry": lemma},
+            # NFC-normalized like save(), so the same word as the first row
+            {
+                "wordform": "νέος",
+                "target_language_code": "el",
+                "lemma_entry": lemma,
+            },
+        ],
+        lookup_fields=["wordform", "target_language_code"],
+    )
+
+    assert [(w.wordform, created) for w, created in results] == [
+        ("νέος", True),
+        ("νέα", False),
+        ("νέος", True),
+    ]
+    assert results[1][0].id == existing.id
+    assert results[1][0].translations == ["new (f)"]
+    assert Wordform.select().count() == 2
+    assert all(w.lemma_entry_id == lemma.id for w, _ in results)
+    assert results[0][0].wordform_norm == "νεος"
+
+    with pytest.raises(ValueError):
+        Wordform.bulk_update_or_create(
+            [{"target_language_code": "el"}], lookup_fields=["target_language_code"]
+        )
+
+
+def test_sourcefile_blobs_are_loaded_only_on_access(count_queries):
+    sourcedir = Sourcedir.create(path="blob_dir", target_language_code="el")
+    image = Sourcefile.create(
+        sourcedir=sourcedir,
+        filename="page.jpg",
+        text_target="",
+        text_english="",
+        metadata={},
+        sourcefile_type="image",
+        image_data=b"jpeg bytes",
+    )
+    Sourcefile.create(
+        sourcedir=sourcedir,
+        filename="note.txt",
+        text_target="γεια",
+        text_english="hi",
+        metadata={},
+        sourcefile_type="text",
+    )
+    # Text files don't get a blob row
+    assert SourcefileBlob.select().count() == 1
+
+    with count_queries() as statements:
+        loaded = Sourcefile.get_by_id(image.id)
+        assert "image_data" not in statements[0]
+        assert loaded.media_flags() == {"has_image": True, "has_audio": False}
+        assert '"image_data" IS NOT NULL' in statements[1]
+        assert len(statements) == 2
+
+        assert bytes(loaded.image_data) == b"jpeg bytes"
+        assert bytes(loaded.image_data) == b"jpeg bytes"  # loaded once
+        assert len(statements) == 3
+
+    loaded.audio_data = b"mp3 bytes"
+    loaded.save()
+    reloaded = Sourcefile.get_by_id(image.id)
+    assert (bytes(reloaded.image_data), bytes(reloaded.audio_data)) == (
+        b"jpeg bytes",
+        b"mp3 bytes",
+    )
+
+
+def test_sourcefile_and_its_blob_are_saved_together(fixture_for_testing_db, monkeypatch):
+    sourcedir = Sourcedir.create(path="atomic_dir", target_language_code="el")
+
+    def failing_blob_write(*args, **kwargs):
+        raise RuntimeError("blob write failed")
+
+    monkeypatch.setattr(SourcefileBlob, "update_or_create", failing_blob_write)
+    with pytest.raises(RuntimeError):
+        Sourcefile.create(
+            sourcedir=sourcedir,
+            filename="page.jpg",
+            text_target="",
+            text_english="",
+            metadata={},
+            sourcefile_type="image",
+            image_data=b"jpeg bytes",
+        )
+    # No sourcefile row left behind without its image
+    assert Sourcefile.select().where(Sourcefile.sourcedir == sourcedir).count() == 0
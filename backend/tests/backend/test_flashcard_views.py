@@ -9,6 +9,7 @@ from db_models import (
     SourcefileWordform,
     Wordform,
     Sentence,
+    SentenceAudio,
 )
 from tests.fixtures_for_tests import TEST_TARGET_LANGUAGE_CODE, create_test_sentence
 from views.flashcard_views import (
@@ -17,6 +18,7 @@ from views.flashcard_views import (
     flashcard_sentence_vw,
 )
 from tests.backend.utils_for_testing import build_url_with_query
+from utils.flashcard_utils import get_flashcard_sentence_data
 
 
 @pytest.fixture
@@ -332,3 +334,31 @@ def test_sourcedir_multiple_files(
         f'window.sourcedir = "{test_sourcedir_with_files.slug}"'.encode()
         in response.data
     )
+
+
+def test_flashcard_audio_never_selects_audio_bytes(
+    client, fixture_for_testing_db, count_queries
+):
+    sentence = create_test_sentence(fixture_for_testing_db)
+    for voice_name in ("Voice2", "Voice3"):
+        SentenceAudio.create(
+            sentence=sentence,
+            audio_data=b"test audio data",
+            metadata={"provider": "elevenlabs", "voice_name": voice_name},
+        )
+
+    with count_queries() as statements:
+        with client.application.test_request_context():
+            data = get_flashcard_sentence_data(
+                TEST_TARGET_LANGUAGE_CODE, sentence.slug
+            )
+    assert data["audio_url"]
+    assert not any('"audio_data"' in sql for sql in statements)
+
+    # Playing a random variant reads exactly one blob, without ORDER BY random()
+    with count_queries() as statements:
+        response = client.get(data["audio_url"], follow_redirects=True)
+    assert response.status_code == 200
+    assert response.data == b"test audio data"
+    assert sum('"audio_data"' in sql for sql in statements) == 1
+    assert not any("RANDOM()" in sql.upper() for sql in statements)
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("ahocorasick")
+
+from utils import known_word_automata
+from utils.known_word_automata import get_automaton_for_forms
+
+
+@pytest.fixture(autouse=True)
+def isolated_automata():
+    known_word_automata._automata.clear()
+    yield
+    known_word_automata._automata.clear()
+
+
+def test_automaton_is_reused_for_same_form_set():
+    first = get_automaton_for_forms("th", ["ของขวัญ", "ลมหายใจ"])
+    # Order and duplicates don't change the fingerprint
+    assert get_automaton_for_forms("th", ["ลมหายใจ", "ของขวัญ", "ลมหายใจ"]) is first
+    # A changed set is a different automaton
+    assert get_automaton_for_forms("th", ["ของขวัญ"]) is not first
+
+
+def test_scan_returns_offsets():
+    automaton = get_automaton_for_forms("zh", ["你好", "世界"])
+    assert automaton.scan("你好世界") == [(0, 2, "你好"), (2, 4, "世界")]
+    assert automaton.scan("再见") == []
+    assert get_automaton_for_forms("zh", []).scan("你好") == []
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(known_word_automata, "KNOWN_WORD_AUTOMATON_CACHE_SIZE", 2)
+    first = get_automaton_for_forms("ja", ["学生"])
+    get_automaton_for_forms("ja", ["テスト"])
+    get_automaton_for_forms("ja", ["私"])
+    assert len(known_word_automata._automata) == 2
+    assert get_automaton_for_forms("ja", ["学生"]) is not first
+
@@ -2,7 +2,7 @@ import pytest
 from peewee import DoesNotExist
 from peewee import fn
 
-from views.lemma_api import delete_lemma_api
+from views.lemma_api import delete_lemma_api, complete_lemmas_metadata_api
 from db_models import (
     Lemma,
     Wordform,
@@ -11,7 +11,7 @@ from db_models import (
     SentenceLemma,
 )
 from tests.fixtures_for_tests import TEST_TARGET_LANGUAGE_CODE, SAMPLE_LEMMA_DATA
-from utils.store_utils import load_or_generate_lemma_metadata
+from utils.store_utils import get_lemma_for_wordform, load_or_generate_lemma_metadata
 from tests.backend.utils_for_testing import build_url_with_query
 from views.wordform_views import wordforms_list_vw
 from views.lemma_views import lemmas_list_vw, get_lemma_metadata_vw
@@ -130,6 +130,24 @@ def test_nonexistent_lemma(client):
     assert "was not found" in response.data.decode()
 
 
+def test_lemma_data_resolves_case_but_not_accent_variants(
+    client, fixture_for_testing_db
+):
+    """Lemma lookups ignore case, but a different accent is a different lemma."""
+    Lemma.create(target_language_code=TEST_TARGET_LANGUAGE_CODE, **SAMPLE_LEMMA_DATA)
+
+    for spelling in ("καλός", "ΚΑΛΌΣ"):
+        response = client.get(
+            f"/api/lang/lemma/{TEST_TARGET_LANGUAGE_CODE}/{spelling}/data"
+        )
+        assert response.status_code == 200
+        assert response.get_json()["lemma"] == "καλός"
+
+    response = client.get(f"/api/lang/lemma/{TEST_TARGET_LANGUAGE_CODE}/καλος/data")
+    assert response.status_code == 404
+    assert get_lemma_for_wordform("καλος", TEST_TARGET_LANGUAGE_CODE) is None
+
+
 def test_lemmas_list_sorting(client, fixture_for_testing_db):
     """Test the sorting functionality of the lemmas list view."""
     # Clear any existing lemmas
@@ -383,3 +401,130 @@ def test_load_lemma_metadata_with_none(client, fixture_for_testing_db):
     assert metadata["guessability"] == 0.5
     assert metadata["register"] == "unknown"
     assert metadata["example_usage"] == []
+
+
+def test_complete_lemmas_metadata_batches_and_retries(
+    client, fixture_for_testing_db, monkeypatch
+):
+    """Lemmas are generated several per LLM call (LEMMA_METADATA_BATCH_SIZE = 5),
+    and only the failures are retried."""
+    names = [f"λέξη{i}" for i in range(7)]
+    for name in names:
+        Lemma.create(lemma=name, target_language_code=TEST_TARGET_LANGUAGE_CODE)
+    batches = []
+
+    def fake_generate(*args, **kwargs):
+        requested = kwargs["context_d"]["lemmas"]
+        batches.append(requested)
+        entries = [
+            {"input_lemma": lemma, "translations": [f"word {lemma}"]}
+            for lemma in requested
+            # The first response leaves one lemma out, and mangles another
+            if not (len(batches) == 1 and lemma == "λέξη1")
+        ]
+        if len(batches) == 1:
+            entries[0]["translations"] = []
+        return {"lemmas": entries}, {}
+
+    monkeypatch.setattr(
+        "utils.vocab_llm_utils.generate_gpt_from_template", fake_generate
+    )
+    url = build_url_with_query(
+        client,
+        complete_lemmas_metadata_api,
+        target_language_code=TEST_TARGET_LANGUAGE_CODE,
+    )
+    response = client.post(url, json={"lemmas": names + ["missing"]})
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert batches == [names[:5], names[5:], ["λέξη0", "λέξη1"]]
+    assert sorted(data["lemmas"]) == sorted(names)
+    assert data["failed"] == ["missing"]
+    assert data["lemmas"]["λέξη1"]["translations"] == ["word λέξη1"]
+    assert Lemma.select().where(Lemma.is_complete == True).count() == 7
+
+
+def test_warm_lemma_metadata_returns_at_deadline_and_finishes_in_background(
+    client, fixture_for_testing_db, monkeypatch
+):
+    """Slow batches are reported as pending and still get saved afterwards."""
+    import threading
+    import time
+
+    from flask import g
+    from utils.store_utils import _warmup_inflight, warm_lemma_metadata
+
+    release = threading.Event()
+
+    def fake_generate(*args, **kwargs):
+        requested = kwargs["context_d"]["lemmas"]
+        if "αργή" in requested:
+            release.wait(5)
+        return {
+            "lemmas": [
+                {"input_lemma": lemma, "translations": [f"word {lemma}"]}
+                for lemma in requested
+            ]
+        }, {}
+
+    monkeypatch.setattr(
+        "utils.vocab_llm_utils.generate_gpt_from_template", fake_generate
+    )
+
+    with client.application.test_request_context():
+        g.user = {"id": "00000000-0000-0000-0000-000000000000"}
+        warmup = warm_lemma_metadata(
+            ["γρήγορη", "αργή"],
+            TEST_TARGET_LANGUAGE_CODE,
+            deadline=time.time() + 0.5,
+            batch_size=1,
+        )
+    assert list(warmup.completed) == ["γρήγορη"]
+    assert warmup.pending == ["αργή"]
+
+    inflight = _warmup_inflight[(TEST_TARGET_LANGUAGE_CODE, "αργή")]
+    release.set()
+    assert inflight.result(timeout=5)["αργή"]["translations"] == ["word αργή"]
+    assert Lemma.get(Lemma.lemma == "αργή").is_complete
+
+
+def test_warm_lemma_metadata_caps_and_skips_lemmas_in_flight(
+    client, fixture_for_testing_db, monkeypatch
+):
+    """Only the top lemmas are queued, and not ones being generated elsewhere."""
+    import time
+
+    from flask import g
+    from utils.store_utils import warm_lemma_metadata
+
+    requested = []
+
+    def fake_generate(*args, **kwargs):
+        requested.extend(kwargs["context_d"]["lemmas"])
+        return {
+            "lemmas": [
+                {"input_lemma": lemma, "translations": [f"word {lemma}"]}
+                for lemma in kwargs["context_d"]["lemmas"]
+            ]
+        }, {}
+
+    monkeypatch.setattr(
+        "utils.vocab_llm_utils.generate_gpt_from_template", fake_generate
+    )
+    monkeypatch.setattr(
+        "utils.store_utils.in_flight",
+        lambda keys: {key for key in keys if key[2] == "βουνό"},
+    )
+
+    with client.application.test_request_context():
+        g.user = {"id": "00000000-0000-0000-0000-000000000000"}
+        warmup = warm_lemma_metadata(
+            ["θάλασσα", "βουνό", "ήλιος", "δέντρο"],
+            TEST_TARGET_LANGUAGE_CODE,
+            deadline=time.time() + 5,
+            max_lemmas=3,
+        )
+    assert requested == ["θάλασσα", "ήλιος"]
+    assert sorted(warmup.completed) == ["ήλιος", "θάλασσα"]
+    assert warmup.pending == ["βουνό"]
@@ -0,0 +1,81 @@
+from db_models import Lemma, LexiconVersion, Wordform
+from utils.lexicon_index import (
+    get_lexicon_index,
+    invalidate_lexicon_index,
+    lookup_wordforms_for_tokens,
+)
+
+
+def _create_wordform(wordform: str, lemma: str, lang: str = "el") -> Wordform:
+    wf, _ = Wordform.get_or_create_from_metadata(
+        wordform=wordform,
+        target_language_code=lang,
+        metadata={
+            "lemma": lemma,
+            "translations": [f"{wordform}-en"],
+            "part_of_speech": "noun",
+            "inflection_type": "nominative",
+        },
+    )
+    return wf
+
+
+def test_lookup_is_case_and_accent_insensitive(fixture_for_testing_db):
+    _create_wordform("σπίτι", "σπίτι")
+    _create_wordform("γάτα", "γάτα")
+
+    results = lookup_wordforms_for_tokens("el", ["ΣΠΙΤΙ", "σκύλος"])
+
+    assert [r["wordform"] for r in results] == ["σπίτι"]
+    assert results[0]["lemma"] == "σπίτι"
+    assert results[0]["translations"] == ["σπίτι-en"]
+    assert lookup_wordforms_for_tokens("el", []) == []
+
+
+def test_index_is_rebuilt_after_writes(fixture_for_testing_db, count_queries):
+    _create_wordform("σπίτι", "σπίτι")
+    first = get_lexicon_index("el")
+    # Checking a fresh index is a single one-row lookup
+    with count_queries() as statements:
+        assert get_lexicon_index("el") is first
+    assert len(statements) == 1
+    assert "lexiconversion" in statements[0]
+
+    # Writes through the model invalidate the index
+    _create_wordform("γάτα", "γάτα")
+    assert [r["wordform"] for r in lookup_wordforms_for_tokens("el", ["γατα"])] == [
+        "γάτα"
+    ]
+
+    # So do lemma edits and deletes
+    lemma = Lemma.get(Lemma.lemma == "γάτα")
+    lemma.lemma = "γατούλα"
+    lemma.save()
+    assert lookup_wordforms_for_tokens("el", ["γατα"])[0]["lemma"] == "γατούλα"
+    Wordform.get(Wordform.wordform == "σπίτι").delete_instance()
+    assert lookup_wordforms_for_tokens("el", ["σπιτι"]) == []
+
+
+def test_writes_from_other_workers_are_picked_up(fixture_for_testing_db):
+    _create_wordform("σπίτι", "σπίτι")
+    index = get_lexicon_index("el")
+
+    # Another worker's write only reaches us through the version row
+    Wordform.delete().where(Wordform.wordform == "σπίτι").execute()
+    assert get_lexicon_index("el") is index
+    LexiconVersion.bump(["el"])
+    assert get_lexicon_index("el") is not index
+    assert lookup_wordforms_for_tokens("el", ["σπιτι"]) == []
+    assert LexiconVersion.current("es") == 0
+
+
+def test_indexes_are_per_language(fixture_for_testing_db):
+    _create_wordform("σπίτι", "σπίτι", lang="el")
+    _create_wordform("casa", "casa", lang="es")
+    invalidate_lexicon_index()
+
+    assert lookup_wordforms_for_tokens("es", ["σπίτι"]) == []
+    assert [r["wordform"] for r in lookup_wordforms_for_tokens("es", ["Casa"])] == [
+        "casa"
+    ]
+    assert Lemma.select().count() == 2
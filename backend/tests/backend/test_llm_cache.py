@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from db_models import LLMResponse
+from utils import llm_cache
+from utils.llm_cache import (
+    bypass_llm_cache,
+    get_llm_cache_stats,
+    purge_expired_llm_responses,
+    reset_llm_cache,
+)
+from utils.vocab_llm_utils import translate_to_english
+
+
+@pytest.fixture
+def llm_calls(fixture_for_testing_db, tmp_path, monkeypatch):
+    """Enable the cache (it's off under pytest) and count underlying LLM calls."""
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "1")
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    reset_llm_cache()
+    calls = []
+
+    def fake_generate(*args, **kwargs):
+        calls.append(kwargs["context_d"])
+        return f"translation {len(calls)}", {"usage": len(calls)}
+
+    monkeypatch.setattr(
+        "utils.vocab_llm_utils.generate_gpt_from_template", fake_generate
+    )
+    yield calls
+    reset_llm_cache()
+
+
+def test_repeat_call_is_served_from_each_tier(llm_calls, tmp_path):
+    assert translate_to_english("Καλημέρα", "Greek")[0] == "translation 1"
+    out, extra = translate_to_english("Καλημέρα", "Greek")
+    assert (out, extra["llm_cache"]) == ("translation 1", "memory")
+    assert len(llm_calls) == 1
+
+    # A fresh process would find it on disk...
+    reset_llm_cache(clear_stats=False)
+    assert translate_to_english("Καλημέρα", "Greek")[1]["llm_cache"] == "disk"
+
+    # ...and a fresh machine in the database
+    reset_llm_cache(clear_stats=False)
+    for path in tmp_path.rglob("*.json"):
+        path.unlink()
+    assert translate_to_english("Καλημέρα", "Greek")[1]["llm_cache"] == "db"
+    assert LLMResponse.select().count() == 1
+
+    # Different context is a different key
+    assert translate_to_english("Καλησπέρα", "Greek")[0] == "translation 2"
+
+    stats = get_llm_cache_stats()
+    assert stats["misses"] == 2
+    assert (stats["hits_memory"], stats["hits_disk"], stats["hits_db"]) == (1, 1, 1)
+
+
+def test_bypass_refreshes_and_expired_entries_miss(llm_calls, monkeypatch):
+    translate_to_english("Καλημέρα", "Greek")
+    with bypass_llm_cache():
+        assert translate_to_english("Καλημέρα", "Greek")[0] == "translation 2"
+    # The bypassed call stored its fresh response
+    assert translate_to_english("Καλημέρα", "Greek")[0] == "translation 2"
+    assert get_llm_cache_stats()["bypassed"] == 1
+
+    monkeypatch.setitem(llm_cache.LLM_CACHE_TTL_SECONDS, "translate_to_english", 0)
+    translate_to_english("Καλημέρα", "Greek")
+    assert len(llm_calls) == 3
+
+
+def test_cache_is_off_unless_enabled(llm_calls, monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_ENABLED")
+    translate_to_english("Καλημέρα", "Greek")
+    translate_to_english("Καλημέρα", "Greek")
+    assert len(llm_calls) == 2
+    assert LLMResponse.select().count() == 0
+
+
+def test_purge_deletes_only_expired_rows(llm_calls):
+    translate_to_english("Καλημέρα", "Greek")
+    translate_to_english("Καλησπέρα", "Greek")
+    expired = LLMResponse.select().first()
+    expired.expires_at = datetime.now() - timedelta(seconds=1)
+    expired.save()
+
+    assert purge_expired_llm_responses() == 1
+    assert LLMResponse.select().count() == 1
+    assert LLMResponse.get_or_none(LLMResponse.id == expired.id) is None
+
+
+def test_invalid_responses_are_not_cached(llm_calls, monkeypatch):
+    responses = iter([{"not": "text"}, "translation"])
+
+    def fake_generate(*args, **kwargs):
+        llm_calls.append(kwargs["context_d"])
+        return next(responses), {}
+
+    monkeypatch.setattr(
+        "utils.vocab_llm_utils.generate_gpt_from_template", fake_generate
+    )
+    with pytest.raises(AssertionError):
+        translate_to_english("Καλημέρα", "Greek")
+    assert LLMResponse.select().count() == 0
+
+    # The retry calls the LLM again rather than replaying the bad response
+    assert translate_to_english("Καλημέρα", "Greek")[0] == "translation"
+    assert len(llm_calls) == 2
+    assert get_llm_cache_stats()["invalid"] == 1
+
+
+def test_invalid_cached_response_is_evicted(llm_calls, tmp_path):
+    translate_to_english("Καλημέρα", "Greek")
+    LLMResponse.update(response={"not": "text"}).execute()
+    reset_llm_cache(clear_stats=False)
+    for path in tmp_path.rglob("*.json"):
+        path.unlink()
+
+    assert translate_to_english("Καλημέρα", "Greek")[0] == "translation 2"
+    assert get_llm_cache_stats()["invalid"] == 1
+    assert LLMResponse.get().response == "translation 2"
+
+
+def test_model_is_part_of_the_key_and_disk_tier_needs_a_dir(llm_calls, monkeypatch):
+    from utils.vocab_llm_utils import _generate_cached
+
+    context_d = {"txt_tgt": "Καλημέρα", "target_language_name": "Greek"}
+    _generate_cached("translate_to_english", context_d, False, model="model-a")
+    _generate_cached("translate_to_english", context_d, False, model="model-b")
+    assert len(llm_calls) == 2
+
+    monkeypatch.delenv("LLM_CACHE_DIR")
+    reset_llm_cache()
+    _, extra = _generate_cached(
+        "translate_to_english", context_d, False, model="model-a"
+    )
+    assert extra["llm_cache"] == "db"
+    assert llm_cache.get_llm_cache_dir() is None
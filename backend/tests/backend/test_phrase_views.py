@@ -1,3 +1,4 @@
+from config import MAX_PHRASE_PREVIEWS_PER_REQUEST
 from tests.fixtures_for_tests import TEST_TARGET_LANGUAGE_CODE, create_test_phrase
 
 from tests.backend.utils_for_testing import assert_html_response, build_url_with_query
@@ -146,3 +147,41 @@ def test_phrases_list_sorting(client, fixture_for_testing_db):
     beta_pos = content.find("beta phrase")
     alpha_pos = content.find("alpha phrase")
     assert gamma_pos < beta_pos < alpha_pos
+
+
+def test_phrase_preview_by_raw_form(client, fixture_for_testing_db):
+    """Previews resolve phrases by canonical form or any raw form, singly or in batch."""
+    create_test_phrase(
+        fixture_for_testing_db,
+        canonical_form="κάνω μπάνιο",
+        raw_forms=["κάνω μπάνιο", "έκανα μπάνιο", "κάνεις μπάνιο"],
+        translations=["to take a bath"],
+        slug="kano-banio",
+    )
+    lang = TEST_TARGET_LANGUAGE_CODE
+
+    response = client.get(f"/api/lang/phrase/{lang}/preview/έκανα μπάνιο")
+    assert response.status_code == 200
+    assert response.get_json()["canonical_form"] == "κάνω μπάνιο"
+
+    response = client.get(f"/api/lang/phrase/{lang}/preview/έκανα")
+    assert response.status_code == 404
+
+    response = client.post(
+        f"/api/lang/phrase/{lang}/previews",
+        json={"phrases": ["κάνω μπάνιο", "κάνεις μπάνιο", "άγνωστο"]},
+    )
+    assert response.status_code == 200
+    previews = response.get_json()
+    assert set(previews) == {"κάνω μπάνιο", "κάνεις μπάνιο"}
+    assert previews["κάνεις μπάνιο"]["translations"] == ["to take a bath"]
+    assert "Cache-Control" not in response.headers
+
+    response = client.post(f"/api/lang/phrase/{lang}/previews", json={"phrases": "x"})
+    assert response.status_code == 400
+
+    too_many = [f"φράση {i}" for i in range(MAX_PHRASE_PREVIEWS_PER_REQUEST + 1)]
+    response = client.post(
+        f"/api/lang/phrase/{lang}/previews", json={"phrases": too_many}
+    )
+    assert response.status_code == 400
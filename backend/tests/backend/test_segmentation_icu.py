@@ -28,3 +28,29 @@ def test_segment_text_to_word_spans_basic(lang, text, min_wordlike):
         assert len(spans) >= 1
 
 
+def test_segment_many_matches_single_text_segmentation():
+    from utils.segmentation import SegmentedText, segment_many, segment_text_to_word_spans
+
+    texts = ["Καλημέρα σας! Πώς είστε;", "", "你好世界，这是一个测试。"]
+    results = segment_many(texts, "el")
+
+    assert [type(r) for r in results] == [SegmentedText] * 3
+    for text, result in zip(texts, results):
+        assert result.to_spans() == segment_text_to_word_spans(text, "el")
+    assert results[1].to_spans() == []
+    assert results[0].token(0) == results[0].to_spans()[0][2]
+
+
+def test_segment_many_process_pool_gives_identical_spans(monkeypatch):
+    from utils import segmentation
+
+    if segmentation.get_engine_name_for("el") != "icu":
+        pytest.skip("Paragraph-parallel segmentation only applies to ICU")
+    monkeypatch.setattr(segmentation, "CFG_SEG_PARALLEL_MIN_CHARS", 100)
+
+    paragraph = "Καλημέρα σας! Πώς είστε;\nΚαλά, ευχαριστώ.  "
+    long_text = "\n\n".join([paragraph] * 40) + "\n\n\n  τέλος"
+    sequential = segmentation.segment_many([long_text, "σύντομο"], "el")
+    parallel = segmentation.segment_many([long_text, "σύντομο"], "el", processes=2)
+
+    assert [r.to_spans() for r in parallel] == [r.to_spans() for r in sequential]
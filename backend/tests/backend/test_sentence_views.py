@@ -1,5 +1,6 @@
 """Test sentence views."""
 
+import hashlib
 import pytest
 from io import BytesIO
 from peewee import DoesNotExist
@@ -33,7 +34,7 @@ def test_get_sentence_audio(client, test_sentence):
         target_language_code=TEST_TARGET_LANGUAGE_CODE,
         sentence_id=test_sentence.id,
     )
-    response = client.get(url)
+    response = client.get(url, follow_redirects=True)
     assert response.status_code == 200
     assert response.data == b"test audio data"
     assert response.mimetype == "audio/mpeg"
@@ -286,3 +287,44 @@ def test_sentence_word_links(client, test_sentence):
 
     # The Svelte component would normally be initialized on the client side,
     # but in our test environment we don't load the actual JS
+
+
+def test_sentence_audio_supports_ranges_and_etags(
+    client, test_sentence, count_queries
+):
+    variant = SentenceAudio.get(SentenceAudio.sentence == test_sentence)
+    assert variant.content_hash == hashlib.sha256(b"test audio data").hexdigest()
+    url = (
+        f"/api/lang/sentence/{TEST_TARGET_LANGUAGE_CODE}/{test_sentence.id}"
+        f"/audio?variant_id={variant.id}"
+    )
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["ETag"] == f'"{variant.content_hash}"'
+    assert "immutable" in response.headers["Cache-Control"]
+    assert response.headers["X-Voice-Variant-Id"] == str(variant.id)
+
+    response = client.get(url, headers={"Range": "bytes=5-9"})
+    assert response.status_code == 206
+    assert response.data == b"audio"
+    assert response.headers["Content-Range"] == "bytes 5-9/15"
+
+    # A revalidation is answered without reading the blob
+    with count_queries() as statements:
+        response = client.get(
+            url, headers={"If-None-Match": f'"{variant.content_hash}"'}
+        )
+    assert response.status_code == 304
+    assert response.data == b""
+    assert not any('"audio_data"' in sql for sql in statements)
+
+    # The random-variant URL redirects (uncached) to a variant's own URL, so the
+    # Range requests for one playback all get the same MP3
+    random_url = f"/api/lang/sentence/{TEST_TARGET_LANGUAGE_CODE}/{test_sentence.id}/audio"
+    response = client.get(random_url, headers={"Range": "bytes=0-3"})
+    assert response.status_code == 302
+    assert response.headers["Cache-Control"] == "no-store"
+    assert response.location.endswith(f"{random_url}?variant_id={variant.id}")
+    assert "Accept-Ranges" not in response.headers
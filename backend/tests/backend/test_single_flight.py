@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from utils.exceptions import SingleFlightTimeout
+from utils.single_flight import advisory_lock_id, in_flight, single_flight
+
+
+def test_concurrent_callers_share_one_generation(fixture_for_testing_db):
+    calls = []
+    results = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"lemma": "καλός"}
+
+    def worker():
+        results.append(single_flight(("lemma_metadata", "el", "καλός"), generate))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"lemma": "καλός"}] * 5
+
+
+def test_waiters_see_the_leaders_error(fixture_for_testing_db):
+    errors = []
+
+    def generate():
+        time.sleep(0.2)
+        raise ValueError("LLM failed")
+
+    def worker():
+        try:
+            single_flight(("wordform_search", "el", "σπίτι"), generate)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == ["LLM failed"] * 3
+
+
+def _other_worker_db(fixture_for_testing_db):
+    # A separate connection, standing in for another worker process
+    return type(fixture_for_testing_db)(
+        fixture_for_testing_db.database, **fixture_for_testing_db.connect_params
+    )
+
+
+def test_queued_worker_rechecks_before_generating(fixture_for_testing_db):
+    key = ("lemma_metadata", "el", "σπίτι")
+    lock_id = advisory_lock_id(key)
+    locked = threading.Event()
+    saved = {}
+
+    def other_worker():
+        other_db = _other_worker_db(fixture_for_testing_db)
+        other_db.execute_sql("SELECT pg_advisory_lock(%s)", (lock_id,))
+        locked.set()
+        time.sleep(0.3)
+        saved["row"] = {"lemma": "σπίτι", "is_complete": True}
+        other_db.execute_sql("SELECT pg_advisory_unlock(%s)", (lock_id,))
+        other_db.close()
+
+    thread = threading.Thread(target=other_worker)
+    thread.start()
+    locked.wait()
+    try:
+        result = single_flight(
+            key,
+            lambda: pytest.fail("should reuse the other worker's result"),
+            recheck=lambda: saved.get("row"),
+            timeout=5,
+        )
+    finally:
+        thread.join()
+    assert result == {"lemma": "σπίτι", "is_complete": True}
+
+
+def test_times_out_while_another_worker_holds_the_lock(fixture_for_testing_db):
+    key = ("wordform_search", "el", "δρόμος")
+    other_db = _other_worker_db(fixture_for_testing_db)
+    other_db.execute_sql("SELECT pg_advisory_lock(%s)", (advisory_lock_id(key),))
+    try:
+        with pytest.raises(SingleFlightTimeout):
+            single_flight(key, lambda: "never", timeout=0.3)
+    finally:
+        other_db.close()
+
+
+def test_connection_is_closed_if_the_lock_cant_be_released(
+    fixture_for_testing_db, monkeypatch
+):
+    key = ("lemma_metadata", "el", "νερό")
+    execute_sql = type(fixture_for_testing_db).execute_sql
+
+    def failing_unlock(self, sql, *args, **kwargs):
+        if "pg_advisory_unlock" in sql:
+            raise RuntimeError("connection lost")
+        return execute_sql(self, sql, *args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(type(fixture_for_testing_db), "execute_sql", failing_unlock)
+        assert single_flight(key, lambda: "generated") == "generated"
+    assert fixture_for_testing_db.is_closed()
+
+    # Closing the session released the lock for other workers
+    other_db = _other_worker_db(fixture_for_testing_db)
+    try:
+        assert other_db.execute_sql(
+            "SELECT pg_try_advisory_lock(%s)", (advisory_lock_id(key),)
+        ).fetchone()[0]
+    finally:
+        other_db.close()
+
+
+def test_in_flight_sees_leaders_here_and_in_other_workers(fixture_for_testing_db):
+    # Lock ids of both signs, as pg_locks splits them into two unsigned halves
+    elsewhere = [("lemma_metadata", "el", "θάλασσα"), ("lemma_metadata", "el", "ήλιος")]
+    here = ("lemma_metadata", "el", "βουνό")
+    idle = ("lemma_metadata", "el", "δέντρο")
+    assert advisory_lock_id(elsewhere[0]) < 0 < advisory_lock_id(elsewhere[1])
+
+    other_db = _other_worker_db(fixture_for_testing_db)
+    for key in elsewhere:
+        other_db.execute_sql("SELECT pg_advisory_lock(%s)", (advisory_lock_id(key),))
+    started = threading.Event()
+    release = threading.Event()
+
+    def generate():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    thread = threading.Thread(target=single_flight, args=(here, generate))
+    thread.start()
+    started.wait(5)
+    try:
+        assert in_flight([*elsewhere, here, idle]) == {*elsewhere, here}
+    finally:
+        release.set()
+        thread.join()
+        other_db.close()
+    assert in_flight([*elsewhere, here, idle]) == set()
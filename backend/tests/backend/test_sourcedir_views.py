@@ -5,6 +5,7 @@ These tests have been updated to use the new standardized API URL structure
 """
 
 from io import BytesIO
+import re
 import pytest
 from pathlib import Path
 
@@ -607,3 +608,113 @@ def test_upload_sourcefile(client, monkeypatch, fixture_for_testing_db):
         )
         assert response.status_code == 200
         assert b"No files selected" in response.data
+
+
+def test_sourcedir_stats_take_a_constant_number_of_queries(count_queries):
+    from db_models import Phrase, SourcefilePhrase
+    from utils.sourcedir_utils import get_sourcedirs_for_language
+
+    phrase = Phrase.create(
+        canonical_form="καλημέρα",
+        target_language_code="el",
+        raw_forms=["καλημέρα"],
+        translations=["good morning"],
+        part_of_speech="phrase",
+    )
+
+    def add_sourcedirs(start, count):
+        for i in range(start, start + count):
+            sourcedir = Sourcedir.create(path=f"stats-{i}", target_language_code="el")
+            for j in range(i % 3):  # 0, 1 or 2 files
+                sourcefile = Sourcefile.create(
+                    sourcedir=sourcedir,
+                    filename=f"{j}.txt",
+                    text_target="",
+                    text_english="",
+                    metadata={},
+                    sourcefile_type="text",
+                )
+                SourcefilePhrase.create(sourcefile=sourcefile, phrase=phrase)
+
+    def query_count():
+        with count_queries() as statements:
+            result = get_sourcedirs_for_language("el", "alpha")
+        return len(statements), result
+
+    add_sourcedirs(0, 3)
+    few_queries, result = query_count()
+    add_sourcedirs(3, 30)
+    many_queries, result = query_count()
+
+    assert many_queries == few_queries <= 2
+    assert len(result["sourcedirs"]) == 33
+    assert result["sourcedir_stats"]["stats-2"] == {
+        "phrase_count": 2,
+        "file_count": 2,
+        "path": "stats-2",
+    }
+    assert result["sourcedir_stats"]["stats-4"]["file_count"] == 1
+    assert sorted(result["empty_sourcedirs"]) == sorted(
+        f"stats-{i}" for i in range(0, 33, 3)
+    )
+
+
+def test_sourcefile_listing_takes_a_constant_number_of_queries(count_queries):
+    from db_models import Lemma, SourcefileWordform, Wordform
+    from utils.sourcedir_utils import get_sourcefiles_for_sourcedir
+
+    sourcedir = Sourcedir.create(path="listing", target_language_code="el")
+    lemma = Lemma.create(lemma="σπίτι", target_language_code="el")
+    wordforms = [
+        Wordform.create(wordform=w, target_language_code="el", lemma_entry=lemma)
+        for w in ["σπίτι", "σπίτια"]
+    ]
+
+    def add_sourcefiles(start, count):
+        for i in range(start, start + count):
+            sourcefile = Sourcefile.create(
+                sourcedir=sourcedir,
+                filename=f"{i:03d}.mp3",
+                text_target="κείμενο " * 1000,
+                text_english="",
+                metadata={"duration": i},
+                sourcefile_type="audio" if i % 2 else "text",
+                audio_data=b"mp3" if i % 2 else None,
+            )
+            for wordform in wordforms[: i % 3]:
+                SourcefileWordform.create(sourcefile=sourcefile, wordform=wordform)
+
+    def run_listing():
+        with count_queries() as statements:
+            result = get_sourcefiles_for_sourcedir("el", "listing")
+        return statements, result
+
+    add_sourcefiles(0, 3)
+    few_statements, _ = run_listing()
+    add_sourcefiles(3, 30)
+    statements, result = run_listing()
+
+    assert len(statements) == len(few_statements) <= 3
+    # Neither the text nor the blobs are selected
+    assert not any('"text_target"' in sql for sql in statements)
+    # (the blobs only appear inside octet_length)
+    assert not any(
+        "_data" in re.sub(r"octet_length\([^)]*\)", "", sql) for sql in statements
+    )
+    files = result["sourcefiles"]
+    assert len(files) == 33
+    assert [f["filename"] for f in files[:3]] == ["000.mp3", "001.mp3", "002.mp3"]
+    assert [
+        (f["metadata"]["has_audio"], f["metadata"]["wordform_count"])
+        for f in files[:3]
+    ] == [(False, 0), (True, 1), (False, 2)]
+    assert files[5]["metadata"] == {
+        "created_at": files[5]["metadata"]["created_at"],
+        "updated_at": files[5]["updated_at"],
+        "has_audio": True,
+        "has_image": False,
+        "wordform_count": 2,
+        "phrase_count": 0,
+        "duration": 5,
+    }
+    assert result["has_vocabulary"] is True
@@ -0,0 +1,207 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from db_models import Sourcedir, Sourcefile, SourcefileJob, SourcefileWordform
+from tests.fixtures_for_tests import TEST_TARGET_LANGUAGE_CODE
+from utils.sourcefile_jobs import (
+    STEP_HANDLERS,
+    claim_next_job,
+    enqueue_sourcefile_job,
+    run_job,
+    run_worker,
+)
+
+
+@pytest.fixture
+def sourcefile(fixture_for_testing_db):
+    sourcedir = Sourcedir.create(
+        path="jobs_dir", target_language_code=TEST_TARGET_LANGUAGE_CODE
+    )
+    return Sourcefile.create(
+        sourcedir=sourcedir,
+        filename="jobs.txt",
+        text_target="Το σπίτι είναι μεγάλο.",
+        text_english="",
+        metadata={},
+        sourcefile_type="text",
+    )
+
+
+def _sourcefile_url(sourcefile):
+    return (
+        f"/api/lang/sourcefile/{TEST_TARGET_LANGUAGE_CODE}/"
+        f"{sourcefile.sourcedir.slug}/{sourcefile.slug}"
+    )
+
+
+def test_endpoint_queues_job_and_worker_runs_it(client, sourcefile, monkeypatch):
+    def fake_extract_tricky_words(*args, **kwargs):
+        return {
+            "wordforms": [
+                {
+                    "wordform": "σπίτι",
+                    "lemma": "σπίτι",
+                    "part_of_speech": "noun",
+                    "translations": ["house"],
+                    "inflection_type": "singular",
+                    "centrality": 0.8,
+                }
+            ]
+        }, {}
+
+    monkeypatch.setattr(
+        "utils.sourcefile_utils.extract_tricky_words", fake_extract_tricky_words
+    )
+    url = f"{_sourcefile_url(sourcefile)}/process_wordforms"
+
+    response = client.post(url, json={"max_new_words": 3})
+    assert response.status_code == 202
+    job = response.get_json()["job"]
+    assert job["status"] == "queued"
+    assert job["params"] == {"max_new_words": 3, "language_level": "B1"}
+    # Nothing ran inside the request
+    assert SourcefileWordform.select().count() == 0
+
+    # A repeat click joins the queued job
+    again = client.post(url, json={"max_new_words": 3}).get_json()["job"]
+    assert again["id"] == job["id"]
+
+    assert run_worker(once=True) == 1
+
+    assert job["status_url"] == f"{_sourcefile_url(sourcefile)}/jobs/{job['id']}"
+    data = client.get(job["status_url"]).get_json()
+    assert data["job"]["status"] == "succeeded"
+    assert data["job"]["result"]["wordforms_count"] == 1
+    assert data["job"]["attempts"] == 1
+
+
+def test_failed_step_is_retried_after_backoff_and_resumes(sourcefile, monkeypatch):
+    calls = {"translation": 0, "phrases": 0}
+
+    def fake_translate(text, target_language_name, verbose=0):
+        calls["translation"] += 1
+        return "The house is big.", {}
+
+    def flaky_phrases(*args, **kwargs):
+        calls["phrases"] += 1
+        if calls["phrases"] == 1:
+            raise RuntimeError("LLM timed out")
+        return {}
+
+    monkeypatch.setattr("utils.sourcefile_utils.translate_to_english", fake_translate)
+    monkeypatch.setattr("utils.sourcefile_utils.process_phrases_from_text", flaky_phrases)
+
+    enqueue_sourcefile_job(
+        sourcefile,
+        "process",
+        {"language_level": "A1", "max_new_words": 0, "max_new_phrases": 2},
+    )
+    job = run_job(claim_next_job("w1"))
+    assert job.status == "queued"
+    assert job.last_error == "RuntimeError: LLM timed out"
+    assert job.run_after > datetime.now()
+    assert job.result["completed_steps"] == ["text_extraction", "translation", "wordforms"]
+    # Backing off, so nothing is claimable yet
+    assert claim_next_job("w1") is None
+
+    SourcefileJob.update(run_after=datetime.now()).execute()
+    job = run_job(claim_next_job("w2"))
+    assert job.status == "succeeded"
+    assert job.attempts == 2
+    assert job.result["completed_steps"][-1] == "phrases"
+    # The retry resumed at the failed step
+    assert calls == {"translation": 1, "phrases": 2}
+
+
+def test_concurrent_steps_get_their_own_sourcefile(sourcefile, monkeypatch):
+    seen = {}
+
+    def recording(name):
+        def handler(sourcefile_entry, params):
+            seen[name] = sourcefile_entry
+            return {}
+
+        return handler
+
+    for name in ("translation", "wordforms", "phrases"):
+        monkeypatch.setitem(STEP_HANDLERS, name, recording(name))
+    enqueue_sourcefile_job(sourcefile, "process")
+
+    assert run_job(claim_next_job()).status == "succeeded"
+    assert len({id(entry) for entry in seen.values()}) == 3
+    assert {entry.id for entry in seen.values()} == {sourcefile.id}
+
+
+def test_job_fails_once_attempts_are_used_up(sourcefile, monkeypatch):
+    def broken_translate(*args, **kwargs):
+        raise ValueError("bad response")
+
+    monkeypatch.setattr("utils.sourcefile_utils.translate_to_english", broken_translate)
+    job = enqueue_sourcefile_job(sourcefile, "translation")
+    SourcefileJob.update(max_attempts=1).where(SourcefileJob.id == job.id).execute()
+
+    job = run_job(claim_next_job())
+    assert job.status == "failed"
+    assert job.finished_at is not None
+    # A new request can queue the step again
+    assert enqueue_sourcefile_job(sourcefile, "translation").id != job.id
+
+
+def test_running_job_renews_its_lock(sourcefile, monkeypatch):
+    def slow_translate(*args, **kwargs):
+        # Runs until the heartbeat has renewed the lock at least once
+        deadline = time.monotonic() + 10
+        while SourcefileJob.get_by_id(job.id).locked_at == claimed_at:
+            assert time.monotonic() < deadline, "lock was never renewed"
+            time.sleep(0.01)
+        return "The house is big.", {}
+
+    monkeypatch.setattr("utils.sourcefile_jobs.SOURCEFILE_JOB_HEARTBEAT_SECONDS", 0.02)
+    monkeypatch.setattr("utils.sourcefile_utils.translate_to_english", slow_translate)
+    enqueue_sourcefile_job(sourcefile, "translation")
+    job = claim_next_job("w1")
+    claimed_at = job.locked_at
+
+    assert run_job(job).status == "succeeded"
+
+
+def test_claim_skips_rows_locked_by_another_worker(sourcefile, fixture_for_testing_db):
+    first = enqueue_sourcefile_job(sourcefile, "text_extraction")
+    second = enqueue_sourcefile_job(sourcefile, "translation")
+
+    # A separate connection, standing in for another worker mid-claim
+    other_db = type(fixture_for_testing_db)(
+        fixture_for_testing_db.database, **fixture_for_testing_db.connect_params
+    )
+    try:
+        with other_db.atomic():
+            other_db.execute_sql(
+                "SELECT id FROM sourcefilejob WHERE id = %s FOR UPDATE", (first.id,)
+            )
+            claimed = claim_next_job("w1")
+            assert claimed.id == second.id
+            assert claimed.status == "running"
+            assert claimed.locked_by == "w1"
+    finally:
+        other_db.close()
+
+
+def test_cron_endpoint_drains_the_queue(client, sourcefile, monkeypatch):
+    monkeypatch.setattr(
+        "utils.sourcefile_utils.translate_to_english",
+        lambda *args, **kwargs: ("The house is big.", {}),
+    )
+    job = enqueue_sourcefile_job(sourcefile, "translation")
+    url = "/sys/cron/process-sourcefile-jobs"
+
+    monkeypatch.delenv("CRON_SECRET", raising=False)
+    assert client.get(url).status_code == 404
+    monkeypatch.setenv("CRON_SECRET", "s3cret")
+    assert client.get(url, headers={"Authorization": "Bearer nope"}).status_code == 401
+    assert SourcefileJob.get_by_id(job.id).status == "queued"
+
+    response = client.get(url, headers={"Authorization": "Bearer s3cret"})
+    assert response.get_json() == {"jobs_run": 1}
+    assert SourcefileJob.get_by_id(job.id).status == "succeeded"
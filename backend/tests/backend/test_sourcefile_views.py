@@ -1566,3 +1566,253 @@ def test_process_png_file(client, monkeypatch, fixture_for_testing_db):
     assert sourcefile.text_target == "Sample extracted text from PNG"
     assert sourcefile.text_english == "Sample English translation"
     assert "image_processing" in sourcefile.metadata
+
+
+def test_text_tab_recognition_cache(client, fixture_for_testing_db, count_queries):
+    """Text tab data is persisted and recomputed when links or text change."""
+    from db_models import SourcefileRecognition
+    from utils.sourcefile_utils import _get_text_tab_data_cached
+
+    sd = Sourcedir.create(path="cache_dir", target_language_code="el")
+    sf = Sourcefile.create(
+        sourcedir=sd,
+        filename="cache.txt",
+        text_target="Το σπίτι και η γάτα.",
+        text_english="-",
+        metadata={},
+        sourcefile_type="text",
+    )
+
+    def link(word: str, ordering: int):
+        wf, _ = Wordform.get_or_create_from_metadata(
+            wordform=word,
+            target_language_code="el",
+            metadata={"lemma": word, "translations": [word], "part_of_speech": "noun"},
+        )
+        SourcefileWordform.create(sourcefile=sf, wordform=wf, ordering=ordering)
+
+    url = f"/api/lang/sourcefile/el/{sd.slug}/{sf.slug}/text"
+    link("σπίτι", 1)
+
+    first = client.get(url).get_json()
+    assert [w["word"] for w in first["recognized_words"]] == ["σπίτι"]
+    cached = SourcefileRecognition.get(SourcefileRecognition.sourcefile == sf)
+    assert cached.recognized_words == first["recognized_words"]
+    assert cached.enhanced_text == first["enhanced_text"]
+    assert cached.wordforms == first["wordforms"]
+
+    # Served from cache when nothing changed
+    assert client.get(url).get_json()["recognized_words"] == first["recognized_words"]
+    assert SourcefileRecognition.select().count() == 1
+    # ...in a single query, without loading the wordforms
+    with count_queries() as statements:
+        text_tab = _get_text_tab_data_cached(sf, "Το σπίτι και η γάτα.", "el")
+    assert len(statements) == 1
+    assert text_tab["wordforms"] == first["wordforms"]
+
+    # Editing a linked wordform invalidates the cached data
+    spiti = Wordform.get(Wordform.wordform == "σπίτι")
+    spiti.translations = ["house"]
+    spiti.save()
+    edited = client.get(url).get_json()
+    assert edited["wordforms"][0]["translations"] == ["house"]
+
+    # A new wordform link invalidates the cached spans
+    link("γάτα", 2)
+    second = client.get(url).get_json()
+    assert [w["word"] for w in second["recognized_words"]] == ["σπίτι", "γάτα"]
+
+    # So does editing the text
+    Sourcefile.update(text_target="Η γάτα.").where(Sourcefile.id == sf.id).execute()
+    third = client.get(url).get_json()
+    assert [w["word"] for w in third["recognized_words"]] == ["γάτα"]
+    assert SourcefileRecognition.select().count() == 1
+
+
+def test_ensure_tricky_wordforms_bulk_upserts_words(monkeypatch, count_queries):
+    from db_models import LemmaForm
+    from utils.sourcefile_utils import ensure_tricky_wordforms
+
+    sd = Sourcedir.create(path="bulk_words", target_language_code="el")
+    sf = Sourcefile.create(
+        sourcedir=sd,
+        filename="bulk.txt",
+        text_target="Τα σπίτια είναι μεγάλα.",
+        text_english="",
+        metadata={},
+        sourcefile_type="text",
+    )
+    existing, _ = Wordform.get_or_create_from_metadata(
+        wordform="είναι",
+        target_language_code="el",
+        metadata={"lemma": "είμαι", "translations": ["is"], "part_of_speech": "verb"},
+    )
+    SourcefileWordform.create(sourcefile=sf, wordform=existing, ordering=1)
+    Lemma.update(is_complete=True).execute()
+
+    def word(wordform, lemma, translation, centrality):
+        return {
+            "wordform": wordform,
+            "lemma": lemma,
+            "part_of_speech": "noun",
+            "translations": [translation],
+            "inflection_type": "plural",
+            "centrality": centrality,
+        }
+
+    def fake_extract_tricky_words(*args, ignore_words, **kwargs):
+        assert ignore_words == ["είναι"]
+        return {
+            "wordforms": [
+                word("σπίτια", "σπίτι", "houses", 0.9),
+                word("Μεγάλα", "μεγάλος", "big", 0.5),
+                word("είμαι", "είμαι", "am", 0.4),
+            ]
+        }, {}
+
+    monkeypatch.setattr(
+        "utils.sourcefile_utils.extract_tricky_words", fake_extract_tricky_words
+    )
+    with count_queries() as statements:
+        ensure_tricky_wordforms(sf, language_level="B1", max_new_words=10)
+
+    # One read for existing words, then a handful of set-based writes (plus
+    # one lexicon version bump)
+    writes = [
+        sql
+        for sql in statements
+        if not sql.lstrip().upper().startswith(("SELECT", "SAVEPOINT", "RELEASE"))
+    ]
+    assert len(statements) <= 13
+    assert len(writes) <= 8
+
+    links = (
+        SourcefileWordform.select(SourcefileWordform, Wordform)
+        .join(Wordform)
+        .where(SourcefileWordform.sourcefile == sf)
+        .order_by(SourcefileWordform.ordering)
+    )
+    assert [(l.wordform.wordform, l.ordering, l.centrality) for l in links] == [
+        ("είναι", 1, None),
+        ("σπίτια", 2, 0.9),
+        ("Μεγάλα", 3, 0.5),
+        ("είμαι", 4, 0.4),
+    ]
+    big = Wordform.get(Wordform.wordform == "Μεγάλα")
+    assert big.wordform_norm == "μεγαλα"
+    assert big.lemma_entry.lemma_norm == "μεγαλος"
+    # Existing lemmas are updated in place (and marked for regeneration)
+    eimai = Lemma.get(Lemma.lemma == "είμαι")
+    assert (eimai.translations, eimai.is_complete) == (["am"], False)
+    assert Lemma.select().count() == 3
+    assert LemmaForm.find_lemma("σπίτια", "el") == "σπίτι"
+    assert LemmaForm.find_lemma("σπίτι", "el") == "σπίτι"
+
+
+def test_process_phrases_bulk_upserts_phrases_and_links(
+    monkeypatch, count_queries
+):
+    from utils.vocab_llm_utils import process_phrases_from_text
+
+    sd = Sourcedir.create(path="bulk_phrases", target_language_code="el")
+    sf = Sourcefile.create(
+        sourcedir=sd,
+        filename="bulk_phrases.txt",
+        text_target="Καλημέρα σας. Τι κάνεις;",
+        text_english="",
+        metadata={},
+        sourcefile_type="text",
+    )
+    existing = Phrase.create(
+        canonical_form="καλημέρα σας",
+        target_language_code="el",
+        raw_forms=["καλημέρα σας"],
+        translations=["good morning"],
+        part_of_speech="phrase",
+    )
+    SourcefilePhrase.create(sourcefile=sf, phrase=existing, ordering=1)
+
+    def fake_extract_phrases(*args, ignore_phrases, **kwargs):
+        assert ignore_phrases == ["καλημέρα σας"]
+        return {
+            "phrases": [
+                {"canonical_form": "τι κάνεις", "translations": ["how are you"]},
+                {"canonical_form": "καλημέρα σας", "centrality": 0.2},
+                {"canonical_form": "τι κάνεις", "centrality": 0.9},
+            ]
+        }, {}
+
+    monkeypatch.setattr(
+        "utils.vocab_llm_utils.extract_phrases_from_text", fake_extract_phrases
+    )
+    with count_queries() as statements:
+        process_phrases_from_text(
+            "Καλημέρα σας. Τι κάνεις;", "Greek", "el", "B1", 5, sourcefile_entry=sf
+        )
+
+    inserts = [sql for sql in statements if sql.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2  # phrases, then their sourcefile links
+    assert len(statements) <= 6
+
+    assert Phrase.select().count() == 2
+    links = (
+        SourcefilePhrase.select(SourcefilePhrase, Phrase)
+        .join(Phrase)
+        .where(SourcefilePhrase.sourcefile == sf)
+        .order_by(SourcefilePhrase.ordering)
+    )
+    # A later duplicate wins, for the phrase and its link
+    assert [(l.phrase.canonical_form, l.ordering, l.centrality) for l in links] == [
+        ("καλημέρα σας", 2, 0.2),
+        ("τι κάνεις", 3, 0.9),
+    ]
+    ti_kaneis = Phrase.get(Phrase.canonical_form == "τι κάνεις")
+    assert ti_kaneis.translations == []
+    assert ti_kaneis.raw_forms == ["τι κάνεις"]
+    assert ti_kaneis.slug
+    # Existing phrases keep their slug
+    assert Phrase.get_by_id(existing.id).slug == existing.slug
+
+
+def test_navigation_info_is_one_query(fixture_for_testing_db, count_queries):
+    sd = Sourcedir.create(path="nav_dir", target_language_code="el")
+    for filename in ["b.txt", "A.txt", "c.txt"]:
+        Sourcefile.create(
+            sourcedir=sd,
+            filename=filename,
+            text_target="",
+            text_english="",
+            metadata={},
+            sourcefile_type="text",
+        )
+    indexes = fixture_for_testing_db.execute_sql(
+        "SELECT indexdef FROM pg_indexes WHERE indexname = "
+        "'sourcefile_sourcedir_id_lower_filename'"
+    ).fetchall()
+    assert len(indexes) == 1
+
+    with count_queries() as statements:
+        nav_info = _get_navigation_info(sd, "b-txt")
+    assert len(statements) == 1
+    assert "image_data" not in statements[0]
+    assert nav_info == {
+        "is_first": False,
+        "is_last": False,
+        "total_files": 3,
+        "current_position": 2,
+        "prev_slug": "a-txt",
+        "next_slug": "c-txt",
+        "prev_filename": "A.txt",
+        "next_filename": "c.txt",
+        "first_slug": "a-txt",
+        "last_slug": "c-txt",
+        "first_filename": "A.txt",
+        "last_filename": "c.txt",
+        "sourcedir_path": "nav_dir",
+    }
+
+    with count_queries() as statements:
+        missing = _get_navigation_info(sd, "nope")
+    assert (missing["current_position"], missing["total_files"]) == (0, 3)
+    assert (missing["first_slug"], missing["last_slug"]) == ("a-txt", "c-txt")
+    assert len(statements) == 1
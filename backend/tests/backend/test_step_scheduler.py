@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from db_models import Sourcedir, Sourcefile, SourcefileWordform
+from tests.fixtures_for_tests import TEST_TARGET_LANGUAGE_CODE
+from utils.sourcefile_utils import process_sourcefile
+from utils.step_scheduler import Step, run_steps
+
+
+def test_independent_steps_run_concurrently_after_their_prerequisite(
+    fixture_for_testing_db,
+):
+    order = []
+    lock = threading.Lock()
+
+    def step(name, seconds=0.3):
+        def run():
+            time.sleep(seconds)
+            with lock:
+                order.append(name)
+            return name.upper()
+
+        return run
+
+    started = time.monotonic()
+    outcomes = run_steps(
+        [
+            Step("text", step("text", 0.05)),
+            Step("translation", step("translation"), after=("text",)),
+            Step("wordforms", step("wordforms"), after=("text",)),
+            Step("phrases", step("phrases"), after=("text",)),
+        ]
+    )
+    elapsed = time.monotonic() - started
+
+    assert order[0] == "text"
+    assert elapsed < 0.8  # vs ~0.95s one after another
+    assert [o.result for o in outcomes.values()] == [
+        "TEXT",
+        "TRANSLATION",
+        "WORDFORMS",
+        "PHRASES",
+    ]
+    assert all(o.ok and o.seconds >= 0.05 for o in outcomes.values())
+
+
+def test_failure_is_isolated_and_skips_only_dependents(fixture_for_testing_db):
+    def fail():
+        raise RuntimeError("LLM down")
+
+    outcomes = run_steps(
+        [
+            Step("translation", fail),
+            Step("summary", lambda: "never", after=("translation",)),
+            Step("audio", lambda: "never", after=("summary",)),
+            Step("wordforms", lambda: 3),
+        ]
+    )
+
+    assert str(outcomes["translation"].error) == "LLM down"
+    assert outcomes["summary"].skipped and outcomes["audio"].skipped
+    assert outcomes["wordforms"].ok and outcomes["wordforms"].result == 3
+
+
+def test_rejects_unknown_dependencies():
+    with pytest.raises(ValueError):
+        run_steps([Step("translation", lambda: None, after=("ocr",))])
+
+
+def test_failed_translation_keeps_extracted_words(fixture_for_testing_db, monkeypatch):
+    sourcedir = Sourcedir.create(
+        path="steps_dir", target_language_code=TEST_TARGET_LANGUAGE_CODE
+    )
+    sourcefile = Sourcefile.create(
+        sourcedir=sourcedir,
+        filename="steps.txt",
+        text_target="Το σπίτι είναι μεγάλο.",
+        text_english="",
+        metadata={},
+        sourcefile_type="text",
+    )
+
+    def broken_translate(*args, **kwargs):
+        raise RuntimeError("translation failed")
+
+    def fake_extract_tricky_words(*args, **kwargs):
+        return {
+            "wordforms": [
+                {
+                    "wordform": "σπίτι",
+                    "lemma": "σπίτι",
+                    "part_of_speech": "noun",
+                    "translations": ["house"],
+                    "inflection_type": "singular",
+                    "centrality": 0.8,
+                }
+            ]
+        }, {}
+
+    monkeypatch.setattr("utils.sourcefile_utils.translate_to_english", broken_translate)
+    monkeypatch.setattr(
+        "utils.sourcefile_utils.extract_tricky_words", fake_extract_tricky_words
+    )
+
+    with pytest.raises(RuntimeError, match="translation failed"):
+        process_sourcefile(
+            sourcefile, language_level="A1", max_new_words=5, max_new_phrases=0
+        )
+
+    assert SourcefileWordform.select().where(
+        SourcefileWordform.sourcefile == sourcefile
+    ).count() == 1
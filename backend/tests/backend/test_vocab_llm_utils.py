@@ -336,3 +336,53 @@ def test_create_interactive_word_links_with_unicode_normalization(monkeypatch):
     # rather than preserving the original NFD form
     assert ">τροφή<" in enhanced_text_nfd
     assert ">θυμός<" in enhanced_text_nfd
+
+
+def test_create_interactive_word_links_single_pass(monkeypatch):
+    """Links every case/accent variant of a wordform without touching lemma metadata."""
+
+    def fail_load_or_generate_lemma_metadata(*args, **kwargs):
+        raise AssertionError("lemma metadata should not be loaded while linking")
+
+    monkeypatch.setattr(
+        "utils.store_utils.load_or_generate_lemma_metadata",
+        fail_load_or_generate_lemma_metadata,
+    )
+
+    url_for_calls = []
+
+    def mock_url_for(endpoint, **kwargs):
+        url_for_calls.append(kwargs["wordform"])
+        return f"/language/{kwargs['target_language_code']}/wordform/{kwargs['wordform']}"
+
+    monkeypatch.setattr("flask.url_for", mock_url_for)
+    monkeypatch.setattr(
+        "utils.url_registry.endpoint_for",
+        lambda func: "wordform_views.get_wordform_metadata_vw",
+    )
+
+    text = "Σπίτι, σπίτι και ΣΠΙΤΙ.\n\nΤα σπίτια και ό,τι άλλο."
+    wordforms = [
+        {"wordform": "σπίτι", "lemma": "σπίτι", "translations": ["house"]},
+        {"wordform": "σπίτια", "lemma": "σπίτι", "translations": ["houses"]},
+    ]
+
+    enhanced_text, found_wordforms = create_interactive_word_links(
+        text, wordforms, "el"
+    )
+
+    link = '<a href="/language/el/wordform/{}" class="word-link">{}</a>'
+    assert enhanced_text == (
+        "<p>\n    "
+        + link.format("σπίτι", "Σπίτι")
+        + ", "
+        + link.format("σπίτι", "σπίτι")
+        + " και "
+        + link.format("σπίτι", "ΣΠΙΤΙ")
+        + ".\n</p>\n\n<p>\n    Τα "
+        + link.format("σπίτια", "σπίτια")
+        + " και ό,τι άλλο.\n</p>"
+    )
+    assert found_wordforms == {"σπίτι", "σπίτια"}
+    # One url_for per distinct linked wordform, not per match
+    assert sorted(url_for_calls) == ["σπίτι", "σπίτια"]
@@ -231,6 +231,47 @@ def test_unicode_normalization(fixture_for_testing_db):
     assert "anger" in preview["translation"]
 
 
+def test_word_preview_ranks_exact_then_case_then_accent_matches(fixture_for_testing_db):
+    """Lookups go through the stored normalized form and prefer closer matches."""
+    lemma_pote = Lemma.create(lemma="πότε", target_language_code="el", etymology="when")
+    lemma_pote2 = Lemma.create(lemma="ποτέ", target_language_code="el", etymology="never")
+    Wordform.create(
+        wordform="πότε",
+        target_language_code="el",
+        lemma_entry=lemma_pote,
+        translations=["when"],
+    )
+    Wordform.create(
+        wordform="ποτέ",
+        target_language_code="el",
+        lemma_entry=lemma_pote2,
+        translations=["never"],
+    )
+    assert Wordform.get(Wordform.wordform == "πότε").wordform_norm == "ποτε"
+    assert lemma_pote.lemma_norm == "ποτε"
+
+    # Exact matches win over other accent variants
+    assert get_word_preview("el", "ποτέ")["translation"] == "never"
+    assert get_word_preview("el", "πότε")["translation"] == "when"
+    # Case-insensitive match
+    preview = get_word_preview("el", "ΠΟΤΈ")
+    assert preview["lemma"] == "ποτέ"
+    assert preview["etymology"] == "never"
+    # Accent-insensitive fallback (previously never matched)
+    assert get_word_preview("el", "ποτε") is not None
+    assert get_word_preview("el", "σπίτι") is None
+
+    # find_by_text stays case-insensitive but not accent-insensitive
+    assert Wordform.find_by_text("ΠΌΤΕ", "el").wordform == "πότε"
+    assert Wordform.find_by_text("ποτε", "el") is None
+
+    # Lemmas resolve through lemma_norm with the same ranking
+    assert Lemma.find_best_match("ποτέ", "el").get() == lemma_pote2
+    assert Lemma.find_best_match("ΠΌΤΕ", "el").get() == lemma_pote
+    assert Lemma.find_best_match("ποτε", "el").first() is not None
+    assert Lemma.find_best_match("ποτε", "el", fold_accents=False).first() is None
+
+
 def test_ensure_nfc():
     """Test that ensure_nfc correctly normalizes text to NFC form."""
     # Test with already NFC text
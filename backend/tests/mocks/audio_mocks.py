@@ -9,10 +9,12 @@ def mock_elevenlabs():
     """Mock ElevenLabs API calls."""
     with patch("utils.audio_utils.outloud_elevenlabs") as mock:
 
-        def fake_generate_audio(text, api_key, mp3_filen, bot_name=None, **kwargs):
-            # Write some fake audio data to the file
-            with open(mp3_filen, "wb") as f:
-                f.write(b"fake mp3 data")
+        def fake_generate_audio(text, api_key, mp3_filen=None, bot_name=None, **kwargs):
+            # Write some fake audio data to the file, if given, and return it
+            if mp3_filen:
+                with open(mp3_filen, "wb") as f:
+                    f.write(b"fake mp3 data")
+            return iter([b"fake mp3", b" data"])
 
         mock.side_effect = fake_generate_audio
         yield mock
@@ -0,0 +1,202 @@
+"""Move legacy audio bytes from Postgres into the blob store, and verify it.
+
+`move_audio_to_store()` walks lemmaaudio, sentenceaudio and sourcefileblob in
+id order, a batch of ids at a time. For each row still holding bytes in its
+audio_data column it writes them to the store, reads them back to check the
+hash, and only then empties the column (one UPDATE per row). Rows already
+moved are skipped, so an interrupted run can simply be started again.
+
+`verify_audio_store()` re-hashes every stored blob that a row points to and
+reports rows whose blob is missing or doesn't match its hash and size.
+
+Run them as `flask move-audio-to-store` and `flask verify-audio-store`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from loguru import logger
+
+from config import AUDIO_BLOB_MOVE_BATCH_SIZE
+from db_models import LemmaAudio, SentenceAudio, SourcefileBlob
+from utils.blob_store import (
+    DEFAULT_AUDIO_MIME_TYPE,
+    BlobNotFound,
+    BlobStore,
+    get_audio_blob_store,
+)
+
+HASH_READ_CHUNK_SIZE = 1024 * 1024
+
+
+class AudioColumns(NamedTuple):
+    model: type
+    data: object  # the legacy bytea column
+    content_hash: object
+    size: object
+    mime_type: object
+
+
+AUDIO_COLUMNS: dict[str, AudioColumns] = {
+    "lemmaaudio": AudioColumns(
+        LemmaAudio,
+        LemmaAudio.legacy_audio_data,
+        LemmaAudio.content_hash,
+        LemmaAudio.audio_size,
+        LemmaAudio.mime_type,
+    ),
+    "sentenceaudio": AudioColumns(
+        SentenceAudio,
+        SentenceAudio.legacy_audio_data,
+        SentenceAudio.content_hash,
+        SentenceAudio.audio_size,
+        SentenceAudio.mime_type,
+    ),
+    "sourcefileblob": AudioColumns(
+        SourcefileBlob,
+        SourcefileBlob.audio_data,
+        SourcefileBlob.audio_hash,
+        SourcefileBlob.audio_size,
+        SourcefileBlob.audio_mime_type,
+    ),
+}
+
+
+class VerifyReport(NamedTuple):
+    checked: int
+    missing: list[tuple[str, int]]  # (table, id) whose blob isn't in the store
+    corrupt: list[tuple[str, int]]  # (table, id) whose blob has the wrong hash/size
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.corrupt
+
+
+def _require_store(store: Optional[BlobStore]) -> BlobStore:
+    store = store or get_audio_blob_store()
+    if store is None:
+        raise RuntimeError("Set AUDIO_BLOB_STORE to move audio out of the database")
+    return store
+
+
+def hash_stored_blob(store: BlobStore, content_hash: str) -> tuple[str, int]:
+    """(sha256 hex, size) of a stored blob, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    f = store.open(content_hash)
+    try:
+        for chunk in iter(lambda: f.read(HASH_READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    finally:
+        f.close()
+    return digest.hexdigest(), size
+
+
+def _id_batches(columns: AudioColumns, where, batch_size: int):
+    model = columns.model
+    last_id = 0
+    while True:
+        ids = [
+            row_id
+            for (row_id,) in model.select(model.id)
+            .where(where & (model.id > last_id))
+            .order_by(model.id)
+            .limit(batch_size)
+            .tuples()
+        ]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def move_audio_to_store(
+    store: Optional[BlobStore] = None,
+    *,
+    batch_size: int = AUDIO_BLOB_MOVE_BATCH_SIZE,
+    limit: Optional[int] = None,
+) -> dict[str, int]:
+    """Move audio still held in bytea columns into the store.
+
+    Args:
+        store: Defaults to the configured AUDIO_BLOB_STORE
+        batch_size: Row ids fetched per query (bytes are read one row at a time)
+        limit: Stop after moving this many rows in total
+
+    Returns:
+        Rows moved, by table.
+    """
+    store = _require_store(store)
+    moved: Counter = Counter()
+    for table, columns in AUDIO_COLUMNS.items():
+        model = columns.model
+        for ids in _id_batches(columns, columns.data.is_null(False), batch_size):
+            for row_id in ids:
+                if limit is not None and sum(moved.values()) >= limit:
+                    return dict(moved)
+                data = model.select(columns.data).where(model.id == row_id).scalar()
+                if data is None:
+                    continue  # moved meanwhile
+                blob = store.put(bytes(data), DEFAULT_AUDIO_MIME_TYPE)
+                if hash_stored_blob(store, blob.content_hash) != (
+                    blob.content_hash,
+                    blob.size,
+                ):
+                    raise RuntimeError(
+                        f"{table} {row_id}: blob {blob.content_hash} failed to verify"
+                    )
+                model.update(
+                    {
+                        columns.data: None,
+                        columns.content_hash: blob.content_hash,
+                        columns.size: blob.size,
+                        columns.mime_type: blob.mime_type,
+                    }
+                ).where((model.id == row_id) & columns.data.is_null(False)).execute()
+                moved[table] += 1
+            logger.info(
+                f"[audio_blob_migration] {table}: moved {moved[table]} rows "
+                f"(up to id {ids[-1]})"
+            )
+    return dict(moved)
+
+
+def verify_audio_store(
+    store: Optional[BlobStore] = None,
+    *,
+    batch_size: int = AUDIO_BLOB_MOVE_BATCH_SIZE,
+) -> VerifyReport:
+    """Check that every row moved to the store has an intact blob there."""
+    store = _require_store(store)
+    checked = 0
+    missing: list[tuple[str, int]] = []
+    corrupt: list[tuple[str, int]] = []
+    for table, columns in AUDIO_COLUMNS.items():
+        model = columns.model
+        moved_rows = columns.data.is_null() & columns.content_hash.is_null(False)
+        for ids in _id_batches(columns, moved_rows, batch_size):
+            rows = (
+                model.select(model.id, columns.content_hash, columns.size)
+                .where(model.id.in_(ids))
+                .tuples()
+            )
+            for row_id, content_hash, size in rows:
+                checked += 1
+                try:
+                    actual = hash_stored_blob(store, content_hash)
+                except BlobNotFound:
+                    missing.append((table, row_id))
+                    continue
+                actual_hash, actual_size = actual
+                if actual_hash != content_hash or size not in (None, actual_size):
+                    corrupt.append((table, row_id))
+    report = VerifyReport(checked, missing, corrupt)
+    logger.info(
+        f"[audio_blob_migration] checked {checked} blobs: "
+        f"{len(missing)} missing, {len(corrupt)} corrupt"
+    )
+    return report
@@ -0,0 +1,105 @@
+"""HTTP responses for stored audio variants (SentenceAudio, LemmaAudio).
+
+- byte ranges (206), which mobile Safari needs to play and seek reliably
+- a strong ETag from the variant's stored `content_hash`, so a matching
+  If-None-Match gets a 304 before the blob is read
+- the bytes are streamed from the blob store (utils/blob_store.py)
+- `?variant_id=` URLs always serve the same bytes, so they're cached as
+  immutable; the random-variant URLs redirect to one of them
+  (`random_variant_redirect`), so every Range request for a playback gets
+  bytes from the same MP3
+"""
+
+import io
+
+from flask import Response, jsonify, redirect, request, url_for
+from loguru import logger
+from werkzeug.wsgi import wrap_file
+
+from config import AUDIO_VARIANT_CACHE_MAX_AGE_SECONDS
+from db_models import audio_content_hash
+
+
+def variant_columns(model) -> list:
+    """Columns to select for serving a variant: everything except the blob."""
+    return [
+        model.id,
+        model.provider,
+        model.metadata,
+        model.content_hash,
+        model.audio_size,
+        model.mime_type,
+    ]
+
+
+def random_variant_redirect(variant) -> Response:
+    """Redirect a random-variant URL to `variant`'s `?variant_id=` URL.
+
+    Players (notably Safari on iOS) fetch audio in several Range requests,
+    which would each pick a new variant if served here. The redirect itself
+    isn't cached, so every playback still gets a random voice.
+    """
+    location = url_for(
+        request.endpoint, **(request.view_args or {}), variant_id=variant.id
+    )
+    response = redirect(location, code=302)
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Voice-Variant-Id"] = str(variant.id)
+    return response
+
+
+def audio_variant_response(variant) -> Response:
+    """Serve a variant's audio, honouring Range and If-None-Match.
+
+    Only for `?variant_id=` URLs, which always mean this variant and so are
+    cached as immutable.
+
+    Args:
+        variant: SentenceAudio/LemmaAudio, selected with `variant_columns`
+    """
+    headers = {
+        "X-Voice-Variant-Id": str(variant.id),
+        "X-Audio-Provider": variant.provider,
+        "Cache-Control": (
+            f"public, max-age={AUDIO_VARIANT_CACHE_MAX_AGE_SECONDS}, immutable"
+        ),
+    }
+    voice_name = (variant.metadata or {}).get("voice_name")
+    if voice_name:
+        headers["X-Voice-Name"] = voice_name
+
+    etag = variant.content_hash
+    if etag and request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    audio_file = variant.open_audio()
+    if audio_file is None:
+        # Blob missing from the store (misconfigured, or the row's bytes already
+        # emptied): a 404, not an empty body under the real ETag and length
+        logger.warning(
+            f"[audio_http] no audio for {type(variant).__name__} {variant.id} "
+            f"({variant.content_hash})"
+        )
+        response = jsonify({"error": "Audio not found"})
+        response.status_code = 404
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    size = variant.audio_size
+    if not etag or size is None:
+        # Rows saved before content_hash/audio_size existed
+        audio_data = audio_file.read()
+        audio_file.close()
+        etag, size = etag or audio_content_hash(audio_data), len(audio_data)
+        audio_file = io.BytesIO(audio_data)
+    response = Response(
+        wrap_file(request.environ, audio_file),
+        mimetype=variant.mime_type or "audio/mpeg",
+        headers=headers,
+        direct_passthrough=True,
+    )
+    response.set_etag(etag)
+    return response.make_conditional(
+        request, accept_ranges=True, complete_length=size
+    )
@@ -1,9 +1,10 @@
 from typing import Optional, BinaryIO, Any
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import os
 import tempfile
+import threading
 import random
-from peewee import fn
 from loguru import logger
 from utils.env_config import ELEVENLABS_API_KEY, OPENAI_API_KEY
 from config import (
@@ -12,6 +13,7 @@ from config import (
     ELEVENLABS_VOICE_POOL,
     LEMMA_AUDIO_SAMPLES,
     SENTENCE_AUDIO_SAMPLES,
+    TTS_MAX_CONCURRENCY,
 )
 from gjdutils.audios import play_mp3
 from gjdutils.outloud_text_to_speech import outloud_elevenlabs
@@ -21,7 +23,6 @@ from openai import OpenAI
 from .exceptions import AuthenticationRequiredForGenerationError
 
 from db_models import Lemma, Sentence, LemmaAudio, SentenceAudio
-from utils.db_connection import database
 
 # Import the exception and g for global context
 from flask import g
@@ -179,34 +180,30 @@ def ensure_audio_data(
     if verbose >= 1:
         print(f"Selected voice: {selected_voice}")
 
-    # Create temporary file for ElevenLabs API
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=True) as temp_file:
-        outloud_elevenlabs(
-            text=text_with_delays,
-            api_key=ELEVENLABS_API_KEY.get_secret_value().strip(),
-            mp3_filen=temp_file.name,
-            bot_name=selected_voice,
-            voice_settings=voice_settings,
-        )
-
-        # Read the generated audio
-        temp_file.seek(0)
-        audio_data = temp_file.read()
+    # Keep the audio in memory: with no mp3_filen, ElevenLabs' chunks are returned
+    audio = outloud_elevenlabs(
+        text=text_with_delays,
+        api_key=ELEVENLABS_API_KEY.get_secret_value().strip(),
+        mp3_filen=None,
+        bot_name=selected_voice,
+        voice_settings=voice_settings,
+    )
+    audio_data = audio if isinstance(audio, bytes) else b"".join(audio)
 
-        # Check size
-        if len(audio_data) > MAX_AUDIO_SIZE_FOR_STORAGE:
-            raise ValueError(
-                f"Generated audio too large (max {MAX_AUDIO_SIZE_FOR_STORAGE/(1024*1024):.1f}MB)"
-            )
+    # Check size
+    if len(audio_data) > MAX_AUDIO_SIZE_FOR_STORAGE:
+        raise ValueError(
+            f"Generated audio too large (max {MAX_AUDIO_SIZE_FOR_STORAGE/(1024*1024):.1f}MB)"
+        )
 
-        # Play if requested
-        if should_play:
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=True) as play_file:
-                play_file.write(audio_data)
-                play_file.flush()
-                play_mp3(play_file.name)
+    # Play if requested
+    if should_play:
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=True) as play_file:
+            play_file.write(audio_data)
+            play_file.flush()
+            play_mp3(play_file.name)
 
-        return audio_data
+    return audio_data
 
 
 DEFAULT_AUDIO_PROVIDER = "elevenlabs"
@@ -238,31 +235,92 @@ def _build_metadata(voice_name: str, settings: Optional[dict[str, Any]] = None)
     return metadata
 
 
-def ensure_sentence_audio_variants(
-    sentence: Sentence,
-    n: int = SENTENCE_AUDIO_SAMPLES,
+_tts_lock = threading.Lock()
+_tts_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_tts_executor() -> ThreadPoolExecutor:
+    """The per-process pool for TTS calls, so concurrent requests share the cap."""
+    global _tts_executor
+    with _tts_lock:
+        if _tts_executor is None:
+            _tts_executor = ThreadPoolExecutor(
+                max_workers=TTS_MAX_CONCURRENCY, thread_name_prefix="tts"
+            )
+        return _tts_executor
+
+
+def synthesize_voices(
+    text: str,
+    voice_names: list[str],
     *,
-    enforce_auth: bool = True,
-) -> tuple[list[SentenceAudio], int]:
-    """Ensure up to n distinct voice variants exist for a sentence.
+    should_add_delays: bool = True,
+    voice_settings: Optional[dict[str, Any]] = None,
+) -> list[tuple[str, bytes]]:
+    """Generate `text` in each voice concurrently, on the shared TTS pool.
+
+    A voice that fails is logged and left out, so the others can still be
+    stored; if every voice fails, the first error is raised.
+
+    Returns:
+        (voice_name, mp3 bytes) for each voice that succeeded, in order
+    """
+    executor = _get_tts_executor()
+    futures = [
+        (
+            voice_name,
+            executor.submit(
+                ensure_audio_data,
+                text=text,
+                should_add_delays=should_add_delays,
+                voice_name=voice_name,
+                voice_settings=voice_settings,
+            ),
+        )
+        for voice_name in voice_names
+    ]
+    results: list[tuple[str, bytes]] = []
+    errors: list[Exception] = []
+    for voice_name, future in futures:
+        try:
+            results.append((voice_name, future.result()))
+        except Exception as e:
+            logger.warning(f"[tts] voice {voice_name} failed for {text[:40]!r}: {e}")
+            errors.append(e)
+    if errors and not results:
+        raise errors[0]
+    return results
+
+
+def _ensure_audio_variants(
+    model,
+    owner_field: str,
+    owner,
+    text: str,
+    n: int,
+    *,
+    enforce_auth: bool,
+    should_add_delays: bool,
+    voice_settings: Optional[dict[str, Any]] = None,
+) -> tuple[list, int]:
+    """Shared body of ensure_sentence/lemma_audio_variants.
 
     Important: Keep DB connections scoped to the minimal sections of code that
     actually touch the database so we don't hold pool connections during slow
     external TTS calls. This helps avoid pool exhaustion under load.
     """
+    owner_column = getattr(model, owner_field)
+    db = model._meta.database
+
+    def list_variants() -> list:
+        with db.connection_context():
+            return list(
+                model.select_without_audio()
+                .where(owner_column == owner)
+                .order_by(model.created_at)
+            )
 
-    text = (sentence.sentence or "").strip()
-    if not text:
-        raise ValueError("Sentence text is required for audio generation")
-
-    # Load existing variants within a short-lived DB connection
-    with database.connection_context():
-        existing_variants = list(
-            SentenceAudio.select()
-            .where(SentenceAudio.sentence == sentence)
-            .order_by(SentenceAudio.created_at)
-        )
-
+    existing_variants = list_variants()
     existing_voice_names = {
         (variant.metadata or {}).get("voice_name")
         for variant in existing_variants
@@ -275,69 +333,70 @@ def ensure_sentence_audio_variants(
 
     if enforce_auth and new_voice_names and (not hasattr(g, "user") or g.user is None):
         raise AuthenticationRequiredForGenerationError(
-            "Authentication required to generate sentence audio"
+            f"Authentication required to generate {owner_field} audio"
         )
+    if not new_voice_names:
+        return existing_variants, 0
 
-    created_variants: list[SentenceAudio] = []
-    created_by = getattr(g, "user_id", None)  # Pass user UUID (FK)
+    # Generate audio outside of any DB connection, all voices at once
+    generated = synthesize_voices(
+        text,
+        new_voice_names,
+        should_add_delays=should_add_delays,
+        voice_settings=voice_settings,
+    )
 
-    # Generate audio outside of any DB connection
-    generated_payloads: list[tuple[str, bytes, dict]] = []
-    for voice_name in new_voice_names:
-        audio_bytes = ensure_audio_data(
-            text=text,
-            should_add_delays=True,
-            should_play=False,
-            verbose=0,
-            voice_name=voice_name,
+    # Voices a concurrent request stored meanwhile are skipped by the unique
+    # (owner, voice_name) index
+    created_by = getattr(g, "user_id", None)  # Pass user UUID (FK)
+    with db.connection_context():
+        created_variants = model.insert_variants(
+            [
+                {
+                    owner_field: owner,
+                    "provider": DEFAULT_AUDIO_PROVIDER,
+                    "audio_data": audio_bytes,
+                    "metadata": _build_metadata(voice_name, settings=voice_settings),
+                    "created_by": created_by,
+                }
+                for voice_name, audio_bytes in generated
+            ]
         )
-        metadata = _build_metadata(voice_name)
-        generated_payloads.append((voice_name, audio_bytes, metadata))
-
-    # Persist generated variants using short-lived DB connections
-    # Re-check for each voice to handle concurrent requests gracefully
-    for voice_name, audio_bytes, metadata in generated_payloads:
-        with database.connection_context():
-            # Check if this voice was created by a concurrent request
-            already_exists = (
-                SentenceAudio.select()
-                .where(SentenceAudio.sentence == sentence)
-                .where(
-                    fn.json_extract_path_text(
-                        SentenceAudio.metadata, "voice_name"
-                    )
-                    == voice_name
-                )
-                .exists()
-            )
-            if already_exists:
-                continue
-
-            try:
-                variant = SentenceAudio.create(
-                    sentence=sentence,
-                    provider=metadata["provider"],
-                    audio_data=audio_bytes,
-                    metadata=metadata,
-                    created_by=created_by,
-                )
-                created_variants.append(variant)
-            except Exception as e:
-                # Handle race condition where another request created this variant
-                logger.debug(f"Skipping duplicate audio variant: {e}")
 
     if created_variants:
         # Refresh final list so callers can rely on ordering/ids
-        with database.connection_context():
-            existing_variants = list(
-                SentenceAudio.select()
-                .where(SentenceAudio.sentence == sentence)
-                .order_by(SentenceAudio.created_at)
-            )
+        existing_variants = list_variants()
 
     return existing_variants, len(created_variants)
 
 
+def ensure_sentence_audio_variants(
+    sentence: Sentence,
+    n: int = SENTENCE_AUDIO_SAMPLES,
+    *,
+    enforce_auth: bool = True,
+) -> tuple[list[SentenceAudio], int]:
+    """Ensure up to n distinct voice variants exist for a sentence.
+
+    Missing voices are generated concurrently (see synthesize_voices) and
+    stored in one transaction. Returns (all variants, number created).
+    """
+
+    text = (sentence.sentence or "").strip()
+    if not text:
+        raise ValueError("Sentence text is required for audio generation")
+
+    return _ensure_audio_variants(
+        SentenceAudio,
+        "sentence",
+        sentence,
+        text,
+        n,
+        enforce_auth=enforce_auth,
+        should_add_delays=True,
+    )
+
+
 def ensure_lemma_audio_variants(
     lemma: Lemma,
     n: int = LEMMA_AUDIO_SAMPLES,
@@ -346,101 +405,41 @@ def ensure_lemma_audio_variants(
 ) -> tuple[list[LemmaAudio], int]:
     """Ensure up to n distinct voice variants exist for a lemma.
 
-    Keep DB connection windows short to protect the pool under concurrent play.
+    As ensure_sentence_audio_variants, but without pauses and with steadier
+    voices.
     """
 
     text = (lemma.lemma or "").strip()
     if not text:
         raise ValueError("Lemma text is required for audio generation")
 
-    with database.connection_context():
-        existing_variants = list(
-            LemmaAudio.select()
-            .where(LemmaAudio.lemma == lemma)
-            .order_by(LemmaAudio.created_at)
-        )
-
-    existing_voice_names = {
-        (variant.metadata or {}).get("voice_name")
-        for variant in existing_variants
-        if (variant.metadata or {}).get("voice_name")
-    }
-
-    target_total = min(n, len(ELEVENLABS_VOICE_POOL))
-    missing = max(0, target_total - len(existing_voice_names))
-    new_voice_names = select_random_voices(missing, existing_voice_names)
-
-    if enforce_auth and new_voice_names and (not hasattr(g, "user") or g.user is None):
-        raise AuthenticationRequiredForGenerationError(
-            "Authentication required to generate lemma audio"
-        )
+    return _ensure_audio_variants(
+        LemmaAudio,
+        "lemma",
+        lemma,
+        text,
+        n,
+        enforce_auth=enforce_auth,
+        should_add_delays=False,
+        voice_settings={"stability": 0.92},
+    )
 
-    created_variants: list[LemmaAudio] = []
-    created_by = getattr(g, "user_id", None)
-    voice_settings = {"stability": 0.92}
-
-    generated_payloads: list[tuple[str, bytes, dict]] = []
-    for voice_name in new_voice_names:
-        audio_bytes = ensure_audio_data(
-            text=text,
-            should_add_delays=False,
-            should_play=False,
-            verbose=0,
-            voice_name=voice_name,
-            voice_settings=voice_settings,
-        )
-        metadata = _build_metadata(voice_name, settings=voice_settings)
-        generated_payloads.append((voice_name, audio_bytes, metadata))
-
-    # Re-check for each voice to handle concurrent requests gracefully
-    for voice_name, audio_bytes, metadata in generated_payloads:
-        with database.connection_context():
-            # Check if this voice was created by a concurrent request
-            already_exists = (
-                LemmaAudio.select()
-                .where(LemmaAudio.lemma == lemma)
-                .where(
-                    fn.json_extract_path_text(LemmaAudio.metadata, "voice_name")
-                    == voice_name
-                )
-                .exists()
-            )
-            if already_exists:
-                continue
-
-            try:
-                variant = LemmaAudio.create(
-                    lemma=lemma,
-                    provider=metadata["provider"],
-                    audio_data=audio_bytes,
-                    metadata=metadata,
-                    created_by=created_by,
-                )
-                created_variants.append(variant)
-            except Exception as e:
-                # Handle race condition where another request created this variant
-                logger.debug(f"Skipping duplicate lemma audio variant: {e}")
 
-    if created_variants:
-        with database.connection_context():
-            existing_variants = list(
-                LemmaAudio.select()
-                .where(LemmaAudio.lemma == lemma)
-                .order_by(LemmaAudio.created_at)
-            )
+def random_audio_variant(model, where):
+    """Pick a random variant matching `where`, without its audio bytes.
 
-    return existing_variants, len(created_variants)
+    A sentence/lemma only has a handful of variants, so they're listed via
+    the (sentence_id)/(lemma_id) index and one is chosen here, rather than
+    sorting rows with ORDER BY random(). The bytes are read at stream time
+    with `open_audio()`.
+    """
+    variants = list(model.select_without_audio().where(where))
+    return random.choice(variants) if variants else None
 
 
 def stream_random_sentence_audio(sentence_id: int) -> Optional[SentenceAudio]:
-    """Fetch a random sentence audio variant."""
-
-    return (
-        SentenceAudio.select()
-        .where(SentenceAudio.sentence == sentence_id)
-        .order_by(fn.Random())
-        .first()
-    )
+    """Fetch a random sentence audio variant (without its audio bytes)."""
+    return random_audio_variant(SentenceAudio, SentenceAudio.sentence == sentence_id)
 
 
 def ensure_model_audio_data(
@@ -455,10 +454,16 @@ def ensure_model_audio_data(
     a single audio blob instead of variants.
     """
 
-    if not hasattr(model, "audio_data"):
+    # On the class, so the audio_data property isn't evaluated
+    if not hasattr(type(model), "audio_data"):
         raise AttributeError("Model does not define audio_data")
 
-    if getattr(model, "audio_data", None):
+    # Sourcefile audio can be large and lives in the blob store, so check for it
+    # without downloading it
+    if hasattr(model, "media_flags"):
+        if model.media_flags()["has_audio"]:
+            return
+    elif getattr(model, "audio_data", None):
         return
 
     if not hasattr(g, "user") or g.user is None:
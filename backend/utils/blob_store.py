@@ -0,0 +1,217 @@
+"""Content-addressed storage for audio bytes, outside Postgres.
+
+Audio (SentenceAudio, LemmaAudio and sourcefile mp3s) used to live in bytea
+columns, which bloated the database and its backups and meant every playback
+went through a DB connection. Now each blob is stored once under its sha256
+hex digest and the row only keeps that hash, the size and the mime type.
+
+The store is chosen by env AUDIO_BLOB_STORE:
+- `file:///var/lib/hellozenno/blobs` - a local directory, sharded as
+  `ab/cd/abcd...` (`FilesystemBlobStore`)
+- `s3://bucket/prefix` - any S3-compatible service (`S3BlobStore`). Set
+  AUDIO_BLOB_STORE_S3_ENDPOINT_URL to use e.g. MinIO instead of AWS, and the
+  usual AWS_* variables for credentials. Requires the optional `boto3` package.
+- unset - no store; new audio stays in the legacy bytea columns
+
+Both backends have the same put/open/exists/delete interface, so a filesystem
+store can stand in for S3 in development and tests.
+
+Existing rows are moved out by `flask move-audio-to-store` and checked by
+`flask verify-audio-store` (see utils/audio_blob_migration.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+DEFAULT_AUDIO_MIME_TYPE = "audio/mpeg"
+
+
+class BlobNotFound(KeyError):
+    """No blob is stored under this hash."""
+
+
+class StoredBlob(NamedTuple):
+    content_hash: str  # sha256 hex digest, the blob's key
+    size: int
+    mime_type: str
+
+
+def content_hash_of(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def shard_key(content_hash: str) -> str:
+    """Relative key of a blob, e.g. "ab/cd/abcd12..."."""
+    if len(content_hash) != 64 or set(content_hash) - set("0123456789abcdef"):
+        raise ValueError(f"Not a sha256 hex digest: {content_hash!r}")
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+
+class BlobStore(ABC):
+    """Interface shared by the backends. Blobs are immutable once written."""
+
+    def put(self, data: bytes, mime_type: str = DEFAULT_AUDIO_MIME_TYPE) -> StoredBlob:
+        """Store `data` (a no-op if it's already there) and return its key."""
+        data = bytes(data)
+        blob = StoredBlob(content_hash_of(data), len(data), mime_type)
+        if not self.exists(blob.content_hash):
+            self._write(blob, data)
+        return blob
+
+    @abstractmethod
+    def open(self, content_hash: str) -> BinaryIO:
+        """Return a readable file object for the blob. Raises BlobNotFound."""
+
+    def get(self, content_hash: str) -> bytes:
+        f = self.open(content_hash)
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    @abstractmethod
+    def exists(self, content_hash: str) -> bool: ...
+
+    @abstractmethod
+    def delete(self, content_hash: str) -> None: ...
+
+    @abstractmethod
+    def _write(self, blob: StoredBlob, data: bytes) -> None: ...
+
+
+class FilesystemBlobStore(BlobStore):
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def __repr__(self) -> str:
+        return f"FilesystemBlobStore({str(self.root)!r})"
+
+    def path_for(self, content_hash: str) -> Path:
+        return self.root / shard_key(content_hash)
+
+    def open(self, content_hash: str) -> BinaryIO:
+        try:
+            return open(self.path_for(content_hash), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(content_hash) from None
+
+    def exists(self, content_hash: str) -> bool:
+        return self.path_for(content_hash).is_file()
+
+    def delete(self, content_hash: str) -> None:
+        self.path_for(content_hash).unlink(missing_ok=True)
+
+    def _write(self, blob: StoredBlob, data: bytes) -> None:
+        path = self.path_for(blob.content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        tmp_name = f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path = path.with_name(tmp_name)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+def _is_missing_key_error(e: Exception) -> bool:
+    code = str(getattr(e, "response", {}).get("Error", {}).get("Code", ""))
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects under `prefix/` in an S3-compatible bucket.
+
+    `client` is a boto3 S3 client (or anything with the same put_object /
+    get_object / head_object / delete_object methods). By default one is made
+    from AUDIO_BLOB_STORE_S3_ENDPOINT_URL and the standard AWS env variables.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", client=None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = client
+
+    def __repr__(self) -> str:
+        return f"S3BlobStore({self.bucket!r}, {self.prefix!r})"
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3  # type: ignore
+
+            endpoint_url = os.getenv("AUDIO_BLOB_STORE_S3_ENDPOINT_URL", "").strip()
+            self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        return self._client
+
+    def key_for(self, content_hash: str) -> str:
+        key = shard_key(content_hash)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def open(self, content_hash: str) -> BinaryIO:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self.key_for(content_hash)
+            )
+        except Exception as e:
+            if _is_missing_key_error(e):
+                raise BlobNotFound(content_hash) from None
+            raise
+        return response["Body"]
+
+    def exists(self, content_hash: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key_for(content_hash))
+        except Exception as e:
+            if _is_missing_key_error(e):
+                return False
+            raise
+        return True
+
+    def delete(self, content_hash: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key_for(content_hash))
+
+    def _write(self, blob: StoredBlob, data: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.key_for(blob.content_hash),
+            Body=data,
+            ContentType=blob.mime_type,
+        )
+
+
+def blob_store_from_url(url: str) -> BlobStore:
+    """Make a store from a `file://` or `s3://` URL (see module docstring)."""
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return FilesystemBlobStore(parsed.netloc + parsed.path)
+    if parsed.scheme == "s3":
+        return S3BlobStore(parsed.netloc, parsed.path)
+    raise ValueError(f"Unsupported AUDIO_BLOB_STORE: {url!r}")
+
+
+_store_lock = threading.Lock()
+_configured: dict[str, Optional[BlobStore]] = {}
+
+
+def get_audio_blob_store() -> Optional[BlobStore]:
+    """The store set by env AUDIO_BLOB_STORE, or None to keep audio in Postgres."""
+    url = os.getenv("AUDIO_BLOB_STORE", "").strip()
+    with _store_lock:
+        if url not in _configured:
+            _configured[url] = blob_store_from_url(url) if url else None
+            if url:
+                logger.info(f"[blob_store] storing audio in {_configured[url]!r}")
+        return _configured[url]
@@ -2,3 +2,9 @@ class AuthenticationRequiredForGenerationError(Exception):
     """Custom exception raised when AI generation is required but the user is not logged in."""
 
     pass
+
+
+class SingleFlightTimeout(Exception):
+    """Raised when waiting for another request's identical generation takes too long."""
+
+    pass
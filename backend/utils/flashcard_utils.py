@@ -10,10 +10,10 @@ from db_models import (
     SourcefileWordform,
     Sentence,
     SentenceAudio,
-    Wordform,
 )
 from utils.lang_utils import get_language_name
-from utils.word_utils import get_sourcedir_lemmas, get_sourcefile_lemmas, normalize_text
+from utils.word_utils import get_sourcedir_lemmas, get_sourcefile_lemmas
+from utils.lexicon_index import lookup_wordforms_for_tokens
 from utils.audio_utils import ensure_sentence_audio_variants
 from utils.sentence_utils import get_random_sentence
 from utils.vocab_llm_utils import extract_tokens, create_interactive_word_data
@@ -150,10 +150,18 @@ def get_flashcard_sentence_data(
         variants, _ = ensure_sentence_audio_variants(sentence)
     except AuthenticationRequiredForGenerationError:
         audio_requires_login = True
-        variants = list(sentence.audio_variants.order_by(SentenceAudio.created_at))  # type: ignore
+        variants = list(
+            SentenceAudio.select_without_audio()
+            .where(SentenceAudio.sentence == sentence)
+            .order_by(SentenceAudio.created_at)
+        )
     except Exception as e:
         print(f"Error getting/generating audio for Sentence {sentence.id}: {e}")
-        variants = list(sentence.audio_variants.order_by(SentenceAudio.created_at))  # type: ignore
+        variants = list(
+            SentenceAudio.select_without_audio()
+            .where(SentenceAudio.sentence == sentence)
+            .order_by(SentenceAudio.created_at)
+        )
 
     sourcefile_entry = None
     sourcedir_entry = None
@@ -196,24 +204,8 @@ def get_flashcard_sentence_data(
         # Extract tokens from the sentence text
         tokens_in_text = extract_tokens(str(sentence.sentence))
 
-        # Query database for all wordforms in this language that might be in the text
-        wordforms = list(
-            Wordform.select().where(
-                (Wordform.target_language_code == target_language_code)
-            )
-        )
-
-        # Filter wordforms in Python using normalize_text to match tokens
-        normalized_tokens = {normalize_text(t) for t in tokens_in_text}
-        matching_wordforms = [
-            wf for wf in wordforms if normalize_text(wf.wordform) in normalized_tokens
-        ]
-
-        # Convert to dictionary format for create_interactive_word_data
-        wordforms_d = []
-        for wordform in matching_wordforms:
-            wordform_d = wordform.to_dict()
-            wordforms_d.append(wordform_d)
+        # Resolve only those tokens against the per-language wordform index
+        wordforms_d = lookup_wordforms_for_tokens(target_language_code, tokens_in_text)
 
         # Create structured word recognition data
         recognized_words, found_wordforms = create_interactive_word_data(
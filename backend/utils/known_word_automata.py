@@ -0,0 +1,97 @@
+"""Cached Aho–Corasick automata for known-word search in unsegmented scripts.
+
+For Thai/Chinese/Japanese/Korean, `create_interactive_word_data` falls back to
+scanning the text for any known wordform when segmentation recognises nothing.
+Compiling an automaton is the expensive part, so compiled automata are kept in
+a bounded LRU, keyed by language plus a fingerprint of the set of normalized
+forms they contain (e.g. a sourcefile's wordforms). A changed wordform set
+produces a new fingerprint (and so a new entry); stale entries simply age out.
+
+Automata only store normalized forms. Callers map matches back to their own
+(current) wordform metadata, so cached automata never serve stale translations.
+
+Requires the optional `pyahocorasick` package.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, NamedTuple, Optional
+
+from config import KNOWN_WORD_AUTOMATON_CACHE_SIZE
+
+
+class KnownWordAutomaton(NamedTuple):
+    target_language_code: str
+    fingerprint: str
+    num_forms: int
+    automaton: Any  # ahocorasick.Automaton, values are the normalized forms
+
+    def scan(self, normalized_text: str) -> list[tuple[int, int, str]]:
+        """Return (start, end, normalized_form) for every (possibly overlapping) match."""
+        if not self.num_forms or not normalized_text:
+            return []
+        return [
+            (end_index - len(form) + 1, end_index + 1, form)
+            for end_index, form in self.automaton.iter(normalized_text)
+        ]
+
+
+_lock = threading.Lock()
+_automata: "OrderedDict[tuple[str, str], KnownWordAutomaton]" = OrderedDict()
+
+
+def _fingerprint(normalized_forms: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    for form in sorted(set(normalized_forms)):
+        h.update(form.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _compile(
+    target_language_code: str, fingerprint: str, normalized_forms: Iterable[str]
+) -> KnownWordAutomaton:
+    import ahocorasick  # type: ignore
+
+    automaton = ahocorasick.Automaton()
+    for form in normalized_forms:
+        if form:
+            automaton.add_word(form, form)
+    num_forms = len(automaton)
+    if num_forms:
+        automaton.make_automaton()
+    return KnownWordAutomaton(target_language_code, fingerprint, num_forms, automaton)
+
+
+def _cache_get(key: tuple[str, str]) -> Optional[KnownWordAutomaton]:
+    with _lock:
+        compiled = _automata.get(key)
+        if compiled is not None:
+            _automata.move_to_end(key)
+        return compiled
+
+
+def _cache_put(key: tuple[str, str], compiled: KnownWordAutomaton) -> None:
+    with _lock:
+        _automata[key] = compiled
+        _automata.move_to_end(key)
+        while len(_automata) > KNOWN_WORD_AUTOMATON_CACHE_SIZE:
+            _automata.popitem(last=False)
+
+
+def get_automaton_for_forms(
+    target_language_code: str, normalized_forms: Iterable[str]
+) -> KnownWordAutomaton:
+    """Return a compiled automaton for exactly this set of normalized forms."""
+    forms = sorted(set(normalized_forms))
+    fingerprint = _fingerprint(forms)
+    key = (target_language_code, fingerprint)
+    compiled = _cache_get(key)
+    if compiled is None:
+        compiled = _compile(target_language_code, fingerprint, forms)
+        _cache_put(key, compiled)
+    return compiled
+
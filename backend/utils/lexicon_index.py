@@ -0,0 +1,168 @@
+"""Process-wide, per-language index of known wordforms keyed by normalized form.
+
+The sentence and flashcard views need to know which of the tokens in a short
+piece of text are known wordforms. Rather than loading and normalizing every
+wordform for the language on each request, we keep one compact index per
+language in memory and rebuild it lazily when it goes stale.
+
+Staleness is detected in two ways:
+- an in-process version counter, bumped via `invalidate_lexicon_index()`
+- the language's `LexiconVersion` row, a one-row lookup, so writes from other
+  workers are also picked up
+
+Lemma and wordform saves, upserts and deletes bump both through their
+`after_write`/`after_delete` hooks (see `mark_lexicon_changed()`). Bulk SQL
+that bypasses those must call `mark_lexicon_changed()` itself.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterable, NamedTuple, Optional
+
+from loguru import logger
+from peewee import JOIN
+
+from db_models import Lemma, LexiconVersion, Wordform
+from utils.word_utils import normalize_text
+
+
+class LexiconEntry(NamedTuple):
+    """Compact record for one wordform (with its lemma and translations)."""
+
+    wordform: str
+    lemma: Optional[str]
+    part_of_speech: Optional[str]
+    translations: list
+    inflection_type: Optional[str]
+    possible_misspellings: Optional[list]
+    is_lemma: bool
+
+    def to_dict(self) -> dict:
+        """Return the same shape as `Wordform.to_dict()`."""
+        return {
+            "wordform": self.wordform,
+            "lemma": self.lemma,
+            "part_of_speech": self.part_of_speech,
+            "translations": self.translations or [],
+            "inflection_type": self.inflection_type,
+            "possible_misspellings": self.possible_misspellings,
+            "is_lemma": self.is_lemma,
+        }
+
+
+class LexiconIndex(NamedTuple):
+    target_language_code: str
+    local_version: int
+    db_version: int
+    by_normalized_form: dict[str, tuple[LexiconEntry, ...]]
+
+    def lookup(self, normalized_forms: Iterable[str]) -> list[LexiconEntry]:
+        """Return all entries whose normalized form is in `normalized_forms`."""
+        entries: list[LexiconEntry] = []
+        for norm in normalized_forms:
+            entries.extend(self.by_normalized_form.get(norm, ()))
+        return entries
+
+
+_lock = threading.Lock()
+_indexes: dict[str, LexiconIndex] = {}
+_local_versions: dict[str, int] = {}
+
+
+def invalidate_lexicon_index(target_language_code: Optional[str] = None) -> None:
+    """Mark the index for a language (or all languages) as stale."""
+    with _lock:
+        if target_language_code is None:
+            for code in list(_local_versions):
+                _local_versions[code] += 1
+            _indexes.clear()
+            return
+        _local_versions[target_language_code] = (
+            _local_versions.get(target_language_code, 0) + 1
+        )
+        _indexes.pop(target_language_code, None)
+
+
+def mark_lexicon_changed(target_language_codes: Iterable[str]) -> None:
+    """Record that lemmas/wordforms of these languages changed, for every worker."""
+    codes = set(target_language_codes)
+    LexiconVersion.bump(codes)
+    for target_language_code in codes:
+        invalidate_lexicon_index(target_language_code)
+
+
+def _build_index(
+    target_language_code: str, local_version: int, db_version: int
+) -> LexiconIndex:
+    query = (
+        Wordform.select(
+            Wordform.wordform,
+            Lemma.lemma,
+            Wordform.part_of_speech,
+            Wordform.translations,
+            Wordform.inflection_type,
+            Wordform.possible_misspellings,
+            Wordform.is_lemma,
+            Wordform.wordform_norm,
+        )
+        .join(Lemma, JOIN.LEFT_OUTER, on=(Wordform.lemma_entry == Lemma.id))  # type: ignore
+        .where(Wordform.target_language_code == target_language_code)
+        .tuples()
+    )
+
+    grouped: dict[str, list[LexiconEntry]] = {}
+    n_wordforms = 0
+    for *row, wordform_norm in query:
+        entry = LexiconEntry(*row)
+        if not entry.wordform:
+            continue
+        # Rows written without save() (e.g. raw bulk inserts) may lack it
+        norm = wordform_norm or normalize_text(entry.wordform)
+        grouped.setdefault(norm, []).append(entry)
+        n_wordforms += 1
+
+    logger.info(
+        f"[lexicon_index] built lang={target_language_code} version={db_version} wordforms={n_wordforms} keys={len(grouped)}"
+    )
+    return LexiconIndex(
+        target_language_code=target_language_code,
+        local_version=local_version,
+        db_version=db_version,
+        by_normalized_form={k: tuple(v) for k, v in grouped.items()},
+    )
+
+
+def get_lexicon_index(target_language_code: str) -> LexiconIndex:
+    """Return an up-to-date index for the language, rebuilding it if stale."""
+    db_version = LexiconVersion.current(target_language_code)
+    with _lock:
+        local_version = _local_versions.get(target_language_code, 0)
+        index = _indexes.get(target_language_code)
+        if (
+            index is not None
+            and index.local_version == local_version
+            and index.db_version == db_version
+        ):
+            return index
+
+    index = _build_index(target_language_code, local_version, db_version)
+    with _lock:
+        # Only publish if nothing invalidated the index while we were building it
+        if _local_versions.get(target_language_code, 0) == local_version:
+            _indexes[target_language_code] = index
+    return index
+
+
+def lookup_wordforms_for_tokens(
+    target_language_code: str, tokens: Iterable[str]
+) -> list[dict]:
+    """Return wordform dicts (as per `Wordform.to_dict()`) for the given tokens.
+
+    Tokens are normalized with `normalize_text`, so case and diacritics don't matter.
+    """
+    normalized_tokens = {normalize_text(t) for t in tokens if t}
+    if not normalized_tokens:
+        return []
+    index = get_lexicon_index(target_language_code)
+    return [entry.to_dict() for entry in index.lookup(sorted(normalized_tokens))]
@@ -0,0 +1,365 @@
+"""Content-addressed cache for `generate_gpt_from_template` responses.
+
+The same prompt often gets re-sent (repeat searches, re-processing a
+sourcefile, the same article in two sourcedirs), so responses are cached under
+a sha256 of:
+- the prompt template file's contents (editing a template changes the key)
+- the context dict, as canonical JSON
+- the model type, model name and response mode (JSON vs text)
+
+There are three tiers, checked in order, and a hit is copied into the tiers
+above it:
+- an in-process LRU (`LLM_CACHE_MEMORY_SIZE` entries)
+- a local disk directory (env LLM_CACHE_DIR; skipped when unset, rather than
+  sharing a world-writable tempdir)
+- the `llmresponse` table, shared by every worker (expired rows are deleted
+  by `flask purge-llm-cache`)
+
+Each template has its own TTL (`LLM_CACHE_TTL_SECONDS` in config). Set env
+LLM_CACHE_ENABLED=0 to turn the cache off, or wrap calls in
+`bypass_llm_cache()` to skip reads while still storing the fresh response.
+The cache is off under pytest unless LLM_CACHE_ENABLED=1, so mocked responses
+never leak between tests.
+
+Entries hold serialised JSON, and every hit is decoded afresh, so callers can
+mutate what they get back. Responses that fail the caller's `validate` check
+are never stored (and are evicted if found), so a malformed one isn't replayed
+for the whole TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+from config import (
+    LLM_CACHE_DEFAULT_TTL_SECONDS,
+    LLM_CACHE_MEMORY_SIZE,
+    LLM_CACHE_TTL_SECONDS,
+)
+from utils.env_config import is_testing
+
+# Bump to invalidate every cached response (e.g. if the stored shape changes)
+LLM_CACHE_FORMAT_VERSION = 1
+
+_lock = threading.Lock()
+# key -> (expires_at epoch seconds, serialised {"out": ..., "extra": ...})
+_memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_stats: Counter = Counter()
+_bypass = threading.local()
+
+
+def llm_cache_enabled() -> bool:
+    """Whether the cache is in use (env LLM_CACHE_ENABLED, default on outside tests)."""
+    configured = os.getenv("LLM_CACHE_ENABLED", "").strip()
+    if configured:
+        return configured == "1"
+    return not is_testing()
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip cache reads for calls made inside this block (responses are still stored)."""
+    previous = getattr(_bypass, "active", False)
+    _bypass.active = True
+    try:
+        yield
+    finally:
+        _bypass.active = previous
+
+
+def get_llm_cache_stats() -> dict[str, int]:
+    """Hit/miss counters for this process since start (or the last reset)."""
+    with _lock:
+        stats = dict(_stats)
+        stats["memory_entries"] = len(_memory)
+    return stats
+
+
+def reset_llm_cache(clear_stats: bool = True) -> None:
+    """Empty the in-process tier (and optionally the counters)."""
+    with _lock:
+        _memory.clear()
+        if clear_stats:
+            _stats.clear()
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def get_ttl_seconds(template_name: str) -> int:
+    return LLM_CACHE_TTL_SECONDS.get(template_name, LLM_CACHE_DEFAULT_TTL_SECONDS)
+
+
+def make_cache_key(
+    template_path: Path,
+    context_d: dict,
+    *,
+    model_type: str,
+    model: str,
+    response_json: bool,
+) -> str:
+    template_sha = hashlib.sha256(template_path.read_bytes()).hexdigest()
+    payload = json.dumps(
+        {
+            "v": LLM_CACHE_FORMAT_VERSION,
+            "template": template_sha,
+            "context": context_d,
+            "model_type": model_type,
+            "model": model,
+            "response_json": response_json,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _memory_get(key: str) -> Optional[str]:
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        expires_at, serialised = entry
+        if expires_at <= time.time():
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return serialised
+
+
+def _memory_put(key: str, expires_at: float, serialised: str) -> None:
+    with _lock:
+        _memory[key] = (expires_at, serialised)
+        _memory.move_to_end(key)
+        while len(_memory) > LLM_CACHE_MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def get_llm_cache_dir() -> Optional[Path]:
+    """Directory for the disk tier (env LLM_CACHE_DIR), or None if it's off."""
+    configured = os.getenv("LLM_CACHE_DIR", "").strip()
+    return Path(configured) if configured else None
+
+
+def _disk_path(key: str) -> Optional[Path]:
+    cache_dir = get_llm_cache_dir()
+    return cache_dir / key[:2] / f"{key}.json" if cache_dir else None
+
+
+def _disk_get(key: str) -> Optional[tuple[float, str]]:
+    path = _disk_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            expires_at = float(f.readline())
+            serialised = f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"[llm_cache] ignoring unreadable {path}: {e}")
+        return None
+    if expires_at <= time.time():
+        path.unlink(missing_ok=True)
+        return None
+    return expires_at, serialised
+
+
+def _disk_put(key: str, expires_at: float, serialised: str) -> None:
+    path = _disk_path(key)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{expires_at}\n")
+            f.write(serialised)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"[llm_cache] could not save {path}: {e}")
+
+
+def _db_get(key: str) -> Optional[tuple[float, str]]:
+    from db_models import LLMResponse
+
+    try:
+        row = (
+            LLMResponse.select(
+                LLMResponse.response, LLMResponse.extra, LLMResponse.expires_at
+            )
+            .where(
+                (LLMResponse.cache_key == key)
+                & (LLMResponse.expires_at > datetime.now())
+            )
+            .first()
+        )
+    except Exception as e:
+        logger.warning(f"[llm_cache] database read failed: {e}")
+        return None
+    if row is None:
+        return None
+    serialised = json.dumps(
+        {"out": row.response, "extra": row.extra}, ensure_ascii=False
+    )
+    return row.expires_at.timestamp(), serialised
+
+
+def _db_put(
+    key: str,
+    template_name: str,
+    model: str,
+    response_json: bool,
+    expires_at: float,
+    out: Any,
+    extra: Any,
+) -> None:
+    from db_models import LLMResponse
+
+    try:
+        with LLMResponse._meta.database.atomic():
+            LLMResponse.update_or_create(
+                lookup={"cache_key": key},
+                updates={
+                    "prompt_template": template_name,
+                    "model": model,
+                    "response_json": response_json,
+                    "response": out,
+                    "extra": extra,
+                    "expires_at": datetime.fromtimestamp(expires_at),
+                },
+            )
+    except Exception as e:
+        logger.warning(f"[llm_cache] database write failed: {e}")
+
+
+def _evict(key: str) -> None:
+    """Remove `key` from every tier."""
+    from db_models import LLMResponse
+
+    with _lock:
+        _memory.pop(key, None)
+    path = _disk_path(key)
+    try:
+        if path is not None:
+            path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"[llm_cache] could not delete {path}: {e}")
+    try:
+        LLMResponse.delete().where(LLMResponse.cache_key == key).execute()
+    except Exception as e:
+        logger.warning(f"[llm_cache] database delete failed: {e}")
+
+
+def purge_expired_llm_responses() -> int:
+    """Delete expired rows from the database tier. Returns the number deleted."""
+    from db_models import LLMResponse
+
+    return (
+        LLMResponse.delete().where(LLMResponse.expires_at <= datetime.now()).execute()
+    )
+
+
+def cached_llm_call(
+    generate: Callable[[], tuple[Any, dict]],
+    *,
+    template_path: Path,
+    context_d: dict,
+    response_json: bool,
+    model_type: str,
+    model: str,
+    validate: Optional[Callable[[Any], bool]] = None,
+) -> tuple[Any, dict]:
+    """Return `generate()`'s (out, extra), served from the cache when possible.
+
+    `generate` is only called on a miss (or when bypassed). On a hit, `extra`
+    is the stored one plus `llm_cache` naming the tier that served it.
+
+    Only responses that pass `validate(out)` are stored, so a malformed one
+    isn't replayed for the whole TTL: it's returned uncached (for the caller to
+    reject), and a cached response that fails it is evicted and regenerated.
+    """
+    template_name = template_path.stem
+    ttl = get_ttl_seconds(template_name)
+    if ttl <= 0 or not llm_cache_enabled():
+        return generate()
+
+    key = make_cache_key(
+        template_path,
+        context_d,
+        model_type=model_type,
+        model=model,
+        response_json=response_json,
+    )
+
+    if getattr(_bypass, "active", False):
+        _count("bypassed")
+    else:
+        tier = "memory"
+        serialised = _memory_get(key)
+        if serialised is None:
+            tier = "disk"
+            found = _disk_get(key)
+            if found is None:
+                tier = "db"
+                found = _db_get(key)
+                if found is not None:
+                    _disk_put(key, *found)
+            if found is not None:
+                _memory_put(key, *found)
+                serialised = found[1]
+        if serialised is not None:
+            cached = json.loads(serialised)
+            if validate is None or validate(cached["out"]):
+                _count(f"hits_{tier}")
+                extra = cached["extra"] if isinstance(cached["extra"], dict) else {}
+                extra["llm_cache"] = tier
+                return cached["out"], extra
+            logger.warning(
+                f"[llm_cache] evicting invalid cached {template_name} response"
+            )
+            _count("invalid")
+            _evict(key)
+        _count("misses")
+
+    out, extra = generate()
+    if validate is not None and not validate(out):
+        logger.warning(f"[llm_cache] not caching invalid {template_name} response")
+        _count("invalid")
+        return out, extra
+
+    try:
+        # default=str because `extra` can carry non-JSON values (e.g. Paths)
+        serialised = json.dumps({"out": out, "extra": extra}, ensure_ascii=False, default=str)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"[llm_cache] not caching {template_name} response: {e}")
+        return out, extra
+    stored = json.loads(serialised)
+    expires_at = time.time() + ttl
+    _memory_put(key, expires_at, serialised)
+    _disk_put(key, expires_at, serialised)
+    _db_put(
+        key,
+        template_name,
+        model,
+        response_json,
+        expires_at,
+        stored["out"],
+        stored["extra"],
+    )
+    _count("writes")
+    return out, extra
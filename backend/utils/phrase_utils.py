@@ -3,9 +3,19 @@
 Contains shared functionality for phrase-related operations.
 """
 
-from typing import Optional, List
-from peewee import fn, DoesNotExist
-from db_models import Phrase, RelatedPhrase, PhraseExampleSentence, Sentence
+import json
+from datetime import datetime
+from typing import Iterable, Optional, List
+from loguru import logger
+from peewee import EXCLUDED, Cast, Expression, Value, fn, DoesNotExist
+from slugify import slugify
+from db_models import (
+    Phrase,
+    RelatedPhrase,
+    PhraseExampleSentence,
+    Sentence,
+    SourcefilePhrase,
+)
 
 
 def get_phrases_query(target_language_code: str, sort_by: str = "alpha"):
@@ -31,6 +41,216 @@ def get_phrases_query(target_language_code: str, sort_by: str = "alpha"):
     return query
 
 
+def _raw_forms_jsonb():
+    # Matches the GIN expression index phrase_raw_forms_jsonb on (raw_forms::jsonb)
+    return Phrase.raw_forms.cast("jsonb")
+
+
+def find_phrases_by_surfaces(
+    target_language_code: str, surfaces: Iterable[str]
+) -> dict[str, Phrase]:
+    """Resolve many phrase surfaces at once, by canonical form or any raw form.
+
+    Runs as one query: canonical forms use the (canonical_form, target_language_code)
+    index, raw forms the GIN index on `raw_forms::jsonb` (`?|` = contains any).
+    A canonical-form match wins over a raw-form match; otherwise the oldest phrase wins.
+
+    Returns:
+        Mapping of each surface that was found to its Phrase.
+    """
+    surfaces = list(dict.fromkeys(s for s in surfaces if s))
+    if not surfaces:
+        return {}
+
+    query = (
+        Phrase.select()
+        .where(
+            (Phrase.target_language_code == target_language_code)
+            & (
+                Phrase.canonical_form.in_(surfaces)
+                | Expression(_raw_forms_jsonb(), "?|", Value(surfaces, unpack=False))
+            )
+        )
+        .order_by(Phrase.id)
+    )
+
+    found: dict[str, Phrase] = {}
+    by_raw_form: dict[str, Phrase] = {}
+    wanted = set(surfaces)
+    for phrase in query:
+        if phrase.canonical_form in wanted:
+            found.setdefault(str(phrase.canonical_form), phrase)
+        for raw_form in phrase.raw_forms or []:
+            if raw_form in wanted:
+                by_raw_form.setdefault(raw_form, phrase)
+    for surface, phrase in by_raw_form.items():
+        found.setdefault(surface, phrase)
+    return found
+
+
+def find_phrase_by_surface(target_language_code: str, surface: str) -> Optional[Phrase]:
+    """Find a phrase by its canonical form, falling back to an indexed raw-form match."""
+    phrase = (
+        Phrase.select()
+        .where(
+            (Phrase.canonical_form == surface)
+            & (Phrase.target_language_code == target_language_code)
+        )
+        .first()
+    )
+    if phrase is not None:
+        return phrase
+
+    return (
+        Phrase.select()
+        .where(
+            (Phrase.target_language_code == target_language_code)
+            & Expression(
+                _raw_forms_jsonb(),
+                "@>",
+                Cast(Value(json.dumps([surface]), unpack=False), "jsonb"),
+            )
+        )
+        .order_by(Phrase.id)
+        .first()
+    )
+
+
+def _phrase_row(phrase_d: dict, target_language_code: str, now: datetime) -> dict:
+    """Column values for an extracted phrase, with the defaults used on save."""
+    canonical_form = phrase_d["canonical_form"]
+    return {
+        "canonical_form": canonical_form,
+        "target_language_code": target_language_code,
+        "raw_forms": phrase_d.get("raw_forms", [canonical_form]),
+        "translations": phrase_d.get("translations", []),
+        "literal_translation": phrase_d.get("literal_translation", ""),
+        "part_of_speech": phrase_d.get("part_of_speech", "phrase"),
+        "register": phrase_d.get("register", "neutral"),
+        "commonality": phrase_d.get("commonality", 0.5),
+        "guessability": phrase_d.get("guessability", 0.5),
+        "etymology": phrase_d.get("etymology", ""),
+        "cultural_context": phrase_d.get("cultural_context", ""),
+        "mnemonics": phrase_d.get("mnemonics", []),
+        "component_words": phrase_d.get("component_words", []),
+        "usage_notes": phrase_d.get("usage_notes", ""),
+        "language_level": phrase_d.get("language_level"),  # CEFR level from the LLM
+        "slug": slugify(str(canonical_form))[:255],
+        "created_by": Phrase.current_user_id(),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# Set from the extracted data on every save; slug and created_by are kept
+_PHRASE_UPDATE_FIELDS = (
+    "raw_forms",
+    "translations",
+    "literal_translation",
+    "part_of_speech",
+    "register",
+    "commonality",
+    "guessability",
+    "etymology",
+    "cultural_context",
+    "mnemonics",
+    "component_words",
+    "usage_notes",
+    "language_level",
+    "updated_at",
+)
+
+
+def upsert_phrases(
+    phrases_d: list[dict], target_language_code: str, sourcefile_entry=None
+) -> dict[str, Phrase]:
+    """Save extracted phrases, and link them to a sourcefile, in a few statements.
+
+    Phrases are deduped by canonical form (a later duplicate wins) and upserted
+    with one INSERT ... ON CONFLICT (canonical_form, target_language_code)
+    DO UPDATE ... RETURNING. With a sourcefile, the SourcefilePhrase rows are
+    upserted the same way, with `ordering` = position in `phrases_d` and the
+    phrase's `centrality`. New phrases get a slug from their canonical form;
+    one whose slug already belongs to a different phrase is skipped (logged).
+
+    Returns:
+        Mapping of canonical form to saved Phrase
+    """
+    if not phrases_d:
+        return {}
+    now = datetime.now()
+    rows = {}
+    for phrase_d in phrases_d:
+        rows[phrase_d["canonical_form"]] = _phrase_row(phrase_d, target_language_code, now)
+
+    # Existing phrases keep their slug, so only new ones can collide on it
+    existing = list(
+        Phrase.select(Phrase.canonical_form, Phrase.slug).where(
+            (Phrase.target_language_code == target_language_code)
+            & (
+                Phrase.canonical_form.in_(list(rows))
+                | Phrase.slug.in_([row["slug"] for row in rows.values()])
+            )
+        )
+    )
+    existing_forms = {phrase.canonical_form for phrase in existing}
+    slug_owners = {phrase.slug: phrase.canonical_form for phrase in existing}
+    for canonical_form, row in list(rows.items()):
+        if canonical_form in existing_forms:
+            continue
+        owner = slug_owners.setdefault(row["slug"], canonical_form)
+        if owner != canonical_form:
+            logger.warning(
+                f"Skipping phrase '{canonical_form}': slug '{row['slug']}' "
+                f"is already used by '{owner}'"
+            )
+            del rows[canonical_form]
+    if not rows:
+        return {}
+
+    with Phrase._meta.database.atomic():
+        update = {
+            getattr(Phrase, name): getattr(EXCLUDED, name)
+            for name in _PHRASE_UPDATE_FIELDS
+        }
+        update[Phrase.slug] = fn.COALESCE(Phrase.slug, EXCLUDED.slug)
+        phrases = {
+            phrase.canonical_form: phrase
+            for phrase in Phrase.insert_many(list(rows.values()))
+            .on_conflict(
+                conflict_target=[Phrase.canonical_form, Phrase.target_language_code],
+                update=update,
+            )
+            .returning(Phrase)
+            .execute()
+        }
+
+        if sourcefile_entry is not None:
+            links = {}
+            for ordering, phrase_d in enumerate(phrases_d, start=1):
+                phrase = phrases.get(phrase_d["canonical_form"])
+                if phrase is None:
+                    continue
+                links[phrase.id] = {
+                    "sourcefile": sourcefile_entry,
+                    "phrase": phrase.id,
+                    "centrality": phrase_d.get("centrality", 0.5),
+                    "ordering": ordering,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            SourcefilePhrase.insert_many(list(links.values())).on_conflict(
+                conflict_target=[SourcefilePhrase.sourcefile, SourcefilePhrase.phrase],
+                update={
+                    SourcefilePhrase.centrality: EXCLUDED.centrality,
+                    SourcefilePhrase.ordering: EXCLUDED.ordering,
+                    SourcefilePhrase.updated_at: EXCLUDED.updated_at,
+                },
+            ).execute()
+
+    return phrases
+
+
 def get_phrase_by_slug(target_language_code: str, slug: str) -> Phrase:
     """Get a specific phrase by its language code and slug.
 
@@ -7,11 +7,15 @@ text to ensure parity with rendering.
 
 from __future__ import annotations
 
-from typing import List, Tuple, Optional
+from array import array
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Sequence, Tuple, Optional
+import threading
 import unicodedata
 import os
 from config import (
     SEGMENTATION_DEFAULT as CFG_SEG_DEFAULT,
+    SEGMENTATION_PARALLEL_MIN_CHARS as CFG_SEG_PARALLEL_MIN_CHARS,
     SEGMENTATION_PER_LANG_DEFAULTS as CFG_SEG_LANG_DEFAULTS,
     PYTHAINLP_ENGINE_DEFAULT as CFG_THAI_ENGINE_DEFAULT,
 )
@@ -107,7 +111,14 @@ def _segment_text_with_pythainlp(text_nfc: str) -> Optional[List[Tuple[int, int,
     return spans
 
 
+@lru_cache(maxsize=None)
 def _choose_engine_for(lang_code: str) -> str:
+    """Return the configured engine for a language.
+
+    Memoized, since it is called for every segmentation and may attempt a
+    pythainlp import. Call `reset_segmentation_caches()` after changing the
+    SEGMENTATION_* env vars at runtime.
+    """
     # Per-language override via env e.g. SEGMENTATION_TH=pythainlp
     override = os.getenv(f"SEGMENTATION_{lang_code.upper()}")
     if override:
@@ -137,48 +148,61 @@ def _choose_engine_for(lang_code: str) -> str:
     return default_engine or "icu"
 
 
-def segment_text_to_word_spans(text: str, lang_code: str) -> List[Tuple[int, int, str, bool]]:
-    """Segment text into word spans using ICU when available.
+# ICU BreakIterators are not thread-safe, so each thread keeps its own pool,
+# one iterator per locale, re-pointed at each new text with setText()
+_thread_local = threading.local()
 
-    Returns a list of tuples: (start, end, token, is_wordlike)
 
-    - start/end are character indices in the NFC-normalized text
-    - token is the substring text[start:end]
-    - is_wordlike indicates if ICU classifies the span as letter/number/kana/ideo
-    """
+def _get_word_break_iterator(lang_code: str):
+    iterators = getattr(_thread_local, "word_break_iterators", None)
+    if iterators is None:
+        iterators = _thread_local.word_break_iterators = {}
+    locale_id = icu_locale_for(lang_code)
+    bi = iterators.get(locale_id)
+    if bi is None:
+        bi = iterators[locale_id] = BreakIterator.createWordInstance(Locale(locale_id))
+    return bi
 
-    text_nfc = ensure_nfc(text)
+
+def reset_segmentation_caches() -> None:
+    """Forget memoized engine choices (e.g. after changing env vars in tests)."""
+
+    _choose_engine_for.cache_clear()
+    get_engine_name_for.cache_clear()
+
+
+def _iter_offsets(text_nfc: str, lang_code: str) -> Iterator[Tuple[int, int, bool]]:
+    """Yield (start, end, is_wordlike) spans covering the NFC text."""
 
     # Thai plugin path if explicitly chosen
     engine = _choose_engine_for(lang_code)
     if lang_code.lower() == "th" and engine == "pythainlp":
         spans = _segment_text_with_pythainlp(text_nfc)
         if spans is not None:
-            return spans
+            for start, end, _token, is_wordlike in spans:
+                yield start, end, is_wordlike
+            return
 
     if _ICU_AVAILABLE:
-        locale = Locale(icu_locale_for(lang_code))
-        bi = BreakIterator.createWordInstance(locale)
+        # The pooled iterator is shared within this thread, so callers must
+        # consume this generator fully before segmenting another text
+        bi = _get_word_break_iterator(lang_code)
         bi.setText(text_nfc)
 
-        spans: List[Tuple[int, int, str, bool]] = []
         start = bi.first()
         for end in iter(lambda: bi.next(), -1):
             if end == -1:
                 break
             status = bi.getRuleStatus()
             # Anything other than UBRK_WORD_NONE is considered a word-like token
-            is_wordlike = status != UBRK_WORD_NONE
             if start < end:
-                token = text_nfc[start:end]
-                spans.append((start, end, token, is_wordlike))
+                yield start, end, status != UBRK_WORD_NONE
             start = end
-        return spans
+        return
 
     # Fallback: if ICU unavailable or plugin import failed, naive segmentation.
     # This is only to keep functionality when ICU isn't present; it is not
     # sufficient for languages like Thai/Chinese/Japanese.
-    spans: List[Tuple[int, int, str, bool]] = []
     i = 0
     n = len(text_nfc)
     while i < n:
@@ -187,7 +211,7 @@ def segment_text_to_word_spans(text: str, lang_code: str) -> List[Tuple[int, int
             j = i
             while j < n and text_nfc[j].isspace():
                 j += 1
-            spans.append((i, j, text_nfc[i:j], False))
+            yield i, j, False
             i = j
             continue
 
@@ -196,18 +220,136 @@ def segment_text_to_word_spans(text: str, lang_code: str) -> List[Tuple[int, int
         while j < n and (text_nfc[j].isalnum() or text_nfc[j] == "_"):
             j += 1
         if j > i:
-            token = text_nfc[i:j]
-            spans.append((i, j, token, True))
+            yield i, j, True
             i = j
             continue
 
         # Single punctuation/symbol -> non-wordlike span
-        spans.append((i, i + 1, text_nfc[i : i + 1], False))
+        yield i, i + 1, False
         i += 1
-    return spans
 
 
+def segment_text_to_word_spans(text: str, lang_code: str) -> List[Tuple[int, int, str, bool]]:
+    """Segment text into word spans using ICU when available.
+
+    Returns a list of tuples: (start, end, token, is_wordlike)
 
+    - start/end are character indices in the NFC-normalized text
+    - token is the substring text[start:end]
+    - is_wordlike indicates if ICU classifies the span as letter/number/kana/ideo
+    """
+
+    text_nfc = ensure_nfc(text)
+    return [
+        (start, end, text_nfc[start:end], is_wordlike)
+        for start, end, is_wordlike in _iter_offsets(text_nfc, lang_code)
+    ]
+
+
+class SegmentedText(NamedTuple):
+    """Compact, array-backed spans for one text, as returned by `segment_many()`.
+
+    Span i covers `text[starts[i]:ends[i]]`; `wordlike[i]` is 1 for word-like spans.
+    Offsets refer to the NFC-normalized `text`.
+    """
+
+    text: str
+    starts: array
+    ends: array
+    wordlike: array
+
+    def token(self, i: int) -> str:
+        return self.text[self.starts[i] : self.ends[i]]
+
+    def to_spans(self) -> List[Tuple[int, int, str, bool]]:
+        """Return the same 4-tuples as `segment_text_to_word_spans()`."""
+        return [
+            (start, end, self.text[start:end], bool(flag))
+            for start, end, flag in zip(self.starts, self.ends, self.wordlike)
+        ]
+
+
+def _segment_to_arrays(text_nfc: str, lang_code: str) -> Tuple[array, array, array]:
+    starts, ends, wordlike = array("l"), array("l"), array("b")
+    for start, end, is_wordlike in _iter_offsets(text_nfc, lang_code):
+        starts.append(start)
+        ends.append(end)
+        wordlike.append(1 if is_wordlike else 0)
+    return starts, ends, wordlike
+
+
+def _split_after_paragraphs(text_nfc: str, min_chunk_chars: int) -> List[Tuple[int, str]]:
+    """Split text just after blank-line paragraph breaks into chunks of at least
+    `min_chunk_chars`, returning (offset, chunk) pairs."""
+
+    chunks: List[Tuple[int, str]] = []
+    chunk_start = 0
+    search_from = 0
+    n = len(text_nfc)
+    while True:
+        pos = text_nfc.find("\n\n", search_from)
+        if pos == -1:
+            break
+        cut = pos + 2
+        search_from = cut
+        if cut - chunk_start >= min_chunk_chars and cut < n:
+            chunks.append((chunk_start, text_nfc[chunk_start:cut]))
+            chunk_start = cut
+    chunks.append((chunk_start, text_nfc[chunk_start:]))
+    return chunks
+
+
+def segment_many(
+    texts: Sequence[str],
+    lang_code: str,
+    processes: int = 0,
+) -> List[SegmentedText]:
+    """Segment a batch of texts in one call.
+
+    With `processes` > 1, texts of at least SEGMENTATION_PARALLEL_MIN_CHARS are
+    split at paragraph breaks and the pieces segmented across a process pool.
+    This is only done for the ICU engine, where a line break is always a word
+    boundary, so the spans are identical to segmenting the whole text at once.
+    """
+
+    texts_nfc = [ensure_nfc(text) for text in texts]
+    parallel = (
+        processes > 1
+        and get_engine_name_for(lang_code) == "icu"
+        and any(len(t) >= CFG_SEG_PARALLEL_MIN_CHARS for t in texts_nfc)
+    )
+    if not parallel:
+        return [
+            SegmentedText(text_nfc, *_segment_to_arrays(text_nfc, lang_code))
+            for text_nfc in texts_nfc
+        ]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    results: List[SegmentedText] = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for text_nfc in texts_nfc:
+            if len(text_nfc) < CFG_SEG_PARALLEL_MIN_CHARS:
+                results.append(
+                    SegmentedText(text_nfc, *_segment_to_arrays(text_nfc, lang_code))
+                )
+                continue
+            chunks = _split_after_paragraphs(
+                text_nfc, max(1, len(text_nfc) // (processes * 4))
+            )
+            starts, ends, wordlike = array("l"), array("l"), array("b")
+            chunk_results = pool.map(
+                _segment_to_arrays, [chunk for _offset, chunk in chunks], [lang_code] * len(chunks)
+            )
+            for (offset, _chunk), (c_starts, c_ends, c_wordlike) in zip(chunks, chunk_results):
+                starts.extend(start + offset for start in c_starts)
+                ends.extend(end + offset for end in c_ends)
+                wordlike.extend(c_wordlike)
+            results.append(SegmentedText(text_nfc, starts, ends, wordlike))
+    return results
+
+
+@lru_cache(maxsize=None)
 def get_engine_name_for(lang_code: str) -> str:
     """Return the segmentation engine name that would be used for a language.
 
@@ -226,4 +368,3 @@ def get_engine_name_for(lang_code: str) -> str:
     if _ICU_AVAILABLE:
         return "icu"
     return "naive"
-
@@ -5,7 +5,6 @@ from db_models import (
     Sentence,
     Lemma,
     SentenceLemma,
-    Wordform,
     Profile,
     UserLemma,
     SentenceAudio,
@@ -18,7 +17,7 @@ from utils.vocab_llm_utils import (
     create_interactive_word_links,
 )
 from utils.prompt_utils import get_prompt_template_path
-from utils.word_utils import normalize_text
+from utils.lexicon_index import lookup_wordforms_for_tokens
 
 
 def generate_sentence(
@@ -269,21 +268,12 @@ def get_detailed_sentence_data(target_language_code: str, slug: str) -> dict:
     # Extract tokens from the sentence text
     tokens_in_text = extract_tokens(str(sentence.sentence))
 
-    # Query database for all wordforms in this language
-    wordforms = list(
-        Wordform.select().where((Wordform.target_language_code == target_language_code))
-    )
-
-    # Filter wordforms in Python using normalize_text
-    normalized_tokens = {normalize_text(t) for t in tokens_in_text}
-    wordforms = [
-        wf for wf in wordforms if normalize_text(wf.wordform) in normalized_tokens
-    ]
+    # Resolve only the tokens present in the sentence via the per-language index
+    wordforms = lookup_wordforms_for_tokens(target_language_code, tokens_in_text)
 
-    # Convert to dictionary format
+    # Add junction-style fields expected by the link renderer
     wordforms_d = []
-    for wordform in wordforms:
-        wordform_d = wordform.to_dict()
+    for wordform_d in wordforms:
         wordform_d["centrality"] = 0.3  # Default centrality
         wordform_d["ordering"] = len(wordforms_d) + 1
         wordforms_d.append(wordform_d)
@@ -0,0 +1,190 @@
+"""Single-flight coalescing for expensive generation (LLM calls plus DB writes).
+
+When several requests need the same missing thing at once (e.g. a new text is
+published and everyone opens the same unknown lemma), only one of them should
+generate it. `single_flight(key, generate, recheck=...)` makes sure of that:
+
+- within a process, the first caller for a key runs `generate()` and the
+  others wait for its result (or its exception)
+- across processes, the runner also holds a Postgres advisory lock derived
+  from the key. Once it has the lock it calls `recheck()` first, so a worker
+  that queued behind another picks up the row that worker just saved instead
+  of generating it again. If the lock can't be released, the connection is
+  closed rather than returned to the pool still holding it.
+
+Waiters give up with `SingleFlightTimeout` after `SINGLE_FLIGHT_TIMEOUT_SECONDS`.
+`in_flight(keys)` tells callers which keys are being generated right now, so
+background work can skip them instead of queuing a duplicate.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from loguru import logger
+from playhouse.pool import PooledDatabase
+
+from config import SINGLE_FLIGHT_TIMEOUT_SECONDS
+from utils.exceptions import SingleFlightTimeout
+
+T = TypeVar("T")
+
+# How often to retry pg_try_advisory_lock while another worker holds it
+ADVISORY_LOCK_POLL_SECONDS = 0.2
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+_lock = threading.Lock()
+_flights: dict[tuple, _Flight] = {}
+
+
+def advisory_lock_id(key: tuple) -> int:
+    """Stable signed 64-bit id for a key, as pg_advisory_lock expects."""
+    digest = hashlib.sha256(repr(key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _get_database():
+    from db_models import Lemma
+
+    return Lemma._meta.database
+
+
+def in_flight(keys: Iterable[tuple]) -> set[tuple]:
+    """The keys a single_flight() leader is running now, here or in another worker.
+
+    Other workers are found by their advisory lock in pg_locks, in one query.
+    """
+    keys = list(dict.fromkeys(keys))
+    with _lock:
+        found = {key for key in keys if key in _flights}
+    key_by_lock_id = {advisory_lock_id(key): key for key in keys if key not in found}
+    if key_by_lock_id:
+        # A bigint advisory lock id is split into classid (high) and objid (low)
+        rows = _get_database().execute_sql(
+            "SELECT (classid::bigint << 32) | objid::bigint FROM pg_locks "
+            "WHERE locktype = 'advisory' AND objsubid = 1 AND granted "
+            "AND database = (SELECT oid FROM pg_database "
+            "WHERE datname = current_database()) "
+            "AND (classid::bigint << 32) | objid::bigint = ANY(%s)",
+            (list(key_by_lock_id),),
+        ).fetchall()
+        found.update(key_by_lock_id[lock_id] for (lock_id,) in rows)
+    return found
+
+
+def _acquire_advisory_lock(database, lock_id: int, deadline: float) -> bool:
+    while True:
+        acquired = database.execute_sql(
+            "SELECT pg_try_advisory_lock(%s)", (lock_id,)
+        ).fetchone()[0]
+        if acquired:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(ADVISORY_LOCK_POLL_SECONDS)
+
+
+def _discard_connection(database) -> None:
+    """Close this thread's connection instead of returning it to the pool.
+
+    Ending the session releases any advisory locks it still holds.
+    """
+    try:
+        if isinstance(database, PooledDatabase):
+            database.manual_close()
+        else:
+            database.close()
+    except Exception as e:
+        logger.error(f"[single_flight] could not close connection: {e}")
+
+
+def _release_advisory_lock(database, key: tuple, lock_id: int) -> None:
+    try:
+        released = database.execute_sql(
+            "SELECT pg_advisory_unlock(%s)", (lock_id,)
+        ).fetchone()[0]
+        if released:
+            return
+        logger.warning(f"[single_flight] lock for {key} was not held on release")
+    except Exception as e:
+        logger.warning(f"[single_flight] could not release lock for {key}: {e}")
+    # Otherwise a pooled connection could keep the lock, stalling every later
+    # request for this key until it timed out
+    _discard_connection(database)
+
+
+def _run_leader(
+    key: tuple,
+    generate: Callable[[], T],
+    recheck: Optional[Callable[[], Optional[T]]],
+    deadline: float,
+) -> T:
+    database = _get_database()
+    lock_id = advisory_lock_id(key)
+    if not _acquire_advisory_lock(database, lock_id, deadline):
+        raise SingleFlightTimeout(f"Timed out waiting for another worker on {key}")
+    try:
+        if recheck is not None:
+            existing = recheck()
+            if existing is not None:
+                logger.info(f"[single_flight] {key} was generated by another worker")
+                return existing
+        return generate()
+    finally:
+        _release_advisory_lock(database, key, lock_id)
+
+
+def single_flight(
+    key: tuple,
+    generate: Callable[[], T],
+    *,
+    recheck: Optional[Callable[[], Optional[T]]] = None,
+    timeout: Optional[float] = None,
+) -> T:
+    """Run `generate()` once per key across concurrent callers and return its result.
+
+    Args:
+        key: Identifies the work, e.g. ("lemma_metadata", "el", "καλός")
+        generate: Does the work (typically calls the LLM and saves the result)
+        recheck: Called once the cross-process lock is held; return the already
+            saved result if another worker has produced it, else None
+        timeout: Seconds to wait for another caller before SingleFlightTimeout
+
+    Callers in the same process share the leader's result object.
+    """
+    timeout = SINGLE_FLIGHT_TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    with _lock:
+        flight = _flights.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _flights[key] = _Flight()
+
+    if not is_leader:
+        if not flight.done.wait(timeout):
+            raise SingleFlightTimeout(f"Timed out waiting for {key}")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _run_leader(key, generate, recheck, deadline)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            del _flights[key]
+        flight.done.set()
@@ -1,9 +1,15 @@
 from flask import abort, redirect, url_for
-from peewee import DoesNotExist, fn
+from peewee import JOIN, SQL, DoesNotExist, Window, fn
 from config import (
     SOURCE_EXTENSIONS,
 )
-from db_models import Sourcedir, Sourcefile, SourcefilePhrase
+from db_models import (
+    Sourcedir,
+    Sourcefile,
+    SourcefileBlob,
+    SourcefilePhrase,
+    SourcefileWordform,
+)
 from utils.url_registry import endpoint_for
 from utils.lang_utils import get_language_name, get_all_languages
 
@@ -23,6 +29,57 @@ def _get_sourcedir_entry(target_language_code: str, sourcedir_slug: str) -> Sour
     )
 
 
+def _navigation_rows(sourcedir: Sourcedir, sourcefile_slug: str) -> dict:
+    """Position, neighbours and ends of a sourcefile within its directory.
+
+    One query over a slug/filename-only projection, ordered by
+    LOWER(filename) (indexed, with id as a tie-break): row_number/LAG/LEAD
+    give the position and neighbours, FIRST_VALUE/LAST_VALUE and
+    count(*) OVER () the ends and total. Returns {"current": row or None,
+    "first": the first file's row or None}.
+    """
+    order_by = [fn.LOWER(Sourcefile.filename), Sourcefile.id]
+    window = Window(order_by=order_by).alias("w")
+    whole = Window(
+        order_by=order_by, start=Window.preceding(), end=Window.following()
+    ).alias("whole")
+    ordered = (
+        Sourcefile.select(
+            Sourcefile.slug,
+            Sourcefile.filename,
+            fn.ROW_NUMBER().over(window=window).alias("position"),
+            fn.COUNT(SQL("*")).over(window=whole).alias("total_files"),
+            fn.LAG(Sourcefile.slug).over(window=window).alias("prev_slug"),
+            fn.LAG(Sourcefile.filename).over(window=window).alias("prev_filename"),
+            fn.LEAD(Sourcefile.slug).over(window=window).alias("next_slug"),
+            fn.LEAD(Sourcefile.filename).over(window=window).alias("next_filename"),
+            fn.FIRST_VALUE(Sourcefile.slug).over(window=whole).alias("first_slug"),
+            fn.FIRST_VALUE(Sourcefile.filename)
+            .over(window=whole)
+            .alias("first_filename"),
+            fn.LAST_VALUE(Sourcefile.slug).over(window=whole).alias("last_slug"),
+            fn.LAST_VALUE(Sourcefile.filename).over(window=whole).alias("last_filename"),
+        )
+        .where(Sourcefile.sourcedir == sourcedir)
+        .window(window, whole)
+        .cte("ordered")
+    )
+    # The first row too, for the ends and total if the slug isn't found
+    rows = list(
+        ordered.select_from(SQL("*"))
+        .where((ordered.c.slug == sourcefile_slug) | (ordered.c.position == 1))
+        .order_by(ordered.c.position)
+        .bind(Sourcefile._meta.database)
+        .dicts()
+    )
+    return {
+        "current": next(
+            (row for row in rows if row["slug"] == sourcefile_slug), None
+        ),
+        "first": rows[0] if rows else None,
+    }
+
+
 def _navigate_sourcefile(
     target_language_code: str,
     sourcedir_slug: str,
@@ -36,48 +93,30 @@ def _navigate_sourcefile(
     try:
         # Get the sourcedir entry
         sourcedir_entry = _get_sourcedir_entry(target_language_code, sourcedir_slug)
+    except DoesNotExist:
+        abort(404)
 
-        # Get all sourcefiles ordered by filename (case-insensitive)
-        sourcefiles = (
-            Sourcefile.select()
-            .where(Sourcefile.sourcedir == sourcedir_entry)
-            .order_by(fn.LOWER(Sourcefile.filename))
-        )
-
-        # Convert to list for easier manipulation
-        slugs = [sf.slug for sf in sourcefiles]
-
-        try:
-            current_index = slugs.index(sourcefile_slug)
-            target_index = current_index + increment
-
-            if 0 <= target_index < len(slugs):
-                # Valid navigation
-                target_slug = slugs[target_index]
-            else:
-                # At boundary (first/last file), stay on current page
-                target_slug = sourcefile_slug
-
-            return redirect(
-                url_for(
-                    endpoint_for(inspect_sourcefile_vw),
-                    target_language_code=target_language_code,
-                    sourcedir_slug=sourcedir_slug,
-                    sourcefile_slug=target_slug,
-                )
-            )
-        except ValueError:
-            # File not found, go back to directory
-            return redirect(
-                url_for(
-                    endpoint_for(sourcefiles_for_sourcedir_vw),
-                    target_language_code=target_language_code,
-                    sourcedir_slug=sourcedir_slug,
-                )
+    current = _navigation_rows(sourcedir_entry, sourcefile_slug)["current"]
+    if current is None:
+        # File not found, go back to directory
+        return redirect(
+            url_for(
+                endpoint_for(sourcefiles_for_sourcedir_vw),
+                target_language_code=target_language_code,
+                sourcedir_slug=sourcedir_slug,
             )
+        )
 
-    except DoesNotExist:
-        abort(404)
+    # At boundary (first/last file), stay on current page
+    target_slug = current["next_slug" if increment > 0 else "prev_slug"]
+    return redirect(
+        url_for(
+            endpoint_for(inspect_sourcefile_vw),
+            target_language_code=target_language_code,
+            sourcedir_slug=sourcedir_slug,
+            sourcefile_slug=target_slug or sourcefile_slug,
+        )
+    )
 
 
 def _get_navigation_info(sourcedir: Sourcedir, sourcefile_slug: str) -> dict:
@@ -102,16 +141,10 @@ def _get_navigation_info(sourcedir: Sourcedir, sourcefile_slug: str) -> dict:
     - first_filename: filename of the first file
     - last_filename: filename of the last file
     """
-    # Get all sourcefiles ordered by filename (case-insensitive)
-    sourcefiles = list(
-        Sourcefile.select()
-        .where(Sourcefile.sourcedir == sourcedir)
-        .order_by(fn.LOWER(Sourcefile.filename))
-    )
+    rows = _navigation_rows(sourcedir, sourcefile_slug)
+    current, first = rows["current"], rows["first"]
 
-    total_files = len(sourcefiles)
-
-    if total_files == 0:
+    if first is None:
         return {
             "is_first": True,
             "is_last": True,
@@ -126,65 +159,28 @@ def _get_navigation_info(sourcedir: Sourcedir, sourcefile_slug: str) -> dict:
             "last_filename": None,
         }
 
-    try:
-        # Convert to dictionaries with slug and filename for easier manipulation
-        file_info = [{"slug": sf.slug, "filename": sf.filename} for sf in sourcefiles]
-
-        # Get slugs for compatibility
-        slugs = [info["slug"] for info in file_info]
-
-        # Get first and last info
-        first_info = file_info[0] if file_info else None
-        last_info = file_info[-1] if file_info else None
-
-        first_slug = first_info["slug"] if first_info else None
-        last_slug = last_info["slug"] if last_info else None
-        first_filename = first_info["filename"] if first_info else None
-        last_filename = last_info["filename"] if last_info else None
-
-        # Find the current file's position in the ordered list
-        current_index = slugs.index(sourcefile_slug)
-        current_position = current_index + 1
-
-        # Determine previous and next info
-        prev_info = file_info[current_index - 1] if current_index > 0 else None
-        next_info = (
-            file_info[current_index + 1] if current_index < total_files - 1 else None
-        )
-
-        prev_slug = prev_info["slug"] if prev_info else None
-        next_slug = next_info["slug"] if next_info else None
-        prev_filename = prev_info["filename"] if prev_info else None
-        next_filename = next_info["filename"] if next_info else None
-
-        return {
-            "is_first": current_position == 1,
-            "is_last": current_position == total_files,
-            "total_files": total_files,
-            "current_position": current_position,
-            "prev_slug": prev_slug,
-            "next_slug": next_slug,
-            "first_slug": first_slug,
-            "last_slug": last_slug,
-            "sourcedir_path": sourcedir.path,
-            "prev_filename": prev_filename,
-            "next_filename": next_filename,
-            "first_filename": first_filename,
-            "last_filename": last_filename,
-        }
-    except (ValueError, IndexError):
+    ends = {
+        "total_files": first["total_files"],
+        "sourcedir_path": sourcedir.path,
+        "first_slug": first["first_slug"],
+        "last_slug": first["last_slug"],
+        "first_filename": first["first_filename"],
+        "last_filename": first["last_filename"],
+    }
+    if current is None:
         # File not found
-        return {
-            "is_first": True,
-            "is_last": True,
-            "total_files": total_files,
-            "current_position": 0,
-            "sourcedir_path": sourcedir.path,
-            "first_slug": first_slug if "first_slug" in locals() else None,
-            "last_slug": last_slug if "last_slug" in locals() else None,
-            "first_filename": first_filename if "first_filename" in locals() else None,
-            "last_filename": last_filename if "last_filename" in locals() else None,
-        }
+        return {"is_first": True, "is_last": True, "current_position": 0, **ends}
+
+    return {
+        "is_first": current["position"] == 1,
+        "is_last": current["position"] == current["total_files"],
+        "current_position": current["position"],
+        "prev_slug": current["prev_slug"],
+        "next_slug": current["next_slug"],
+        "prev_filename": current["prev_filename"],
+        "next_filename": current["next_filename"],
+        **ends,
+    }
 
 
 def get_sourcedir_or_404(target_language_code: str, sourcedir_slug: str) -> Sourcedir:
@@ -216,9 +212,18 @@ def get_sourcedirs_for_language(target_language_code: str, sort_by: str = "date"
     # Get supported languages for the dropdown
     supported_languages = get_all_languages()
 
-    # Query sourcedirs from database - filtered by language
-    query = Sourcedir.select().where(
-        Sourcedir.target_language_code == target_language_code
+    # Query sourcedirs from database - filtered by language - with their file
+    # and phrase counts in the same grouped query (rather than two per sourcedir)
+    query = (
+        Sourcedir.select(
+            Sourcedir,
+            fn.COUNT(Sourcefile.id.distinct()).alias("file_count"),
+            fn.COUNT(SourcefilePhrase.id).alias("phrase_count"),
+        )
+        .join(Sourcefile, JOIN.LEFT_OUTER)
+        .join(SourcefilePhrase, JOIN.LEFT_OUTER)
+        .where(Sourcedir.target_language_code == target_language_code)
+        .group_by(Sourcedir.id)
     )
 
     if sort_by == "date":
@@ -247,24 +252,12 @@ def get_sourcedirs_for_language(target_language_code: str, sort_by: str = "date"
             }
         )
 
-        # Count sourcefiles
-        sourcefile_count = (
-            Sourcefile.select().where(Sourcefile.sourcedir == sourcedir).count()
-        )
-        if sourcefile_count == 0:
+        if sourcedir.file_count == 0:
             empty_sourcedirs.append(sourcedir.slug)
 
-        # Count phrases
-        phrase_count = (
-            SourcefilePhrase.select()
-            .join(Sourcefile)
-            .where(Sourcefile.sourcedir == sourcedir)
-            .count()
-        )
-
         sourcedir_stats[sourcedir.slug] = {
-            "phrase_count": phrase_count,
-            "file_count": sourcefile_count,
+            "phrase_count": sourcedir.phrase_count,
+            "file_count": sourcedir.file_count,
             "path": sourcedir.path,
         }
 
@@ -294,10 +287,6 @@ def get_sourcefiles_for_sourcedir(target_language_code: str, sourcedir_slug: str
         - has_vocabulary: Boolean indicating if any file has vocabulary
         - supported_languages: List of supported languages
     """
-    from utils.lang_utils import get_language_name, get_all_languages
-    from db_models import Sourcefile
-    from peewee import fn, DoesNotExist
-
     target_language_name = get_language_name(target_language_code)
 
     # Get supported languages for the dropdown
@@ -306,24 +295,62 @@ def get_sourcefiles_for_sourcedir(target_language_code: str, sourcedir_slug: str
     # Get the sourcedir entry by slug
     sourcedir_entry = _get_sourcedir_entry(target_language_code, sourcedir_slug)
 
-    # Get all sourcefiles for this directory
-    sourcefiles = []
-    for sourcefile_entry in (
-        Sourcefile.select()
+    # Get all sourcefiles for this directory: just the listing columns, with
+    # per-file counts from pre-grouped subqueries and has_audio/has_image
+    # checked in SQL, so no text or blob bytes are transferred
+    def _counts(model):
+        return (
+            model.select(model.sourcefile, fn.COUNT(model.id).alias("n"))
+            .join(Sourcefile)
+            .where(Sourcefile.sourcedir == sourcedir_entry)
+            .group_by(model.sourcefile)
+        )
+
+    wordform_counts = _counts(SourcefileWordform).alias("wordform_counts")
+    phrase_counts = _counts(SourcefilePhrase).alias("phrase_counts")
+    query = (
+        Sourcefile.select(
+            Sourcefile.id,
+            Sourcefile.filename,
+            Sourcefile.slug,
+            Sourcefile.sourcefile_type,
+            Sourcefile.metadata,
+            Sourcefile.created_by,
+            Sourcefile.created_at,
+            Sourcefile.updated_at,
+            Sourcefile.ai_generated,
+            fn.COALESCE(wordform_counts.c.n, 0).alias("wordform_count"),
+            fn.COALESCE(phrase_counts.c.n, 0).alias("phrase_count"),
+            SourcefileBlob.audio_hash.is_null(False).alias("has_audio"),
+            fn.octet_length(SourcefileBlob.image_data).is_null(False).alias("has_image"),
+        )
+        .join(
+            wordform_counts,
+            JOIN.LEFT_OUTER,
+            on=(wordform_counts.c.sourcefile_id == Sourcefile.id),
+        )
+        .switch(Sourcefile)
+        .join(
+            phrase_counts,
+            JOIN.LEFT_OUTER,
+            on=(phrase_counts.c.sourcefile_id == Sourcefile.id),
+        )
+        .switch(Sourcefile)
+        .join(SourcefileBlob, JOIN.LEFT_OUTER)
         .where(Sourcefile.sourcedir == sourcedir_entry)
-        .order_by(fn.LOWER(Sourcefile.filename))
-    ):
-        # Count wordforms and phrases
-        wordform_count = sourcefile_entry.wordform_entries.count()
-        phrase_count = sourcefile_entry.phrase_entries.count()
+        .order_by(fn.LOWER(Sourcefile.filename), Sourcefile.id)
+    )
 
+    sourcefiles = []
+    for sourcefile_entry in query.objects():
         # Prepare metadata for each file
         metadata = {
             "created_at": sourcefile_entry.created_at,
             "updated_at": sourcefile_entry.updated_at,
-            "has_audio": sourcefile_entry.audio_data is not None,
-            "wordform_count": wordform_count,
-            "phrase_count": phrase_count,
+            "has_audio": sourcefile_entry.has_audio,
+            "has_image": sourcefile_entry.has_image,
+            "wordform_count": sourcefile_entry.wordform_count,
+            "phrase_count": sourcefile_entry.phrase_count,
         }
         if sourcefile_entry.metadata:
             if "image_processing" in sourcefile_entry.metadata:
@@ -0,0 +1,368 @@
+"""Background processing of sourcefiles through a Postgres-backed job queue.
+
+OCR, Whisper transcription and the translation/vocabulary LLM calls can take
+minutes, which is too long to hold an HTTP request open. Instead the processing
+endpoints call `enqueue_sourcefile_job()` and return straight away, and a worker
+(`flask process-sourcefile-jobs`, see `run_worker`) does the work:
+
+- jobs live in the `sourcefilejob` table, so they survive restarts
+- on Vercel, where there's no long-running process, a cron request drains the
+  queue instead (`GET /sys/cron/process-sourcefile-jobs`, views/system_views.py)
+- workers claim the oldest runnable job with FOR UPDATE SKIP LOCKED, so any
+  number of them can poll the same table without handing out a job twice
+- each step is built on the idempotent `ensure_*` helpers in sourcefile_utils.
+  A "process" job extracts the text, then runs the other steps concurrently
+  (utils/step_scheduler.py) and records which ones finished, so a retry only
+  re-runs the steps that failed
+- a failed attempt is retried after an exponential backoff
+  (`SOURCEFILE_JOB_RETRY_BASE_SECONDS`, doubling, capped at
+  `SOURCEFILE_JOB_RETRY_MAX_SECONDS`) until `max_attempts` is used up
+- while a job runs, its worker renews the lock (`locked_at`) every
+  `SOURCEFILE_JOB_HEARTBEAT_SECONDS`; a job left `running` by a worker that
+  died stops being renewed and is claimable again after
+  `SOURCEFILE_JOB_LOCK_TIMEOUT_SECONDS`
+
+Clients follow progress via the job status API (views/sourcefile_api_processing.py).
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Optional
+
+from loguru import logger
+from peewee import IntegrityError
+
+from config import (
+    SOURCEFILE_JOB_HEARTBEAT_SECONDS,
+    SOURCEFILE_JOB_LOCK_TIMEOUT_SECONDS,
+    SOURCEFILE_JOB_POLL_SECONDS,
+    SOURCEFILE_JOB_RETRY_BASE_SECONDS,
+    SOURCEFILE_JOB_RETRY_MAX_SECONDS,
+)
+from db_models import Sourcefile, SourcefileJob, SourcefilePhrase, SourcefileWordform
+from utils.sourcefile_utils import (
+    SOURCEFILE_STEP_PREREQUISITES,
+    ensure_text_extracted,
+    ensure_translation,
+    ensure_tricky_phrases,
+    ensure_tricky_wordforms,
+)
+from utils.step_scheduler import Step, run_steps
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# Individual steps; a full "process" job runs all of them (text extraction
+# first, see SOURCEFILE_STEP_PREREQUISITES)
+PROCESSING_STEPS = ("text_extraction", "translation", "wordforms", "phrases")
+PROCESS_ALL_STEP = "process"
+JOB_STEPS = PROCESSING_STEPS + (PROCESS_ALL_STEP,)
+
+
+def _run_text_extraction(sourcefile_entry: Sourcefile, params: dict) -> dict:
+    sourcefile_entry = ensure_text_extracted(sourcefile_entry)
+    return {"has_text": bool(sourcefile_entry.text_target)}
+
+
+def _run_translation(sourcefile_entry: Sourcefile, params: dict) -> dict:
+    sourcefile_entry = ensure_translation(sourcefile_entry)
+    return {"has_translation": bool(sourcefile_entry.text_english)}
+
+
+def _run_wordforms(sourcefile_entry: Sourcefile, params: dict) -> dict:
+    # The words are stored in one transaction after the LLM call, so a failed
+    # attempt doesn't leave half of them (the retry would ask the LLM to skip them)
+    ensure_tricky_wordforms(
+        ensure_text_extracted(sourcefile_entry),
+        language_level=params["language_level"],
+        max_new_words=params.get("max_new_words"),
+    )
+    return {
+        "wordforms_count": SourcefileWordform.select()
+        .where(SourcefileWordform.sourcefile == sourcefile_entry)
+        .count()
+    }
+
+
+def _run_phrases(sourcefile_entry: Sourcefile, params: dict) -> dict:
+    ensure_tricky_phrases(
+        ensure_text_extracted(sourcefile_entry),
+        language_level=params["language_level"],
+        max_new_phrases=params.get("max_new_phrases"),
+    )
+    return {
+        "phrases_count": SourcefilePhrase.select()
+        .where(SourcefilePhrase.sourcefile == sourcefile_entry)
+        .count()
+    }
+
+
+STEP_HANDLERS: dict[str, Callable[[Sourcefile, dict], dict]] = {
+    "text_extraction": _run_text_extraction,
+    "translation": _run_translation,
+    "wordforms": _run_wordforms,
+    "phrases": _run_phrases,
+}
+
+
+def enqueue_sourcefile_job(
+    sourcefile_entry: Sourcefile, step: str, params: Optional[dict] = None
+) -> SourcefileJob:
+    """Queue `step` for a sourcefile and return the job.
+
+    If the same step is already queued or running for this sourcefile, that job
+    is returned instead of queueing a duplicate.
+    """
+    if step not in JOB_STEPS:
+        raise ValueError(f"Unknown sourcefile job step: {step}")
+
+    def _active_job() -> Optional[SourcefileJob]:
+        return (
+            SourcefileJob.select()
+            .where(
+                (SourcefileJob.sourcefile == sourcefile_entry)
+                & (SourcefileJob.step == step)
+                & (SourcefileJob.status.in_(ACTIVE_JOB_STATUSES))
+            )
+            .first()
+        )
+
+    existing = _active_job()
+    if existing is not None:
+        return existing
+    try:
+        with SourcefileJob._meta.database.atomic():
+            job = SourcefileJob.create(
+                sourcefile=sourcefile_entry, step=step, params=params or {}
+            )
+    except IntegrityError:
+        # Lost a race with another request queueing the same step
+        existing = _active_job()
+        if existing is None:
+            raise
+        return existing
+    logger.info(
+        f"[sourcefile_jobs] queued {step} job {job.id} for sourcefile {sourcefile_entry.id}"
+    )
+    return job
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Backoff before the next attempt, after `attempts` failed ones."""
+    delay = SOURCEFILE_JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return min(delay, SOURCEFILE_JOB_RETRY_MAX_SECONDS)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker_id: Optional[str] = None) -> Optional[SourcefileJob]:
+    """Claim the next runnable job (marking it running), or return None.
+
+    Runnable means queued with `run_after` in the past, or running under a
+    lock not renewed for SOURCEFILE_JOB_LOCK_TIMEOUT_SECONDS. SKIP LOCKED lets
+    concurrent workers each take a different row without blocking.
+    """
+    worker_id = worker_id or default_worker_id()
+    database = SourcefileJob._meta.database
+    while True:
+        now = datetime.now()
+        stale_before = now - timedelta(seconds=SOURCEFILE_JOB_LOCK_TIMEOUT_SECONDS)
+        with database.atomic():
+            job = (
+                SourcefileJob.select()
+                .where(
+                    (
+                        (SourcefileJob.status == JOB_QUEUED)
+                        & (SourcefileJob.run_after <= now)
+                    )
+                    | (
+                        (SourcefileJob.status == JOB_RUNNING)
+                        & (SourcefileJob.locked_at < stale_before)
+                    )
+                )
+                .order_by(SourcefileJob.run_after, SourcefileJob.id)
+                .for_update("FOR UPDATE SKIP LOCKED")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status == JOB_RUNNING:
+                logger.warning(
+                    f"[sourcefile_jobs] reclaiming job {job.id} from lost worker {job.locked_by}"
+                )
+                if job.attempts >= job.max_attempts:
+                    _finish(job, JOB_FAILED, error=job.last_error or "Worker lost")
+                    continue
+            job.status = JOB_RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.save()
+            return job
+
+
+@contextmanager
+def _lock_heartbeat(job: SourcefileJob):
+    """Renew the job's lock in a background thread while the block runs.
+
+    Keeps a long OCR/Whisper/LLM job from looking lost and being claimed by
+    another worker while this one is still on it.
+    """
+    stop = threading.Event()
+    job_id, worker_id = job.id, job.locked_by
+
+    def beat() -> None:
+        while not stop.wait(SOURCEFILE_JOB_HEARTBEAT_SECONDS):
+            try:
+                with SourcefileJob._meta.database.connection_context():
+                    SourcefileJob.update(locked_at=datetime.now()).where(
+                        (SourcefileJob.id == job_id)
+                        & (SourcefileJob.status == JOB_RUNNING)
+                        & (SourcefileJob.locked_by == worker_id)
+                    ).execute()
+            except Exception as e:
+                logger.warning(f"[sourcefile_jobs] heartbeat for job {job_id} failed: {e}")
+
+    thread = threading.Thread(
+        target=beat, name=f"sourcefile-job-{job_id}-heartbeat", daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _finish(job: SourcefileJob, status: str, error: Optional[str] = None) -> None:
+    job.status = status
+    job.locked_by = None
+    job.locked_at = None
+    job.finished_at = datetime.now()
+    if error is not None:
+        job.last_error = error
+    job.save()
+
+
+def _run_step(name: str, sourcefile_id: int, params: dict) -> dict:
+    """Run one step on its own Sourcefile instance.
+
+    Steps run in separate threads and some save the sourcefile, so they
+    mustn't share (and overwrite each other's fields on) one model instance.
+    """
+    return STEP_HANDLERS[name](Sourcefile.get_by_id(sourcefile_id), params)
+
+
+def _run_steps(job: SourcefileJob) -> None:
+    """Run the job's outstanding step(s), independent ones concurrently.
+
+    Each successful step's result is saved even if another step fails, and
+    the first failure is then raised so the job is retried.
+    """
+    params = job.params or {}
+    result = dict(job.result or {})
+    completed = list(result.get("completed_steps", []))
+    requested = PROCESSING_STEPS if job.step == PROCESS_ALL_STEP else (job.step,)
+    pending = [step for step in requested if step not in completed]
+    outcomes = run_steps(
+        Step(
+            name,
+            partial(_run_step, name, job.sourcefile_id, params),
+            after=tuple(
+                dep for dep in SOURCEFILE_STEP_PREREQUISITES[name] if dep in pending
+            ),
+        )
+        for name in pending
+    )
+    timings = dict(result.get("step_seconds", {}))
+    for name, outcome in outcomes.items():
+        if not outcome.skipped:
+            timings[name] = round(outcome.seconds, 2)
+        if outcome.ok:
+            result.update(outcome.result)
+            completed.append(name)
+    result["completed_steps"] = completed
+    result["step_seconds"] = timings
+    job.result = result
+    job.save()
+    for outcome in outcomes.values():
+        if outcome.error is not None:
+            raise outcome.error
+
+
+def run_job(job: SourcefileJob) -> SourcefileJob:
+    """Run a claimed job, then mark it succeeded, failed, or queued for a retry."""
+    logger.info(
+        f"[sourcefile_jobs] running {job.step} job {job.id} "
+        f"(attempt {job.attempts}/{job.max_attempts})"
+    )
+    try:
+        with _lock_heartbeat(job):
+            _run_steps(job)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if job.attempts >= job.max_attempts:
+            logger.exception(f"[sourcefile_jobs] job {job.id} failed for good")
+            _finish(job, JOB_FAILED, error=error)
+        else:
+            delay = retry_delay_seconds(job.attempts)
+            logger.warning(
+                f"[sourcefile_jobs] job {job.id} failed ({error}), retrying in {delay:.0f}s"
+            )
+            job.status = JOB_QUEUED
+            job.locked_by = None
+            job.locked_at = None
+            job.last_error = error
+            job.run_after = datetime.now() + timedelta(seconds=delay)
+            job.save()
+        return job
+    _finish(job, JOB_SUCCEEDED)
+    logger.info(f"[sourcefile_jobs] job {job.id} succeeded")
+    return job
+
+
+def run_worker(
+    *,
+    worker_id: Optional[str] = None,
+    once: bool = False,
+    max_jobs: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    poll_seconds: float = SOURCEFILE_JOB_POLL_SECONDS,
+) -> int:
+    """Claim and run jobs until stopped. Returns the number of jobs run.
+
+    Args:
+        once: Stop as soon as the queue has nothing runnable
+        max_jobs: Stop after running this many jobs
+        max_seconds: Don't claim new jobs after running this long
+        poll_seconds: Sleep between polls while the queue is empty
+    """
+    worker_id = worker_id or default_worker_id()
+    logger.info(f"[sourcefile_jobs] worker {worker_id} started")
+    started = time.monotonic()
+    jobs_run = 0
+    while max_jobs is None or jobs_run < max_jobs:
+        if max_seconds is not None and time.monotonic() - started >= max_seconds:
+            break
+        job = claim_next_job(worker_id)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_seconds)
+            continue
+        run_job(job)
+        jobs_run += 1
+    logger.info(f"[sourcefile_jobs] worker {worker_id} stopping after {jobs_run} jobs")
+    return jobs_run
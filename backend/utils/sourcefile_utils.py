@@ -2,10 +2,13 @@
 import os
 import tempfile
 import json
+import hashlib
 from typing import Optional, cast, Dict, Any, Union
 from pathlib import Path
 import random
+from datetime import datetime
 from bs4 import BeautifulSoup
+from peewee import EXCLUDED, JOIN, IntegrityError, fn
 
 # Internal imports
 from config import (
@@ -18,10 +21,12 @@ from config import (
 )
 from db_models import (
     Lemma,
+    LemmaForm,
     Sourcefile,
     Wordform,
     SourcefileWordform,
     SourcefilePhrase,
+    SourcefileRecognition,
     Sourcedir,
 )
 from utils.audio_utils import transcribe_audio
@@ -34,7 +39,11 @@ from utils.misc_utils import pop_multi
 # from utils.parallelisation_utils import run_async
 from utils.sourcedir_utils import _get_sourcedir_entry, _get_navigation_info
 from utils.lang_utils import get_language_name
-from utils.store_utils import load_or_generate_lemma_metadata
+from utils.store_utils import (
+    generate_lemma_metadata_batch,
+    load_or_generate_lemma_metadata,
+)
+from utils.step_scheduler import Step, StepOutcome, run_steps
 from utils.types import LanguageLevel
 from utils.vocab_llm_utils import (
     extract_text_from_image,
@@ -42,7 +51,6 @@ from utils.vocab_llm_utils import (
     extract_tricky_words,
     process_phrases_from_text,
     create_interactive_word_links,
-    metadata_for_lemma_full,
 )
 
 """
@@ -50,9 +58,9 @@ This module handles processing of sourcefiles in different formats.
 
 Supported sourcefile types:
 - text: Direct text input, stored in text_target field
-- image: Image files that contain text, stored in image_data field
+- image: Image files that contain text, stored in image_data (a SourcefileBlob)
        Text is extracted using OCR during processing
-- audio: Audio files (MP3), stored in audio_data field
+- audio: Audio files (MP3), in the audio blob store (see SourcefileBlob)
        Text is extracted using Whisper API during processing
 
 The processing pipeline is the same for all types:
@@ -309,48 +317,127 @@ def ensure_translation(sourcefile_entry):
     return sourcefile_entry
 
 
-def _store_word_in_database(
+def _store_words_in_database(
     sourcefile_entry: Sourcefile,
-    word_d: dict,
-    ordering: int,
+    words: list[dict],
+    first_ordering: int,
     target_language_code: str,
-):
-    """Store a single wordform and its lemma in the database."""
-    lemma, _ = Lemma.update_or_create(
-        lookup={
+) -> list[Lemma]:
+    """Store extracted words with their lemmas, LemmaForm rows and sourcefile links.
+
+    Set-based: one INSERT ... ON CONFLICT DO UPDATE ... RETURNING each for
+    lemmas, wordforms and SourcefileWordform rows, in one transaction. Fields
+    match what `update_or_create` + `save()` would set one word at a time
+    (including the `*_norm` columns and `created_by`), and a later duplicate
+    of a lemma/wordform wins, as it would have then.
+
+    Returns:
+        The stored lemma for each word, in order
+    """
+    import unicodedata
+    from utils.lexicon_index import mark_lexicon_changed
+    from utils.word_utils import normalize_text
+
+    if not words:
+        return []
+    now = datetime.now()
+    created_by = Lemma.current_user_id()
+
+    lemma_rows = {}
+    for word_d in words:
+        lemma_rows[word_d["lemma"]] = {
             "lemma": word_d["lemma"],
+            "lemma_norm": normalize_text(str(word_d["lemma"])),
             "target_language_code": target_language_code,
-        },
-        updates={
             "part_of_speech": word_d["part_of_speech"],
             "translations": word_d["translations"],
             "is_complete": False,
-        },
-    )
-    wordform, _ = Wordform.update_or_create(
-        lookup={
-            "wordform": word_d["wordform"],
-            "target_language_code": target_language_code,
-        },
-        updates={
-            "lemma_entry": lemma,
-            "part_of_speech": word_d["part_of_speech"],
-            "translations": word_d["translations"],
-            "inflection_type": word_d["inflection_type"],
-            "is_lemma": word_d["wordform"] == word_d["lemma"],
-        },
-    )
-    sourcefilewordform, _ = SourcefileWordform.update_or_create(
-        lookup={
-            "sourcefile": sourcefile_entry,
-            "wordform": wordform,
-        },
-        updates={
-            "centrality": word_d["centrality"],
-            "ordering": ordering,
-        },
-    )
-    return wordform, lemma, sourcefilewordform
+            "created_by": created_by,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    with Lemma._meta.database.atomic():
+        lemmas = list(
+            Lemma.insert_many(list(lemma_rows.values()))
+            .on_conflict(
+                conflict_target=[Lemma.lemma, Lemma.target_language_code],
+                update={
+                    Lemma.lemma_norm: EXCLUDED.lemma_norm,
+                    Lemma.part_of_speech: EXCLUDED.part_of_speech,
+                    Lemma.translations: EXCLUDED.translations,
+                    Lemma.is_complete: EXCLUDED.is_complete,
+                    Lemma.updated_at: EXCLUDED.updated_at,
+                },
+            )
+            .returning(Lemma)
+            .execute()
+        )
+        lemma_by_text = {lemma.lemma: lemma for lemma in lemmas}
+
+        wordform_rows = {}
+        for word_d in words:
+            wordform_nfc = unicodedata.normalize("NFC", str(word_d["wordform"]))
+            wordform_rows[wordform_nfc] = {
+                "wordform": wordform_nfc,
+                "wordform_norm": normalize_text(wordform_nfc),
+                "lemma_entry": lemma_by_text[word_d["lemma"]].id,
+                "target_language_code": target_language_code,
+                "part_of_speech": word_d["part_of_speech"],
+                "translations": word_d["translations"],
+                "inflection_type": word_d["inflection_type"],
+                "is_lemma": word_d["wordform"] == word_d["lemma"],
+                "created_by": created_by,
+                "created_at": now,
+                "updated_at": now,
+            }
+        wordforms = list(
+            Wordform.insert_many(list(wordform_rows.values()))
+            .on_conflict(
+                conflict_target=[Wordform.wordform, Wordform.target_language_code],
+                update={
+                    Wordform.wordform_norm: EXCLUDED.wordform_norm,
+                    Wordform.lemma_entry: EXCLUDED.lemma_entry_id,
+                    Wordform.part_of_speech: EXCLUDED.part_of_speech,
+                    Wordform.translations: EXCLUDED.translations,
+                    Wordform.inflection_type: EXCLUDED.inflection_type,
+                    Wordform.is_lemma: EXCLUDED.is_lemma,
+                    Wordform.updated_at: EXCLUDED.updated_at,
+                },
+            )
+            .returning(Wordform)
+            .execute()
+        )
+        lemma_by_id = {lemma.id: lemma for lemma in lemmas}
+        for wordform in wordforms:
+            wordform.lemma_entry = lemma_by_id[wordform.lemma_entry_id]
+        wordform_by_text = {wordform.wordform: wordform for wordform in wordforms}
+
+        LemmaForm.sync_for_lemmas(lemmas)
+        LemmaForm.sync_for_wordforms(wordforms)
+
+        link_rows = {}
+        for ordering, word_d in enumerate(words, start=first_ordering):
+            wordform = wordform_by_text[unicodedata.normalize("NFC", str(word_d["wordform"]))]
+            link_rows[wordform.id] = {
+                "sourcefile": sourcefile_entry,
+                "wordform": wordform.id,
+                "centrality": word_d["centrality"],
+                "ordering": ordering,
+                "created_at": now,
+                "updated_at": now,
+            }
+        SourcefileWordform.insert_many(list(link_rows.values())).on_conflict(
+            conflict_target=[SourcefileWordform.sourcefile, SourcefileWordform.wordform],
+            update={
+                SourcefileWordform.centrality: EXCLUDED.centrality,
+                SourcefileWordform.ordering: EXCLUDED.ordering,
+                SourcefileWordform.updated_at: EXCLUDED.updated_at,
+            },
+        ).execute()
+
+        mark_lexicon_changed([target_language_code])
+    return [lemma_by_text[word_d["lemma"]] for word_d in words]
 
 
 def ensure_tricky_wordforms(
@@ -368,13 +455,14 @@ def ensure_tricky_wordforms(
     if max_new_words == 0:
         return sourcefile_entry, {}
     assert sourcefile_entry.text_target, "Text must have been extracted first"
-    # Get existing wordforms - Note: wordform_entries is a backref from SourcefileWordform
-    existing_wordforms = []
-    for wf_entry in SourcefileWordform.select().where(
-        SourcefileWordform.sourcefile == sourcefile_entry
-    ):
-        if wf_entry.wordform and wf_entry.wordform.wordform:
-            existing_wordforms.append(wf_entry.wordform.wordform)
+    # Get existing wordforms (one query, rather than loading each link's wordform)
+    existing_wordforms = [
+        row.wordform
+        for row in Wordform.select(Wordform.wordform)
+        .join(SourcefileWordform)
+        .where(SourcefileWordform.sourcefile == sourcefile_entry)
+        if row.wordform
+    ]
     target_language_code = sourcefile_entry.sourcedir.target_language_code
     target_language_name = get_language_name(target_language_code)
     # Extract more vocabulary - ensure text_target is a string
@@ -387,15 +475,12 @@ def ensure_tricky_wordforms(
     )
     # Process new words and update database
     new_wordforms = tricky_d["wordforms"][:max_new_words]
-    lemmas = []
-    for word_counter, word_d in enumerate(new_wordforms):
-        wordform, lemma, sourcefilewordform = _store_word_in_database(
-            sourcefile_entry,
-            word_d,
-            len(existing_wordforms) + word_counter + 1,
-            target_language_code,
-        )
-        lemmas.append(lemma)
+    lemmas = _store_words_in_database(
+        sourcefile_entry,
+        new_wordforms,
+        len(existing_wordforms) + 1,
+        target_language_code,
+    )
     # for counter, lemma in enumerate(lemmas):
     #     delay = counter * 10
     #     run_async(
@@ -436,6 +521,121 @@ def ensure_tricky_phrases(
     return sourcefile_entry, extra
 
 
+# Bump when the shape or semantics of the cached text tab data changes
+RECOGNITION_CACHE_VERSION = 2
+
+
+def _recognition_links_stamp_query(sourcefile_entry: Sourcefile):
+    """Scalar subquery stamping the sourcefile's wordform links.
+
+    Links, wordforms and lemmas all bump `updated_at` when written (including
+    the bulk upserts), so their count and latest `updated_at`s change whenever
+    the linked wordform data could - without loading that data.
+    """
+    return (
+        SourcefileWordform.select(
+            fn.md5(
+                fn.concat_ws(
+                    ":",
+                    fn.COUNT(SourcefileWordform.id),
+                    fn.MAX(SourcefileWordform.updated_at),
+                    fn.MAX(Wordform.updated_at),
+                    fn.MAX(Lemma.updated_at),
+                )
+            )
+        )
+        .join(Wordform, on=(SourcefileWordform.wordform == Wordform.id))
+        .join(Lemma, JOIN.LEFT_OUTER, on=(Wordform.lemma_entry == Lemma.id))
+        .where(SourcefileWordform.sourcefile == sourcefile_entry)
+    )
+
+
+def _get_text_tab_data_cached(
+    sourcefile_entry: Sourcefile,
+    text_nfc: str,
+    target_language_code: str,
+) -> dict[str, Any]:
+    """Return the text tab's enhanced text, recognized words and wordforms.
+
+    Persisted in SourcefileRecognition, keyed by a hash of the NFC text, the
+    segmentation engine name and a stamp of the wordform links. A hit is one
+    query (the row plus the current stamp); any mismatch loads the wordforms,
+    recomputes everything and upserts the row.
+    """
+    from utils.segmentation import get_engine_name_for
+    from utils.vocab_llm_utils import create_interactive_word_data
+
+    text_hash = hashlib.sha256(text_nfc.encode("utf-8")).hexdigest()
+    engine = f"{get_engine_name_for(target_language_code)}/v{RECOGNITION_CACHE_VERSION}"
+    stamp_query = _recognition_links_stamp_query(sourcefile_entry)
+
+    cached = (
+        SourcefileRecognition.select(
+            SourcefileRecognition, stamp_query.alias("current_links_stamp")
+        )
+        .where(SourcefileRecognition.sourcefile == sourcefile_entry)
+        .first()
+    )
+    if cached is not None:
+        if (
+            cached.text_hash == text_hash
+            and cached.engine == engine
+            and cached.links_stamp == cached.current_links_stamp
+            and cached.enhanced_text is not None
+            and cached.wordforms is not None
+        ):
+            return {
+                "enhanced_text": cached.enhanced_text,
+                "recognized_words": cached.recognized_words,
+                "wordforms": cached.wordforms,
+            }
+        links_stamp = cached.current_links_stamp
+    else:
+        links_stamp = stamp_query.scalar()
+
+    # Stamped before loading, so a concurrent write invalidates what's stored
+    wordforms = Wordform.get_all_wordforms_for(
+        target_language_code=target_language_code,
+        sourcefile=sourcefile_entry,
+        include_junction_data=True,
+    )
+    # DEPRECATED: backward-compatible HTML for old components. This mixes
+    # content with presentation and should be removed once all frontend
+    # components use the structured recognized_words instead
+    enhanced_text, _ = create_interactive_word_links(
+        text=text_nfc,
+        wordforms=wordforms,
+        target_language_code=target_language_code,
+    )
+    recognized_words, _ = create_interactive_word_data(
+        text=text_nfc,
+        wordforms=wordforms,
+        target_language_code=target_language_code,
+    )
+
+    try:
+        SourcefileRecognition.update_or_create(
+            lookup={"sourcefile": sourcefile_entry},
+            updates={
+                "text_hash": text_hash,
+                "engine": engine,
+                "links_stamp": links_stamp,
+                "recognized_words": recognized_words,
+                "enhanced_text": enhanced_text,
+                "wordforms": wordforms,
+            },
+        )
+    except IntegrityError:
+        # Another request populated the cache concurrently - fine either way
+        pass
+
+    return {
+        "enhanced_text": enhanced_text,
+        "recognized_words": recognized_words,
+        "wordforms": wordforms,
+    }
+
+
 def get_sourcefile_details(
     sourcefile_entry: Sourcefile,
     target_language_code: str,
@@ -488,8 +688,7 @@ def get_sourcefile_details(
             "slug": sourcefile_entry.slug,
             "description": sourcefile_entry.description,
             "sourcefile_type": sourcefile_entry.sourcefile_type,
-            "has_audio": bool(sourcefile_entry.audio_data),
-            "has_image": bool(sourcefile_entry.image_data),
+            **sourcefile_entry.media_flags(),
             "ai_generated": sourcefile_entry.ai_generated,
             # Include title translation if available
             "title_translation": sourcefile_entry.metadata.get("title_translation") if sourcefile_entry.metadata else None,
@@ -538,39 +737,18 @@ def get_sourcefile_details(
         result["sourcefile"]["text_target"] = text_target_nfc
         result["sourcefile"]["text_english"] = sourcefile_entry.text_english
 
-    # Generate enhanced text only for text tab (requires wordforms)
+    # Generate enhanced text only for text tab (requires wordforms), served
+    # from the persisted cache unless the text or links changed
     if purpose == "text" and sourcefile_entry.text_target:
-        from utils.vocab_llm_utils import (
-            create_interactive_word_links,
-            create_interactive_word_data,
-        )
-        from db_models import Wordform
-
-        # Get minimal wordform data needed for links
-        wordforms_for_links = Wordform.get_all_wordforms_for(
-            target_language_code=target_language_code,
-            sourcefile=sourcefile_entry,
-            include_junction_data=True,
-        )
-
-        # DEPRECATED: Generate backward-compatible HTML for old components
-        # This approach mixes content with presentation and should be removed once
-        # all frontend components have been updated to use the structured data approach
-        enhanced_text, found_wordforms_html = create_interactive_word_links(
-            text=str(sourcefile_entry.text_target),
-            wordforms=wordforms_for_links,
-            target_language_code=target_language_code,
-        )
-
-        # Generate new structured data format for the updated component
-        recognized_words, found_wordforms_data = create_interactive_word_data(
-            text=str(text_target_nfc),
-            wordforms=wordforms_for_links,
+        text_tab = _get_text_tab_data_cached(
+            sourcefile_entry,
+            text_nfc=str(text_target_nfc),
             target_language_code=target_language_code,
         )
+        recognized_words = text_tab["recognized_words"]
 
         # Include both formats in the response
-        result["enhanced_text"] = enhanced_text  # Legacy format (HTML)
+        result["enhanced_text"] = text_tab["enhanced_text"]  # Legacy format (HTML)
         result["recognized_words"] = recognized_words  # New format (structured data)
         result["text_data"] = {
             "text": str(text_target_nfc),  # NFC-normalized plain text used for offsets
@@ -578,7 +756,7 @@ def get_sourcefile_details(
         }
 
         # Include wordforms in the result so the frontend can use them
-        result["wordforms"] = wordforms_for_links
+        result["wordforms"] = text_tab["wordforms"]
 
     # Add word data only for words tab
     elif purpose == "words":
@@ -621,38 +799,66 @@ def get_sourcefile_details(
     return result
 
 
+# Steps that must succeed before each processing step can start. Everything
+# else only needs the text, so those steps run concurrently once it exists.
+SOURCEFILE_STEP_PREREQUISITES: dict[str, tuple[str, ...]] = {
+    "text_extraction": (),
+    "translation": ("text_extraction",),
+    "wordforms": ("text_extraction",),
+    "phrases": ("text_extraction",),
+}
+
+
 def process_sourcefile(
     sourcefile_entry: Sourcefile,
     language_level: LanguageLevel,
     max_new_words: Optional[int],
     max_new_phrases: Optional[int],
     verbose: int = 0,
-):
+) -> dict[str, StepOutcome]:
     """
     If MAX_NEW_WORDS or MAX_NEW_PHRASES is 0, skip. If None, then there is no max.
 
-    Now runs synchronously (blocking) instead of asynchronously.
-    """
-    already_text = bool(sourcefile_entry.text_target)
-    sourcefile_entry = ensure_text_extracted(sourcefile_entry)
+    Extracts the text, then translates and extracts wordforms and phrases
+    concurrently (see utils/step_scheduler.py). Blocks until every step has
+    finished, then raises the first step error, if any. A failed step doesn't
+    undo the others, e.g. words are kept even if translation fails.
 
-    # Run translation synchronously
-    sourcefile_entry = ensure_translation(sourcefile_entry)
+    The API queues the same steps as a background job instead (see
+    utils/sourcefile_jobs.py).
 
-    # Run wordform extraction synchronously
-    ensure_tricky_wordforms(
-        sourcefile_entry,
-        language_level=language_level,
-        max_new_words=max_new_words,
-    )
+    Returns:
+        StepOutcome (with timing) per step name
+    """
 
-    # Run phrase extraction synchronously
-    ensure_tricky_phrases(
-        sourcefile_entry,
-        language_level=language_level,
-        max_new_phrases=max_new_phrases,
-        verbose=verbose,
+    def own_copy() -> Sourcefile:
+        # Concurrent steps each get their own instance (loaded once the text
+        # exists), as some of them save it
+        return Sourcefile.get_by_id(sourcefile_entry.id)
+
+    handlers = {
+        "text_extraction": lambda: ensure_text_extracted(sourcefile_entry),
+        "translation": lambda: ensure_translation(own_copy()),
+        "wordforms": lambda: ensure_tricky_wordforms(
+            own_copy(),
+            language_level=language_level,
+            max_new_words=max_new_words,
+        ),
+        "phrases": lambda: ensure_tricky_phrases(
+            own_copy(),
+            language_level=language_level,
+            max_new_phrases=max_new_phrases,
+            verbose=verbose,
+        ),
+    }
+    outcomes = run_steps(
+        Step(name, handlers[name], after=SOURCEFILE_STEP_PREREQUISITES[name])
+        for name in handlers
     )
+    for outcome in outcomes.values():
+        if outcome.error is not None:
+            raise outcome.error
+    return outcomes
 
 
 def get_incomplete_lemmas_for_sourcefile(sourcefile_entry):
@@ -697,28 +903,32 @@ def complete_lemma_metadata(lemma):
     Returns:
         Updated lemma object with complete metadata
     """
-    if lemma.is_complete:
-        return lemma
-
-    target_language_name = get_language_name(lemma.target_language_code)
-
-    # Generate full metadata
-    try:
-        metadata, _ = metadata_for_lemma_full(
-            lemma=lemma.lemma, target_language_name=target_language_name
-        )
+    completed = complete_lemmas_metadata([lemma])
+    if lemma.lemma not in completed:
+        raise ValueError(f"Failed to generate metadata for lemma '{lemma.lemma}'")
+    return completed[lemma.lemma]
 
-        # Update lemma with new metadata
-        for key, value in metadata.items():
-            setattr(lemma, key, value)
 
-        # Mark as complete
-        lemma.is_complete = True
-        lemma.save()
+def complete_lemmas_metadata(lemmas: list[Lemma]) -> dict[str, Lemma]:
+    """Complete metadata for several lemmas of one language, batching the LLM calls.
 
-        return lemma
-    except Exception as e:
-        raise
+    Returns:
+        {lemma string: updated Lemma} for the lemmas that are now complete
+    """
+    if not lemmas:
+        return {}
+    target_language_code = lemmas[0].target_language_code
+    already_complete = {lemma.lemma: lemma for lemma in lemmas if lemma.is_complete}
+    incomplete = [lemma.lemma for lemma in lemmas if not lemma.is_complete]
+    if not incomplete:
+        return already_complete
+
+    completed = generate_lemma_metadata_batch(incomplete, target_language_code)
+    updated = Lemma.select().where(
+        (Lemma.target_language_code == target_language_code)
+        & (Lemma.lemma.in_(list(completed)))
+    )
+    return {**already_complete, **{lemma.lemma: lemma for lemma in updated}}
 
     return sourcefile_entry
 
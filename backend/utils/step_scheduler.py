@@ -0,0 +1,113 @@
+"""Run a small graph of processing steps, with independent steps in parallel.
+
+Sourcefile processing is mostly waiting on LLM calls, and most steps only
+depend on the extracted text. `run_steps` starts each step as soon as the
+steps listed in its `after` have succeeded, so e.g. translation, wordform
+extraction and phrase extraction all run at once.
+
+Every step is isolated: an exception is recorded in its `StepOutcome` rather
+than raised, the other steps carry on (and keep whatever they saved), and only
+the steps that depend on it are skipped. Each outcome records how long the
+step took.
+
+Steps run on worker threads, each with its own database connection and a copy
+of the caller's context (so Flask's `g` is still visible).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from loguru import logger
+
+
+class Step(NamedTuple):
+    name: str
+    run: Callable[[], Any]
+    after: tuple[str, ...] = ()  # names of steps that must succeed first
+
+
+class StepOutcome(NamedTuple):
+    name: str
+    seconds: float
+    result: Any = None
+    error: Optional[BaseException] = None
+    skipped: bool = False  # not run because a prerequisite failed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.skipped
+
+
+def _run_step(step: Step) -> StepOutcome:
+    from db_models import Sourcefile
+
+    started = time.monotonic()
+    try:
+        with Sourcefile._meta.database.connection_context():
+            result = step.run()
+    except Exception as e:
+        seconds = time.monotonic() - started
+        logger.warning(f"[steps] {step.name} failed after {seconds:.1f}s: {e}")
+        return StepOutcome(step.name, seconds, error=e)
+    seconds = time.monotonic() - started
+    logger.info(f"[steps] {step.name} took {seconds:.1f}s")
+    return StepOutcome(step.name, seconds, result=result)
+
+
+def run_steps(
+    steps: Iterable[Step], *, max_workers: Optional[int] = None
+) -> dict[str, StepOutcome]:
+    """Run `steps` respecting their `after` dependencies; return outcomes by name.
+
+    Args:
+        steps: The steps to run. Dependencies must name other steps in the list.
+        max_workers: Concurrency limit (default: one thread per step)
+
+    Returns:
+        A StepOutcome for every step, in the order given.
+    """
+    steps = list(steps)
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Step names must be unique")
+    for step in steps:
+        unknown = set(step.after) - set(by_name)
+        if unknown:
+            raise ValueError(f"Step {step.name} depends on unknown steps {unknown}")
+
+    outcomes: dict[str, StepOutcome] = {}
+    running: dict[Future, str] = {}
+
+    def _start_ready_steps(executor: ThreadPoolExecutor) -> None:
+        # Repeat until stable, as skipping a step can make its dependents skippable
+        changed = True
+        while changed:
+            changed = False
+            for step in steps:
+                if step.name in outcomes or step.name in running.values():
+                    continue
+                if any(dep in outcomes and not outcomes[dep].ok for dep in step.after):
+                    outcomes[step.name] = StepOutcome(step.name, 0.0, skipped=True)
+                    logger.info(f"[steps] skipping {step.name}: a prerequisite failed")
+                    changed = True
+                elif all(dep in outcomes for dep in step.after):
+                    context = contextvars.copy_context()
+                    running[executor.submit(context.run, _run_step, step)] = step.name
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers or max(len(steps), 1), thread_name_prefix="step"
+    ) as executor:
+        while len(outcomes) < len(steps):
+            _start_ready_steps(executor)
+            if not running:
+                if len(outcomes) < len(steps):
+                    raise ValueError("Steps have a dependency cycle")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[running.pop(future)] = future.result()
+    return {step.name: outcomes[step.name] for step in steps}
@@ -1,7 +1,24 @@
-from typing import Any, Optional
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Iterable, NamedTuple, Optional
+from loguru import logger
+from config import (
+    LEMMA_METADATA_BATCH_ATTEMPTS,
+    LEMMA_METADATA_BATCH_SIZE,
+    LEMMA_METADATA_WARMUP_MAX_LEMMAS,
+    LEMMA_METADATA_WARMUP_WORKERS,
+)
 from utils.lang_utils import get_language_name
-from utils.vocab_llm_utils import metadata_for_lemma_full
-from db_models import Lemma, Wordform, Phrase, DoesNotExist
+from utils.llm_cache import bypass_llm_cache
+from utils.single_flight import in_flight, single_flight
+from utils.vocab_llm_utils import (
+    metadata_for_lemma_full,
+    metadata_for_lemmas,
+    save_lemma_example_sentences,
+)
+from db_models import Lemma, LemmaForm, Wordform, Phrase, DoesNotExist
 from peewee import DatabaseError
 
 # Import the new exception and g for global context
@@ -43,6 +60,8 @@ def save_lemma_metadata(
             Lemma.lemma == lemma,
             Lemma.target_language_code == target_language_code,
         )
+        # Headword and related forms may have changed
+        LemmaForm.sync_for_lemma(lemma_instance)
         return lemma_instance
     except Exception as e:
         raise DatabaseError(f"Error saving lemma metadata: {e}") from e
@@ -53,6 +72,9 @@ def _generate_and_save_metadata(
 ) -> dict[str, Any]:
     """Generate and save new metadata for a lemma.
 
+    Concurrent calls for the same lemma (in this process or another worker)
+    share one generation, see utils/single_flight.py.
+
     Args:
         lemma: The lemma to generate metadata for
         target_language_code: ISO language code
@@ -62,6 +84,7 @@ def _generate_and_save_metadata(
 
     Raises:
         AuthenticationRequiredForGenerationError: If user is not logged in.
+        SingleFlightTimeout: If another caller's generation takes too long.
     """
     # Check if user is logged in before allowing generation
     if not hasattr(g, "user") or g.user is None:
@@ -69,6 +92,30 @@ def _generate_and_save_metadata(
             "User must be logged in to generate lemma metadata."
         )
 
+    return single_flight(
+        ("lemma_metadata", target_language_code, lemma),
+        lambda: _generate_and_save_metadata_now(lemma, target_language_code),
+        recheck=lambda: _load_complete_lemma_metadata(lemma, target_language_code),
+    )
+
+
+def _load_complete_lemma_metadata(
+    lemma: str, target_language_code: str
+) -> Optional[dict[str, Any]]:
+    """Return the lemma's metadata if it exists and is complete, else None."""
+    lemma_model = Lemma.get_or_none(
+        Lemma.lemma == lemma,
+        Lemma.target_language_code == target_language_code,
+    )
+    if lemma_model is None:
+        return None
+    metadata = lemma_model.to_dict()
+    return metadata if Lemma.check_metadata_completeness(metadata) else None
+
+
+def _generate_and_save_metadata_now(
+    lemma: str, target_language_code: str
+) -> dict[str, Any]:
     target_language_name = get_language_name(target_language_code)
 
     # Generate metadata using the LLM
@@ -84,6 +131,255 @@ def _generate_and_save_metadata(
     return lemma_model.to_dict()
 
 
+def _validate_generated_lemma_metadata(
+    metadata: Optional[dict[str, Any]],
+) -> Optional[dict[str, Any]]:
+    """Return batch-generated metadata marked complete, or None if it's unusable.
+
+    `Lemma.check_metadata_completeness` only looks at `is_complete`, so the
+    essentials are checked here first: at least one translation, and list
+    fields that really are lists.
+    """
+    if not isinstance(metadata, dict):
+        return None
+    translations = metadata.get("translations")
+    if not isinstance(translations, list) or not translations:
+        return None
+    for key in ("example_usage", "synonyms", "antonyms", "mnemonics"):
+        if not isinstance(metadata.get(key), list):
+            return None
+    metadata["is_complete"] = True
+    return metadata if Lemma.check_metadata_completeness(metadata) else None
+
+
+def generate_lemma_metadata_batch(
+    lemmas: Iterable[str],
+    target_language_code: str,
+    *,
+    batch_size: int = LEMMA_METADATA_BATCH_SIZE,
+    max_attempts: int = LEMMA_METADATA_BATCH_ATTEMPTS,
+    deadline: Optional[float] = None,
+) -> dict[str, dict[str, Any]]:
+    """Generate and save full metadata for many lemmas, `batch_size` per LLM call.
+
+    Lemmas that are already complete are loaded rather than regenerated.
+    Results that fail validation are retried (in new batches) up to
+    `max_attempts` times in total. Everything generated is saved in one
+    transaction at the end.
+
+    Args:
+        lemmas: Lemmas to complete (duplicates are ignored)
+        target_language_code: ISO language code
+        batch_size: Lemmas per LLM call
+        max_attempts: Attempts per lemma, including the first
+        deadline: Optional time.time() value after which no new LLM call is started
+
+    Returns:
+        {lemma: metadata dict} for every lemma that is now complete. Lemmas that
+        still failed, or weren't reached before the deadline, are missing.
+
+    Raises:
+        AuthenticationRequiredForGenerationError: If user is not logged in.
+    """
+    if not hasattr(g, "user") or g.user is None:
+        raise AuthenticationRequiredForGenerationError(
+            "User must be logged in to generate lemma metadata."
+        )
+    return _generate_lemma_metadata_batch_now(
+        lemmas,
+        target_language_code,
+        batch_size=batch_size,
+        max_attempts=max_attempts,
+        deadline=deadline,
+    )
+
+
+def _generate_lemma_metadata_batch_now(
+    lemmas: Iterable[str],
+    target_language_code: str,
+    *,
+    batch_size: int = LEMMA_METADATA_BATCH_SIZE,
+    max_attempts: int = LEMMA_METADATA_BATCH_ATTEMPTS,
+    deadline: Optional[float] = None,
+) -> dict[str, dict[str, Any]]:
+    # generate_lemma_metadata_batch without the auth check (which needs flask.g)
+    pending = list(dict.fromkeys(lemma for lemma in lemmas if lemma))
+    completed: dict[str, dict[str, Any]] = {}
+    if not pending:
+        return completed
+
+    for lemma_model in Lemma.select().where(
+        (Lemma.target_language_code == target_language_code)
+        & (Lemma.lemma.in_(pending))
+        & (Lemma.is_complete == True)
+    ):
+        completed[lemma_model.lemma] = lemma_model.to_dict()
+    pending = [lemma for lemma in pending if lemma not in completed]
+
+    target_language_name = get_language_name(target_language_code)
+    generated: dict[str, dict[str, Any]] = {}
+    for attempt in range(max_attempts):
+        failed: list[str] = []
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start : start + batch_size]
+            if deadline is not None and time.time() >= deadline:
+                break
+            try:
+                if attempt == 0:
+                    results, _ = metadata_for_lemmas(chunk, target_language_name)
+                else:
+                    # Don't let the LLM cache replay the response that just failed
+                    with bypass_llm_cache():
+                        results, _ = metadata_for_lemmas(chunk, target_language_name)
+            except Exception as e:
+                logger.warning(f"[lemma_metadata_batch] batch {chunk} failed: {e}")
+                results = {}
+            for lemma in chunk:
+                metadata = _validate_generated_lemma_metadata(results.get(lemma))
+                if metadata is None:
+                    failed.append(lemma)
+                else:
+                    generated[lemma] = metadata
+        pending = failed
+        if not pending or (deadline is not None and time.time() >= deadline):
+            break
+
+    if pending:
+        logger.warning(
+            f"[lemma_metadata_batch] no usable metadata for {len(pending)} lemmas: {pending}"
+        )
+
+    if generated:
+        with Lemma._meta.database.atomic():
+            for lemma, metadata in generated.items():
+                lemma_model = save_lemma_metadata(lemma, metadata, target_language_code)
+                save_lemma_example_sentences(
+                    lemma_model, metadata.get("example_usage", [])
+                )
+                completed[lemma] = lemma_model.to_dict()
+
+    return completed
+
+
+class LemmaWarmup(NamedTuple):
+    completed: dict[str, dict[str, Any]]  # lemma -> metadata, ready by the deadline
+    pending: list[str]  # lemmas still being generated in the background
+
+
+_warmup_lock = threading.RLock()
+_warmup_executor: Optional[ThreadPoolExecutor] = None
+# (target_language_code, lemma) -> the future generating it
+_warmup_inflight: dict[tuple[str, str], Future] = {}
+
+
+def _get_warmup_executor() -> ThreadPoolExecutor:
+    global _warmup_executor
+    with _warmup_lock:
+        if _warmup_executor is None:
+            _warmup_executor = ThreadPoolExecutor(
+                max_workers=LEMMA_METADATA_WARMUP_WORKERS,
+                thread_name_prefix="lemma-warmup",
+            )
+        return _warmup_executor
+
+
+def _warmup_batch(chunk: list[str], target_language_code: str) -> dict[str, dict[str, Any]]:
+    try:
+        # Worker threads take their own pooled connection and hand it back after
+        with Lemma._meta.database.connection_context():
+            return _generate_lemma_metadata_batch_now(chunk, target_language_code)
+    except Exception as e:
+        logger.warning(f"[lemma_warmup] batch {chunk} failed: {e}")
+        return {}
+
+
+def _forget_inflight(target_language_code: str, chunk: list[str], future: Future) -> None:
+    with _warmup_lock:
+        for lemma in chunk:
+            if _warmup_inflight.get((target_language_code, lemma)) is future:
+                del _warmup_inflight[(target_language_code, lemma)]
+
+
+def warm_lemma_metadata(
+    lemmas: Iterable[str],
+    target_language_code: str,
+    *,
+    deadline: float,
+    batch_size: int = LEMMA_METADATA_BATCH_SIZE,
+    max_lemmas: int = LEMMA_METADATA_WARMUP_MAX_LEMMAS,
+) -> LemmaWarmup:
+    """Generate metadata for lemmas on a shared, bounded worker pool until `deadline`.
+
+    Only the first `max_lemmas` are considered, queued in the order given,
+    `batch_size` per task, so put the ones that matter most first. Lemmas
+    another request's warmup is already generating are waited on rather than
+    queued again, and ones a single_flight() generation (in any worker) has
+    in hand are skipped. Batches still running at the deadline are left to
+    finish in the background, so the next request finds them saved.
+
+    Args:
+        lemmas: Lemmas to complete, most important first
+        target_language_code: ISO language code
+        deadline: time.time() value to stop waiting at
+        batch_size: Lemmas per LLM call
+        max_lemmas: Most lemmas to queue or wait on
+
+    Returns:
+        LemmaWarmup of the lemmas completed by the deadline, and those still
+        being generated (here or elsewhere). Lemmas in neither failed to
+        generate or were past `max_lemmas`.
+
+    Raises:
+        AuthenticationRequiredForGenerationError: If user is not logged in.
+    """
+    if not hasattr(g, "user") or g.user is None:
+        raise AuthenticationRequiredForGenerationError(
+            "User must be logged in to generate lemma metadata."
+        )
+
+    pending = list(dict.fromkeys(lemma for lemma in lemmas if lemma))[:max_lemmas]
+    elsewhere = {
+        key[2]
+        for key in in_flight(
+            ("lemma_metadata", target_language_code, lemma) for lemma in pending
+        )
+    }
+    executor = _get_warmup_executor()
+    futures: dict[str, Future] = {}
+    with _warmup_lock:
+        new_lemmas = []
+        for lemma in pending:
+            inflight = _warmup_inflight.get((target_language_code, lemma))
+            if inflight is not None:
+                futures[lemma] = inflight
+            elif lemma not in elsewhere:
+                new_lemmas.append(lemma)
+        for start in range(0, len(new_lemmas), batch_size):
+            chunk = new_lemmas[start : start + batch_size]
+            future = executor.submit(_warmup_batch, chunk, target_language_code)
+            for lemma in chunk:
+                _warmup_inflight[(target_language_code, lemma)] = future
+                futures[lemma] = future
+            future.add_done_callback(
+                functools.partial(_forget_inflight, target_language_code, chunk)
+            )
+
+    wait(set(futures.values()), timeout=max(0.0, deadline - time.time()))
+
+    completed: dict[str, dict[str, Any]] = {}
+    still_running = [
+        lemma for lemma in pending if lemma in elsewhere and lemma not in futures
+    ]
+    for lemma, future in futures.items():
+        if not future.done():
+            still_running.append(lemma)
+            continue
+        metadata = future.result().get(lemma)
+        if metadata is not None:
+            completed[lemma] = metadata
+    return LemmaWarmup(completed, still_running)
+
+
 def load_or_generate_lemma_metadata(
     lemma: Optional[str],
     target_language_code: str,
@@ -149,31 +445,18 @@ def get_lemma_for_wordform(wordform: str, target_language_code: str) -> Optional
     if wordform_model and wordform_model.lemma_entry:
         return wordform_model.lemma_entry.lemma
 
-    # If not found, try searching through all lemmas' wordforms
-    wordform_lower = wordform.lower()
-
-    # Get all known lemmas for the language
-    query = Lemma.get_all_lemmas_for(
-        target_language_code=target_language_code, sort_by="alpha"
-    )  # get_all_lemmas_for still uses target_language_code parameter
-    lemmas = [lemma.lemma for lemma in query]
-
-    # Helper function to get all wordforms for a lemma
-    def get_all_wordforms(lemma: str) -> set[str]:
-        try:
-            lemma_model = Lemma.get(
-                Lemma.lemma == lemma,
-                Lemma.target_language_code == target_language_code,
-            )
-            return lemma_model.get_all_wordforms()
-        except DoesNotExist:
-            return {lemma}  # Return just the lemma if not found
-
-    # Search through all lemmas' wordforms
-    for lemma in lemmas:
-        if wordform_lower in {w.lower() for w in get_all_wordforms(lemma)}:
-            return lemma
-    return None
+    # Otherwise look the form up in the form -> lemma index (headwords, wordforms
+    # and single-word related forms)
+    lemma = LemmaForm.find_lemma(wordform, target_language_code)
+    if lemma is not None:
+        return lemma
+
+    # Finally, a lemma that only differs in case (words that differ by accent
+    # are distinct)
+    lemma_model = Lemma.find_best_match(
+        wordform, target_language_code, fold_accents=False
+    ).first()
+    return lemma_model.lemma if lemma_model else None
 
 
 def save_wordform_metadata(
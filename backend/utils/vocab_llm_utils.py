@@ -5,12 +5,15 @@ from anthropic import Anthropic
 from openai import OpenAI
 from pprint import pprint
 import re
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 from slugify import slugify
 from loguru import logger
 from config import RECOGNITION_KNOWN_WORD_SEARCH_DEFAULT as CFG_KNOWN_WORD_DEFAULT
 
 from gjdutils.llm_utils import generate_gpt_from_template
+from gjdutils.llms_claude import MODEL_NAME_CLAUDE_SONNET_GOOD_LATEST
+from utils.llm_cache import cached_llm_call
+from utils.phrase_utils import upsert_phrases
 from utils.prompt_utils import get_prompt_template_path
 from utils.env_config import CLAUDE_API_KEY, OPENAI_API_KEY
 from utils.lang_utils import get_language_name, get_target_language_code
@@ -39,6 +42,42 @@ anthropic_client = Anthropic(api_key=CLAUDE_API_KEY.get_secret_value())
 openai_client = OpenAI(api_key=OPENAI_API_KEY.get_secret_value())
 
 
+def _generate_cached(
+    template_name: str,
+    context_d: dict,
+    response_json: bool,
+    verbose: int = 0,
+    validate: Optional[Callable[[Any], bool]] = None,
+    model: str = MODEL_NAME_CLAUDE_SONNET_GOOD_LATEST,
+) -> tuple[Any, dict]:
+    """Call `generate_gpt_from_template` with Claude `model`, through the LLM cache.
+
+    The model is passed to the call and the cache key alike, so switching
+    models doesn't serve the old model's responses. Only responses passing `validate` (default: a dict for JSON, else a str)
+    are cached, so a malformed one is regenerated next time.
+    """
+    expected_type = dict if response_json else str
+    validate = validate or (lambda out: isinstance(out, expected_type))
+    template_path = get_prompt_template_path(template_name)
+    return cached_llm_call(
+        lambda: generate_gpt_from_template(
+            client=anthropic_client,
+            prompt_template=template_path,
+            context_d=context_d,
+            response_json=response_json,
+            model_type="claude",
+            model=model,
+            verbose=verbose,
+        ),
+        template_path=template_path,
+        context_d=context_d,
+        response_json=response_json,
+        model_type="claude",
+        model=model,
+        validate=validate,
+    )
+
+
 def extract_text_from_image(
     image_data: str,  # Path to image file
     target_language_name: str,
@@ -94,9 +133,8 @@ def extract_text_from_html(
     if not isinstance(html_content, str):
         raise TypeError(f"Expected html_content to be str, got {type(html_content)}")
 
-    llm_output, extra = generate_gpt_from_template(
-        client=anthropic_client,
-        prompt_template=get_prompt_template_path("extract_text_from_html"),
+    llm_output, extra = _generate_cached(
+        "extract_text_from_html",
         context_d={
             "html_content": html_content,
             "target_language_name": target_language_name,
@@ -147,9 +185,8 @@ def translate_to_english(inp: str, source_language_name: str, verbose: int = 1):
     Returns:
         Tuple of (translated_text, extra_info)
     """
-    out, extra = generate_gpt_from_template(
-        client=anthropic_client,
-        prompt_template=get_prompt_template_path("translate_to_english"),
+    out, extra = _generate_cached(
+        "translate_to_english",
         context_d={"txt_tgt": inp, "target_language_name": source_language_name},
         response_json=False,
         verbose=verbose - 1,
@@ -193,9 +230,8 @@ def extract_tricky_words(
     if not txt.strip() or txt.strip() == "-":
         return {}, {}
 
-    out, extra = generate_gpt_from_template(
-        client=anthropic_client,
-        prompt_template=get_prompt_template_path("extract_tricky_wordforms"),
+    out, extra = _generate_cached(
+        "extract_tricky_wordforms",
         context_d={
             "txt_tgt": txt,
             "target_language_name": target_language_name,
@@ -205,12 +241,82 @@ def extract_tricky_words(
         },
         response_json=True,
         verbose=verbose,
+        validate=lambda out: isinstance(out, dict)
+        and isinstance(out.get("wordforms"), list),
     )
     assert isinstance(out, dict), f"Expected dict, got {type(out)}"
 
     return out, extra
 
 
+LEMMA_METADATA_DEFAULTS: dict[str, Any] = {
+    "synonyms": [],
+    "antonyms": [],
+    "related_words_phrases_idioms": [],
+    "example_usage": [],
+    "easily_confused_with": [],
+    "mnemonics": [],
+    "translations": [],
+    "register": "neutral",
+    "commonality": 0.5,
+    "guessability": 0.5,
+    "cultural_context": "",
+    "etymology": "",
+    "part_of_speech": "unknown",
+}
+
+
+def apply_lemma_metadata_defaults(metadata: dict[str, Any], lemma: str) -> dict[str, Any]:
+    """Fill in missing/None lemma metadata fields in place (and return the dict)."""
+    defaults = {
+        "lemma": lemma,  # Ensure lemma is always set
+        **LEMMA_METADATA_DEFAULTS,
+        "example_wordforms": [lemma],  # Include at least the lemma itself
+    }
+    for key, default_value in defaults.items():
+        if key not in metadata or metadata[key] is None:
+            metadata[key] = default_value
+    return metadata
+
+
+def save_lemma_example_sentences(lemma_model: Lemma, example_usage: list) -> None:
+    """Create/update Sentence rows for a lemma's example_usage and link them to it."""
+    target_language_code = lemma_model.target_language_code
+    for example in example_usage or []:
+        if not example.get("phrase") or not example.get("translation"):
+            continue
+
+        # Generate the slug for the sentence
+        phrase = example["phrase"]
+        slug = slugify(phrase)
+        if len(slug) > 255:
+            slug = slug[:255]
+
+        # Create sentence if it doesn't exist or update if it does
+        # Use sourcefile_id=None, sourcedir_id=None to distinguish from "learn" sentences
+        sentence, created = Sentence.get_or_create(
+            target_language_code=target_language_code,
+            sentence=phrase,
+            sourcefile_id=None,
+            sourcedir_id=None,
+            defaults={
+                "translation": example["translation"],
+                "slug": slug,
+            },
+        )
+        if not created and sentence.translation != example["translation"]:
+            sentence.translation = example["translation"]
+            sentence.save()
+
+        # Create both the example sentence link and the lemma-sentence relationship
+        LemmaExampleSentence.update_or_create(
+            lookup={"lemma": lemma_model, "sentence": sentence}, updates={}
+        )
+        SentenceLemma.update_or_create(
+            lookup={"lemma": lemma_model, "sentence": sentence}, updates={}
+        )
+
+
 def metadata_for_lemma_full(
     lemma: str,
     target_language_name: str,
@@ -231,10 +337,8 @@ def metadata_for_lemma_full(
         Exception: If there's an error generating the metadata or processing the API response
     """
     # Call Claude API to generate metadata
-    template_path = get_prompt_template_path("metadata_for_lemma")
-    out, extra = generate_gpt_from_template(
-        client=anthropic_client,
-        prompt_template=template_path,
+    out, extra = _generate_cached(
+        "metadata_for_lemma",
         context_d={
             "lemma": lemma,
             "target_language_name": target_language_name,
@@ -249,34 +353,10 @@ def metadata_for_lemma_full(
             f"Invalid response format from Claude API: expected dict, got {type(out)}"
         )
 
-    # Add default values for required fields if missing
-    defaults = {
-        "lemma": lemma,  # Ensure lemma is always set
-        "synonyms": [],
-        "antonyms": [],
-        "related_words_phrases_idioms": [],
-        "example_usage": [],
-        "easily_confused_with": [],
-        "mnemonics": [],
-        "translations": [],
-        "register": "neutral",
-        "commonality": 0.5,
-        "guessability": 0.5,
-        "cultural_context": "",
-        "etymology": "",
-        "part_of_speech": "unknown",
-        "example_wordforms": [lemma],  # Include at least the lemma itself
-    }
-
-    for key, default_value in defaults.items():
-        if key not in out or out[key] is None:
-            out[key] = default_value
-
-    # Create sentence records for example usage
-    target_language_code = get_target_language_code(target_language_name)
-    example_usage = out.get("example_usage", [])
+    apply_lemma_metadata_defaults(out, lemma)
 
     # Get or create the lemma record first
+    target_language_code = get_target_language_code(target_language_name)
     lemma_model, _ = Lemma.get_or_create(
         lemma=lemma,
         target_language_code=target_language_code,
@@ -293,42 +373,57 @@ def metadata_for_lemma_full(
     # Save the updated model
     lemma_model.save()
 
-    # Process each example sentence
-    for example in example_usage:
-        if not example.get("phrase") or not example.get("translation"):
-            continue
+    save_lemma_example_sentences(lemma_model, out.get("example_usage", []))
 
-        # Generate the slug for the sentence
-        phrase = example["phrase"]
-        slug = slugify(phrase)
-        if len(slug) > 255:
-            slug = slug[:255]
+    return out, extra
 
-        # Create sentence if it doesn't exist or update if it does
-        # Use sourcefile_id=None, sourcedir_id=None to distinguish from "learn" sentences
-        sentence, created = Sentence.get_or_create(
-            target_language_code=target_language_code,
-            sentence=phrase,
-            sourcefile_id=None,
-            sourcedir_id=None,
-            defaults={
-                "translation": example["translation"],
-                "slug": slug,
-            },
-        )
-        if not created and sentence.translation != example["translation"]:
-            sentence.translation = example["translation"]
-            sentence.save()
 
-        # Create both the example sentence link and the lemma-sentence relationship
-        LemmaExampleSentence.update_or_create(
-            lookup={"lemma": lemma_model, "sentence": sentence}, updates={}
-        )
-        SentenceLemma.update_or_create(
-            lookup={"lemma": lemma_model, "sentence": sentence}, updates={}
+def metadata_for_lemmas(
+    lemmas: list[str],
+    target_language_name: str,
+    *,
+    verbose: int = 0,
+) -> tuple[dict[str, dict[str, Any]], dict[str, Any]]:
+    """Get full metadata for several lemmas in one LLM call (no database writes).
+
+    Uses the same per-lemma schema as `metadata_for_lemma_full`, wrapped in a
+    list. Results are matched back to the requested lemmas via `input_lemma`;
+    lemmas the LLM skipped or mangled are simply missing from the returned dict.
+
+    Returns:
+        Tuple of ({requested lemma: metadata (with defaults applied)}, extra_info)
+    """
+    if not lemmas:
+        return {}, {}
+
+    out, extra = _generate_cached(
+        "metadata_for_lemmas",
+        context_d={
+            "lemmas": list(lemmas),
+            "target_language_name": target_language_name,
+        },
+        response_json=True,
+        verbose=verbose,
+        validate=lambda out: isinstance(out, dict)
+        and isinstance(out.get("lemmas"), list),
+    )
+    entries = out.get("lemmas") if isinstance(out, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError(
+            f"Invalid response format from Claude API: expected a 'lemmas' list, got {type(out)}"
         )
 
-    return out, extra
+    requested = set(lemmas)
+    results: dict[str, dict[str, Any]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        input_lemma = entry.pop("input_lemma", None) or entry.get("lemma")
+        if input_lemma in requested and input_lemma not in results:
+            # Keep the lemma we asked for, as metadata_for_lemma_full does
+            entry["lemma"] = input_lemma
+            results[input_lemma] = apply_lemma_metadata_defaults(entry, input_lemma)
+    return results, extra
 
 
 def quick_search_for_wordform(
@@ -373,15 +468,15 @@ def quick_search_for_wordform(
     target_language_name = get_language_name(target_language_code)
 
     # Call Claude to look up the wordform
-    out, extra = generate_gpt_from_template(
-        client=anthropic_client,
-        prompt_template=get_prompt_template_path("quick_search_for_wordform"),
+    out, extra = _generate_cached(
+        "quick_search_for_wordform",
         context_d={
             "wordform": wordform,
             "target_language_name": target_language_name,
         },
         response_json=True,
         verbose=verbose,
+        validate=lambda out: bool(out) and isinstance(out, dict),
     )
 
     # Validate response format
@@ -465,9 +560,8 @@ def extract_phrases_from_text(
     if not txt.strip() or txt.strip() == "-":
         return {}, {}
 
-    out, extra = generate_gpt_from_template(
-        client=anthropic_client,
-        prompt_template=get_prompt_template_path("extract_phrases_from_text"),
+    out, extra = _generate_cached(
+        "extract_phrases_from_text",
         context_d={
             "txt_tgt": txt,
             "target_language_name": target_language_name,
@@ -642,22 +736,20 @@ def create_interactive_word_data(
             and enable_known_word_search_bool
         ):
             try:
-                import ahocorasick  # type: ignore
+                from utils.known_word_automata import get_automaton_for_forms
 
-                automaton = ahocorasick.Automaton()
-                # Insert all known wordforms keyed by their normalized form
-                for norm_key, wf in normalized_form_to_metadata.items():
-                    # Store the original surface for slicing comparison and metadata
-                    automaton.add_word(norm_key, (norm_key, wf))
-                automaton.make_automaton()
+                # Compiled automata are cached per (language, wordform set)
+                automaton = get_automaton_for_forms(
+                    target_language_code, normalized_form_to_metadata.keys()
+                )
 
                 # Scan the normalized text
-                for end_index, (norm_key, wf) in automaton.iter(
+                for start_index, end_index, norm_key in automaton.scan(
                     normalize_for_lang(text_nfc)
                 ):
-                    start_index = end_index - len(norm_key) + 1
+                    wf = normalized_form_to_metadata[norm_key]
                     # Map back to original NFC text indices by locating the substring
-                    surface = text_nfc[start_index : end_index + 1]
+                    surface = text_nfc[start_index:end_index]
                     # Validate the slice matches normalization key
                     if normalize_for_lang(surface) != norm_key:
                         continue
@@ -671,7 +763,7 @@ def create_interactive_word_data(
                         {
                             "word": surface,
                             "start": start_index,
-                            "end": end_index + 1,
+                            "end": end_index,
                             "lemma": wf.get("lemma"),
                             "translations": translations,
                             "part_of_speech": wf.get("part_of_speech", "unknown"),
@@ -739,6 +831,10 @@ def create_interactive_word_data(
     return [], set()
 
 
+# Maximal runs of word characters, i.e. what `\b\w+\b` matches
+_WORD_RUN_RE = re.compile(r"\w+", re.UNICODE)
+
+
 # DEPRECATED: This function is maintained only for backward compatibility.
 # New code should use create_interactive_word_data() instead which returns structured
 # data rather than HTML. This provides better separation of concerns between
@@ -756,11 +852,12 @@ def create_interactive_word_links(
     - Proper indentation preserved
     - Single newlines converted to <br>
 
+    Runs in a single pass over the text, with no database access per match.
+
     Returns:
         Tuple of (enhanced_text, found_wordforms) where found_wordforms is a set of
         wordforms that were found in the text
     """
-    from utils.store_utils import load_or_generate_lemma_metadata
     from utils.word_utils import ensure_nfc, normalize_text
     from flask import url_for
     from utils.url_registry import endpoint_for
@@ -771,76 +868,55 @@ def create_interactive_word_links(
     # Track which wordforms we actually find in the text
     found_wordforms = set()
 
-    def get_etymology(lemma: str) -> str:
-        """Get etymology from lemma metadata."""
-        try:
-            lemma_metadata = load_or_generate_lemma_metadata(
-                lemma=lemma, target_language_code=target_language_code
-            )
-            return lemma_metadata.get("etymology", "")
-        except FileNotFoundError:
-            return ""
-
-    def replace_match(match):
-        """Replace a matched word with an HTML link."""
-        word = match.group(0)  # Original word with case and accents preserved
-        # First ensure the word is in NFC form for consistent matching
-        word_nfc = ensure_nfc(word)
-        normalized_word = normalize_text(word_nfc)
-        wf = next(
-            (
-                wf
-                for wf in sorted_wordforms
-                if normalize_text(ensure_nfc(wf["wordform"])) == normalized_word
-            ),
-            None,
-        )
-        if wf:
-            found_wordforms.add(wf["wordform"])  # Track that we found this wordform
-            lemma = wf["lemma"]
-            translations = wf.get("translations", [])
-            if not translations:
-                translations = [wf.get("translated_word", "")]
-            translation = "; ".join(t for t in translations if t)
-            etymology = get_etymology(lemma)
-            # Use the original word (with its case) in the link text
-            wordform_url = url_for(
+    # Sort wordforms by length in descending order so that, when several
+    # wordforms normalize to the same key, the longest one wins
+    sorted_wordforms = sorted(
+        wordforms, key=lambda wf: len(wf["wordform"]), reverse=True
+    )
+    wordform_by_norm: dict[str, dict] = {}
+    for wf in sorted_wordforms:
+        wordform_by_norm.setdefault(normalize_text(ensure_nfc(wf["wordform"])), wf)
+
+    # Each distinct token is normalized once, and each linked wordform gets one url_for
+    norm_by_word: dict[str, str] = {}
+    url_by_wordform: dict[str, str] = {}
+
+    def lookup_wordform(word: str) -> Optional[dict]:
+        norm = norm_by_word.get(word)
+        if norm is None:
+            norm = norm_by_word[word] = normalize_text(ensure_nfc(word))
+        return wordform_by_norm.get(norm)
+
+    def link_for(word: str, wf: dict) -> str:
+        found_wordforms.add(wf["wordform"])  # Track that we found this wordform
+        wordform_url = url_by_wordform.get(wf["wordform"])
+        if wordform_url is None:
+            wordform_url = url_by_wordform[wf["wordform"]] = url_for(
                 endpoint_for(get_wordform_metadata_vw),
                 target_language_code=target_language_code,
                 wordform=wf["wordform"],  # Link to the wordform instead of lemma
                 _external=False,
             )
-            return f'<a href="{wordform_url}" class="word-link">{word}</a>'
-        return word
-
-    # Sort wordforms by length in descending order to handle overlapping words
-    sorted_wordforms = sorted(
-        wordforms, key=lambda wf: len(wf["wordform"]), reverse=True
-    )
+        # Use the original word (with its case) in the link text
+        return f'<a href="{wordform_url}" class="word-link">{word}</a>'
 
     # First, normalize the input text to NFC for consistent pattern matching
     text_nfc = ensure_nfc(text)
 
-    # Create a regex pattern that matches both original and normalized forms
-    pattern_parts = []
-    for wf in sorted_wordforms:
-        # Ensure wordform is in NFC form for consistent pattern matching
-        nfc_wordform = ensure_nfc(wf["wordform"])
-        # Add the original form
-        pattern_parts.append(re.escape(nfc_wordform))
-        # Add any case variations found in the text
-        text_words = re.findall(r"\b\w+\b", text_nfc, re.UNICODE)
-        for word in text_words:
-            # Ensure word is in NFC form before comparison
-            nfc_word = ensure_nfc(word)
-            if normalize_text(nfc_word) == normalize_text(nfc_wordform):
-                pattern_parts.append(re.escape(nfc_word))
-
-    # Create the pattern with all variations
-    pattern = re.compile(
-        r"\b(" + "|".join(set(pattern_parts)) + r")\b",
-        re.UNICODE,
-    )
+    # With \b on both sides, a wordform made only of word characters can only
+    # ever match a whole run of word characters, so scanning the runs once is
+    # equivalent to the old alternation of every wordform and case variant.
+    # Wordforms with other characters (spaces, apostrophes, ...) still need it.
+    if all(_WORD_RUN_RE.fullmatch(ensure_nfc(wf["wordform"])) for wf in wordforms):
+        pattern = _WORD_RUN_RE
+    else:
+        pattern_parts = {re.escape(ensure_nfc(wf["wordform"])) for wf in wordforms}
+        pattern_parts.update(
+            re.escape(ensure_nfc(word))
+            for word in set(_WORD_RUN_RE.findall(text_nfc))
+            if lookup_wordform(word)
+        )
+        pattern = re.compile(r"\b(" + "|".join(pattern_parts) + r")\b", re.UNICODE)
 
     # Split text into paragraphs while preserving all whitespace
     paragraphs = text_nfc.split("\n\n")
@@ -849,8 +925,18 @@ def create_interactive_word_links(
     processed_paragraphs = []
     for paragraph in paragraphs:
         if paragraph.strip():  # Only process non-empty paragraphs
-            # Process wordforms in this paragraph first
-            processed_paragraph = pattern.sub(replace_match, paragraph)
+            # Link wordforms in this paragraph first, in a single pass over its matches
+            pieces = []
+            pos = 0
+            for match in pattern.finditer(paragraph):
+                wf = lookup_wordform(match.group(0))
+                if wf is None:
+                    continue
+                pieces.append(paragraph[pos : match.start()])
+                pieces.append(link_for(match.group(0), wf))
+                pos = match.end()
+            pieces.append(paragraph[pos:])
+            processed_paragraph = "".join(pieces)
 
             # Split into lines and wrap long lines
             lines = []
@@ -1098,14 +1184,17 @@ def process_phrases_from_text(
     Returns:
         List of phrase dictionaries
     """
-    # Get existing phrases if we have a sourcefile
+    # Get existing phrases if we have a sourcefile (one query, rather than
+    # loading each link's phrase)
     existing_phrases = []
     if sourcefile_entry is not None:
-        for phrase_entry in SourcefilePhrase.select().where(
-            SourcefilePhrase.sourcefile == sourcefile_entry
-        ):
-            if phrase_entry.phrase and phrase_entry.phrase.canonical_form:
-                existing_phrases.append(phrase_entry.phrase.canonical_form)
+        existing_phrases = [
+            row.canonical_form
+            for row in Phrase.select(Phrase.canonical_form)
+            .join(SourcefilePhrase)
+            .where(SourcefilePhrase.sourcefile == sourcefile_entry)
+            if row.canonical_form
+        ]
 
     # Extract phrases, ignoring existing ones
     phrases_d_orig, _ = extract_phrases_from_text(
@@ -1118,44 +1207,7 @@ def process_phrases_from_text(
     )
     phrases_d = phrases_d_orig.get("phrases", [])
 
-    # Process phrases
-    for phrase_counter, phrase_d in enumerate(phrases_d):
-        # Create or get the phrase
-        phrase, phrase_created = Phrase.update_or_create(
-            lookup={
-                "canonical_form": phrase_d["canonical_form"],
-                "target_language_code": target_language_code,
-            },
-            updates={
-                "raw_forms": phrase_d.get("raw_forms", [phrase_d["canonical_form"]]),
-                "translations": phrase_d.get("translations", []),
-                "literal_translation": phrase_d.get("literal_translation", ""),
-                "part_of_speech": phrase_d.get("part_of_speech", "phrase"),
-                "register": phrase_d.get("register", "neutral"),
-                "commonality": phrase_d.get("commonality", 0.5),
-                "guessability": phrase_d.get("guessability", 0.5),
-                "etymology": phrase_d.get("etymology", ""),
-                "cultural_context": phrase_d.get("cultural_context", ""),
-                "mnemonics": phrase_d.get("mnemonics", []),
-                "component_words": phrase_d.get("component_words", []),
-                "usage_notes": phrase_d.get("usage_notes", ""),
-                "language_level": phrase_d.get(
-                    "language_level"
-                ),  # Store CEFR language level from LLM
-            },
-        )
-
-        # Create SourcefilePhrase entry if we have a sourcefile
-        if sourcefile_entry is not None:
-            SourcefilePhrase.update_or_create(
-                lookup={
-                    "sourcefile": sourcefile_entry,
-                    "phrase": phrase,
-                },
-                updates={
-                    "centrality": phrase_d.get("centrality", 0.5),
-                    "ordering": phrase_counter + 1,
-                },
-            )
+    # Save all phrases (and their sourcefile links) in one batch
+    upsert_phrases(phrases_d, target_language_code, sourcefile_entry=sourcefile_entry)
 
     return phrases_d
@@ -1,11 +1,12 @@
 from typing import Optional, TypedDict
 from flask import abort, g
-from peewee import DoesNotExist, prefetch
+from peewee import JOIN, DoesNotExist, prefetch
 import unicodedata
 from werkzeug.exceptions import NotFound
 
 from db_models import Sourcedir, Sourcefile, SourcefileWordform, Wordform, Lemma
 from utils.lang_utils import get_language_name
+from utils.single_flight import single_flight
 from utils.sourcefile_utils import _get_sourcefile_entry
 from .exceptions import AuthenticationRequiredForGenerationError
 
@@ -42,44 +43,29 @@ def ensure_nfc(text: str) -> str:
 
 def get_word_preview(target_language_code: str, word: str) -> WordPreview | None:
     """Get preview data for a word tooltip."""
-    from db_models import Wordform, fn
+    from db_models import Wordform
 
     # Ensure consistent NFC normalization for lookups
     word = ensure_nfc(word)
 
-    try:
-        # First try exact match
-        wordform = Wordform.get(
-            Wordform.wordform == word,
-            Wordform.target_language_code == target_language_code,
-        )
-    except DoesNotExist:
-        # If not found, try case-insensitive match
-        try:
-            wordform = Wordform.get(
-                fn.LOWER(Wordform.wordform) == word.lower(),
-                Wordform.target_language_code == target_language_code,
-            )
-        except DoesNotExist:
-            # If still not found, try normalized form (no diacritics)
-            normalized_word = normalize_text(word)
-            try:
-                wordform = (
-                    Wordform.select()
-                    .where(Wordform.target_language_code == target_language_code)
-                    .where(fn.LOWER(Wordform.wordform) == normalized_word)
-                    .get()
-                )
-            except DoesNotExist:
-                return None
+    # One indexed query ranking exact, case-insensitive, then accent-insensitive
+    # matches, with the lemma joined in
+    wordform = (
+        Wordform.find_best_match(word, target_language_code)
+        .select_extend(Lemma.lemma, Lemma.etymology)
+        .join(Lemma, JOIN.LEFT_OUTER, on=(Wordform.lemma_entry == Lemma.id))
+        .objects()
+        .first()
+    )
+    if wordform is None:
+        return None
 
-    lemma_entry = wordform.lemma_entry
     return {
-        "lemma": lemma_entry.lemma if lemma_entry else word,
+        "lemma": wordform.lemma if wordform.lemma is not None else word,
         "translation": (
             "; ".join(wordform.translations) if wordform.translations else ""
         ),
-        "etymology": lemma_entry.etymology if lemma_entry else None,
+        "etymology": wordform.etymology,
         "inflection_type": wordform.inflection_type,
     }
 
@@ -240,7 +226,6 @@ def find_or_create_wordform(target_language_code: str, wordform: str):
             "data": dict,  # The result data appropriate for the status
         }
     """
-    from utils.vocab_llm_utils import quick_search_for_wordform
     from peewee import DoesNotExist
     from loguru import logger
 
@@ -277,116 +262,149 @@ def find_or_create_wordform(target_language_code: str, wordform: str):
                 "Authentication required to search for or generate wordform details."
             )
 
-        # User is logged in, proceed with AI search/generation
-        logger.info(
-            f"[find_or_create_wordform] User logged in. Calling quick_search_for_wordform for '{normalized_wordform}'."
-        )
-        search_result, _ = quick_search_for_wordform(
-            normalized_wordform, target_language_code, 1
-        )
-        logger.info(
-            f"[find_or_create_wordform] quick_search_for_wordform for '{normalized_wordform}' returned: {search_result}"
+        # User is logged in, proceed with AI search/generation. Concurrent
+        # requests for the same wordform share a single search.
+        return single_flight(
+            ("wordform_search", target_language_code, normalized_wordform),
+            lambda: _search_and_create_wordform(
+                target_language_code, normalized_wordform
+            ),
+            recheck=lambda: _find_existing_wordform(
+                target_language_code, normalized_wordform
+            ),
         )
 
-        # Count total matches from both result types
-        target_matches = search_result["target_language_results"]["matches"]
-        english_matches = search_result["english_results"]["matches"]
-        total_matches = len(target_matches) + len(english_matches)
 
-        # Check for possible misspellings
-        target_misspellings = search_result["target_language_results"][
-            "possible_misspellings"
-        ]
-        english_misspellings = search_result["english_results"]["possible_misspellings"]
+def _find_existing_wordform(target_language_code: str, wordform: str):
+    """Return find_or_create_wordform's "found" result if the wordform now exists."""
+    from peewee import DoesNotExist
 
-        # If there are multiple matches or misspellings, return search results
-        if total_matches > 1 or target_misspellings or english_misspellings:
-            logger.info(
-                f"[find_or_create_wordform] Multiple matches or misspellings for '{normalized_wordform}'. Returning 'multiple_matches'."
-            )
-            return {
-                "status": "multiple_matches",
-                "data": {
-                    "target_language_code": target_language_code,
-                    "target_language_name": get_language_name(target_language_code),
-                    "search_term": normalized_wordform,
-                    "target_language_results": search_result["target_language_results"],
-                    "english_results": search_result["english_results"],
-                },
-            }
+    try:
+        return {
+            "status": "found",
+            "data": get_wordform_metadata(target_language_code, wordform),
+        }
+    except DoesNotExist:
+        return None
 
-        # If there's exactly one match, create that wordform and return the data
-        elif total_matches == 1:
-            # Get the single match (either from target or english results)
-            match = target_matches[0] if target_matches else english_matches[0]
-            match_wordform = match.get("target_language_wordform")
 
-            if match_wordform:
-                logger.info(
-                    f"[find_or_create_wordform] Single match found: '{match_wordform}'. Attempting to create in DB."
-                )
-                # Convert from new response format to metadata format
-                metadata = {
-                    "wordform": match_wordform,
-                    "lemma": match.get("target_language_lemma"),
-                    "part_of_speech": match.get("part_of_speech"),
-                    "translations": match.get("english", []),
-                    "inflection_type": match.get("inflection_type"),
-                    "possible_misspellings": None,
-                }
+def _search_and_create_wordform(target_language_code: str, normalized_wordform: str):
+    """Search for a wordform with the LLM and store it if there's a single match.
 
-                # Create the wordform in the database
-                Wordform.get_or_create_from_metadata(
-                    wordform=match_wordform,
-                    target_language_code=target_language_code,
-                    metadata=metadata,
-                )
+    Returns the same {"status", "data"} dict as find_or_create_wordform.
+    """
+    from utils.vocab_llm_utils import quick_search_for_wordform
+    from loguru import logger
 
-                # Now that the wordform is created, fetch the complete metadata
-                try:
-                    # Directly return the complete data instead of redirecting
-                    logger.info(
-                        f"[find_or_create_wordform] Wordform '{match_wordform}' created/found. Fetching its full metadata."
-                    )
-                    result = get_wordform_metadata(target_language_code, match_wordform)
-                    logger.info(
-                        f"[find_or_create_wordform] Successfully fetched metadata for new/matched wordform '{match_wordform}'. Result: {result}"
-                    )
-                    return {"status": "found", "data": result}
-                except Exception as e:
-                    logger.error(
-                        f"[find_or_create_wordform] Error after creating/matching wordform '{match_wordform}': {e}. Returning 'redirect'."
-                    )
-                    # Fallback to redirect if there's an error getting the complete data
-                    return {
-                        "status": "redirect",
-                        "data": {
-                            "error": "Internal Server Error",
-                            "description": "Error fetching wordform metadata",
-                            "target_language_code": target_language_code,
-                            "target_language_name": get_language_name(
-                                target_language_code
-                            ),
-                            "wordform": match_wordform,
-                        },
-                    }
-
-        # If no matches or misspellings, return invalid word data
+    logger.info(
+        f"[find_or_create_wordform] User logged in. Calling quick_search_for_wordform for '{normalized_wordform}'."
+    )
+    search_result, _ = quick_search_for_wordform(
+        normalized_wordform, target_language_code, 1
+    )
+    logger.info(
+        f"[find_or_create_wordform] quick_search_for_wordform for '{normalized_wordform}' returned: {search_result}"
+    )
+
+    # Count total matches from both result types
+    target_matches = search_result["target_language_results"]["matches"]
+    english_matches = search_result["english_results"]["matches"]
+    total_matches = len(target_matches) + len(english_matches)
+
+    # Check for possible misspellings
+    target_misspellings = search_result["target_language_results"][
+        "possible_misspellings"
+    ]
+    english_misspellings = search_result["english_results"]["possible_misspellings"]
+
+    # If there are multiple matches or misspellings, return search results
+    if total_matches > 1 or target_misspellings or english_misspellings:
         logger.info(
-            f"[find_or_create_wordform] No valid matches found for '{normalized_wordform}'. Returning 'invalid'."
+            f"[find_or_create_wordform] Multiple matches or misspellings for '{normalized_wordform}'. Returning 'multiple_matches'."
         )
         return {
-            "status": "invalid",
+            "status": "multiple_matches",
             "data": {
-                "error": "Not Found",
-                "description": f"Wordform '{normalized_wordform}' not found",
                 "target_language_code": target_language_code,
                 "target_language_name": get_language_name(target_language_code),
-                "wordform": normalized_wordform,
-                "possible_misspellings": target_misspellings,
+                "search_term": normalized_wordform,
+                "target_language_results": search_result["target_language_results"],
+                "english_results": search_result["english_results"],
             },
         }
 
+    # If there's exactly one match, create that wordform and return the data
+    elif total_matches == 1:
+        # Get the single match (either from target or english results)
+        match = target_matches[0] if target_matches else english_matches[0]
+        match_wordform = match.get("target_language_wordform")
+
+        if match_wordform:
+            logger.info(
+                f"[find_or_create_wordform] Single match found: '{match_wordform}'. Attempting to create in DB."
+            )
+            # Convert from new response format to metadata format
+            metadata = {
+                "wordform": match_wordform,
+                "lemma": match.get("target_language_lemma"),
+                "part_of_speech": match.get("part_of_speech"),
+                "translations": match.get("english", []),
+                "inflection_type": match.get("inflection_type"),
+                "possible_misspellings": None,
+            }
+
+            # Create the wordform in the database
+            Wordform.get_or_create_from_metadata(
+                wordform=match_wordform,
+                target_language_code=target_language_code,
+                metadata=metadata,
+            )
+
+            # Now that the wordform is created, fetch the complete metadata
+            try:
+                # Directly return the complete data instead of redirecting
+                logger.info(
+                    f"[find_or_create_wordform] Wordform '{match_wordform}' created/found. Fetching its full metadata."
+                )
+                result = get_wordform_metadata(target_language_code, match_wordform)
+                logger.info(
+                    f"[find_or_create_wordform] Successfully fetched metadata for new/matched wordform '{match_wordform}'. Result: {result}"
+                )
+                return {"status": "found", "data": result}
+            except Exception as e:
+                logger.error(
+                    f"[find_or_create_wordform] Error after creating/matching wordform '{match_wordform}': {e}. Returning 'redirect'."
+                )
+                # Fallback to redirect if there's an error getting the complete data
+                return {
+                    "status": "redirect",
+                    "data": {
+                        "error": "Internal Server Error",
+                        "description": "Error fetching wordform metadata",
+                        "target_language_code": target_language_code,
+                        "target_language_name": get_language_name(
+                            target_language_code
+                        ),
+                        "wordform": match_wordform,
+                    },
+                }
+
+    # If no matches or misspellings, return invalid word data
+    logger.info(
+        f"[find_or_create_wordform] No valid matches found for '{normalized_wordform}'. Returning 'invalid'."
+    )
+    return {
+        "status": "invalid",
+        "data": {
+            "error": "Not Found",
+            "description": f"Wordform '{normalized_wordform}' not found",
+            "target_language_code": target_language_code,
+            "target_language_name": get_language_name(target_language_code),
+            "wordform": normalized_wordform,
+            "possible_misspellings": target_misspellings,
+        },
+    }
+
 
 def count_words(text: Optional[str], language_code: str) -> int:
     """
@@ -22,7 +22,7 @@ from utils.error_utils import safe_error_message
 
 from utils.auth_utils import api_auth_required
 from utils.word_utils import get_sourcefile_lemmas
-from utils.store_utils import load_or_generate_lemma_metadata
+from utils.store_utils import warm_lemma_metadata
 from utils.exceptions import AuthenticationRequiredForGenerationError
 from utils.lang_utils import get_language_name
 from utils.prompt_utils import get_prompt_template_path
@@ -67,6 +67,10 @@ def learn_sourcefile_summary_api(
       }...],
       "meta": {"total_candidates": int, "returned": int, "durations": {...}}
     }
+
+    Missing metadata is generated on the shared warmup pool until
+    `time_budget_s` runs out. Anything unfinished by then keeps generating in
+    the background (`meta.counts.pending_in_background`), so a retry is fuller.
     """
     started_at = time.time()
     durations: Dict[str, float] = {}
@@ -143,65 +147,61 @@ def learn_sourcefile_summary_api(
             "generated": 0,
             "fallback_defaults": 0,
             "skipped_due_to_budget": 0,
+            "pending_in_background": 0,
         }
 
+        # Generate metadata for missing/incomplete lemmas on the shared warmup
+        # pool. Lemmas whose partial metadata already scores as hardest (i.e.
+        # most likely to make the top N) go first; unknown ones score as average.
+        to_generate = sorted(
+            (
+                lemma
+                for lemma in lemmas
+                if not (existing_map.get(lemma) or {}).get("is_complete")
+            ),
+            key=lambda lemma: _difficulty_score(existing_map.get(lemma) or {}),
+            reverse=True,
+        )
+        generated_map: Dict[str, Dict[str, Any]] = {}
+        if to_generate and time.time() - started_at < time_budget_s:
+            gen_t0 = time.time()
+            try:
+                warmup = warm_lemma_metadata(
+                    to_generate,
+                    target_language_code,
+                    deadline=started_at + time_budget_s,
+                )
+                generated_map = warmup.completed
+                counts["pending_in_background"] = len(warmup.pending)
+            except AuthenticationRequiredForGenerationError:
+                pass
+            except Exception as e:
+                logger.warning(f"Lemma metadata warmup failed: {e}")
+            finally:
+                generation_s_total += time.time() - gen_t0
+        budget_exhausted = time.time() - started_at >= time_budget_s
+
         for lemma in lemmas:
-            now = time.time()
-            elapsed = now - started_at
             have = existing_map.get(lemma)
             md: Dict[str, Any]
             if have and have.get("is_complete"):
                 md = have
+            elif lemma in generated_map:
+                md = generated_map[lemma]
+                counts["generated"] += 1
             else:
-                # If budget remains, attempt to load/generate; otherwise fallback defaults
-                if elapsed < time_budget_s:
-                    gen_t0 = time.time()
-                    try:
-                        md = load_or_generate_lemma_metadata(
-                            lemma=lemma,
-                            target_language_code=target_language_code,
-                            generate_if_incomplete=True,
-                        )
-                        counts["generated"] += 1
-                    except AuthenticationRequiredForGenerationError:
-                        md = {
-                            "lemma": lemma,
-                            "translations": [],
-                            "etymology": "",
-                            "commonality": 0.5,
-                            "guessability": 0.5,
-                            "part_of_speech": "unknown",
-                            "is_complete": False,
-                        }
-                        counts["fallback_defaults"] += 1
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to load/generate metadata for '{lemma}': {e}"
-                        )
-                        md = {
-                            "lemma": lemma,
-                            "translations": [],
-                            "etymology": "",
-                            "commonality": 0.5,
-                            "guessability": 0.5,
-                            "part_of_speech": "unknown",
-                            "is_complete": False,
-                        }
-                        counts["fallback_defaults"] += 1
-                    finally:
-                        generation_s_total += time.time() - gen_t0
-                else:
+                if budget_exhausted:
                     counts["skipped_due_to_budget"] += 1
-                    md = {
-                        "lemma": lemma,
-                        "translations": [],
-                        "etymology": "",
-                        "commonality": 0.5,
-                        "guessability": 0.5,
-                        "part_of_speech": "unknown",
-                        "is_complete": False,
-                    }
-                    counts["fallback_defaults"] += 1
+                md = {
+                    "lemma": lemma,
+                    "translations": [],
+                    "etymology": "",
+                    "commonality": 0.5,
+                    "guessability": 0.5,
+                    "part_of_speech": "unknown",
+                    "is_complete": False,
+                }
+                counts["fallback_defaults"] += 1
 
             # Build summary item; include a couple of examples/mnemonics for UX
             example_usage = md.get("example_usage") or []
@@ -368,7 +368,7 @@ def learn_sourcefile_generate_api(
                 if skip_audio:
                     # When skip_audio=True, only do cheap DB lookup for existing audio
                     variants = list(
-                        SentenceAudio.select()
+                        SentenceAudio.select_without_audio()
                         .where(SentenceAudio.sentence == s)
                         .order_by(SentenceAudio.created_at)
                         .limit(1)
@@ -389,7 +389,7 @@ def learn_sourcefile_generate_api(
                         # Still include sentence but skip audio generation
                         # Use .limit(1) for efficiency when budget exhausted
                         variants = list(
-                            SentenceAudio.select()
+                            SentenceAudio.select_without_audio()
                             .where(SentenceAudio.sentence == s)
                             .order_by(SentenceAudio.created_at)
                             .limit(1)
@@ -399,7 +399,7 @@ def learn_sourcefile_generate_api(
                             variants, _ = ensure_sentence_audio_variants(s, n=1)
                         except AuthenticationRequiredForGenerationError:
                             variants = list(
-                                SentenceAudio.select()
+                                SentenceAudio.select_without_audio()
                                 .where(SentenceAudio.sentence == s)
                                 .order_by(SentenceAudio.created_at)
                             )
@@ -408,7 +408,7 @@ def learn_sourcefile_generate_api(
                                 f"Failed to ensure audio variants for sentence id={s.id}: {e}"
                             )
                             variants = list(
-                                SentenceAudio.select()
+                                SentenceAudio.select_without_audio()
                                 .where(SentenceAudio.sentence == s)
                                 .order_by(SentenceAudio.created_at)
                             )
@@ -722,7 +722,7 @@ def ensure_sentence_audio_api(sentence_id: int):
 
             # Check for existing audio variants (cheap DB lookup)
             existing_variants = list(
-                SentenceAudio.select()
+                SentenceAudio.select_without_audio()
                 .where(SentenceAudio.sentence == sentence)
                 .order_by(SentenceAudio.created_at)
                 .limit(1)
@@ -5,21 +5,28 @@ These endpoints follow the standard pattern:
 /api/lang/lemma/...
 """
 
-from flask import Blueprint, jsonify, request, send_file
-import io
-from peewee import DoesNotExist, fn, prefetch
+from flask import Blueprint, jsonify, request
+from peewee import DoesNotExist, prefetch
 import logging
 import urllib.parse
 
 from utils.lang_utils import get_language_name
 from db_models import Lemma, UserLemma, LemmaAudio, Wordform, LemmaExampleSentence, Sentence
 from utils.store_utils import load_or_generate_lemma_metadata
-from utils.sourcefile_utils import complete_lemma_metadata
-from utils.audio_utils import ensure_lemma_audio_variants
+from utils.sourcefile_utils import complete_lemma_metadata, complete_lemmas_metadata
+from utils.audio_http import (
+    audio_variant_response,
+    random_variant_redirect,
+    variant_columns,
+)
+from utils.audio_utils import ensure_lemma_audio_variants, random_audio_variant
 
 # Import the auth decorators and the new exception
 from utils.auth_utils import api_auth_required, api_auth_optional
-from utils.exceptions import AuthenticationRequiredForGenerationError
+from utils.exceptions import (
+    AuthenticationRequiredForGenerationError,
+    SingleFlightTimeout,
+)
 from utils.error_utils import safe_error_message
 
 # Create a blueprint with standardized prefix
@@ -32,10 +39,11 @@ logger = logging.getLogger(__name__)
 def get_lemma_data_api(target_language_code: str, lemma: str):
     """Get detailed data for a specific lemma."""
     try:
-        lemma_model = Lemma.get(
-            (Lemma.lemma == lemma)
-            & (Lemma.target_language_code == target_language_code)
-        )
+        # Exact match first, else a case-insensitive one (not accent-insensitive:
+        # ποτέ and πότε are different lemmas)
+        lemma_model = Lemma.find_best_match(
+            lemma, target_language_code, fold_accents=False
+        ).get()
         data = lemma_model.to_dict()
         return jsonify(data)
     except DoesNotExist:
@@ -75,7 +83,7 @@ def get_lemma_audio_variants_api(target_language_code: str, lemma: str):
         return jsonify({"error": "Lemma not found"}), 404
 
     variants = (
-        LemmaAudio.select()
+        LemmaAudio.select_without_audio()
         .where(LemmaAudio.lemma == lemma_model)
         .order_by(LemmaAudio.created_at)
     )
@@ -99,7 +107,7 @@ def get_lemma_audio_variants_api(target_language_code: str, lemma: str):
 
 @lemma_api_bp.route("/<target_language_code>/<lemma>/audio", methods=["GET"])
 def get_lemma_audio_stream_api(target_language_code: str, lemma: str):
-    """Stream a random lemma audio variant."""
+    """Stream a lemma audio variant (`?variant_id=`), else redirect to a random one."""
     # Normalize lemma for consistent DB lookups
     try:
         import urllib.parse
@@ -117,35 +125,26 @@ def get_lemma_audio_stream_api(target_language_code: str, lemma: str):
     except DoesNotExist:
         return jsonify({"error": "Lemma not found"}), 404
 
+    # Variants are selected without their blob, which a 304 doesn't need
     variant_id_param = request.args.get("variant_id")
     if variant_id_param:
         try:
-            variant = LemmaAudio.get(
-                (LemmaAudio.id == int(variant_id_param))
-                & (LemmaAudio.lemma == lemma_model)
+            variant = (
+                LemmaAudio.select(*variant_columns(LemmaAudio))
+                .where(
+                    (LemmaAudio.id == int(variant_id_param))
+                    & (LemmaAudio.lemma == lemma_model)
+                )
+                .get()
             )
         except (DoesNotExist, ValueError):
             return jsonify({"error": "Audio not found"}), 404
-    else:
-        variant = (
-            LemmaAudio.select()
-            .where(LemmaAudio.lemma == lemma_model)
-            .order_by(fn.Random())
-            .first()
-        )
+        return audio_variant_response(variant)
+
+    variant = random_audio_variant(LemmaAudio, LemmaAudio.lemma == lemma_model)
     if not variant:
         return jsonify({"error": "Audio not found"}), 404
-
-    response = send_file(
-        io.BytesIO(variant.audio_data), mimetype="audio/mpeg", as_attachment=False
-    )
-    metadata = variant.metadata or {}
-    voice_name = metadata.get("voice_name")
-    if voice_name:
-        response.headers["X-Voice-Name"] = voice_name
-    response.headers["X-Voice-Variant-Id"] = str(variant.id)
-    response.headers["X-Audio-Provider"] = variant.provider
-    return response
+    return random_variant_redirect(variant)
 
 
 @lemma_api_bp.route("/<target_language_code>/<lemma>/audio/ensure", methods=["POST"])
@@ -292,6 +291,16 @@ def get_lemma_metadata_api(target_language_code: str, lemma: str):
             pass
         return jsonify(error_data), 401
 
+    except SingleFlightTimeout:
+        # Another request is still generating this lemma
+        error_data = {
+            "error": "Generation in progress",
+            "description": f"Lemma '{lemma}' is still being generated, please retry shortly",
+            "target_language_code": target_language_code,
+            "target_language_name": get_language_name(target_language_code),
+        }
+        return jsonify(error_data), 503
+
     except DoesNotExist:
         # This case should theoretically not be hit anymore as load_or_generate
         # handles creation, but kept for safety.
@@ -367,6 +376,49 @@ def complete_lemma_metadata_api(target_language_code: str, lemma: str):
         return response
 
 
+@lemma_api_bp.route(
+    "/<target_language_code>/lemmas/complete_metadata", methods=["POST"]
+)
+@api_auth_required
+def complete_lemmas_metadata_api(target_language_code: str):
+    """Complete the metadata for several lemmas at once.
+
+    Expects JSON {"lemmas": [str, ...]}. Generation is batched (several lemmas
+    per LLM call), so this is much faster than one complete_metadata call per lemma.
+    """
+    data = request.get_json(silent=True) or {}
+    requested = data.get("lemmas")
+    if not isinstance(requested, list) or not all(
+        isinstance(lemma, str) for lemma in requested
+    ):
+        return jsonify({"error": "Expected JSON body {\"lemmas\": [str, ...]}"}), 400
+
+    try:
+        lemma_models = list(
+            Lemma.select().where(
+                (Lemma.target_language_code == target_language_code)
+                & (Lemma.lemma.in_(requested))
+            )
+        )
+        completed = complete_lemmas_metadata(lemma_models)
+        return jsonify(
+            {
+                "success": True,
+                "lemmas": {
+                    lemma: lemma_model.to_dict()
+                    for lemma, lemma_model in completed.items()
+                },
+                "failed": [lemma for lemma in requested if lemma not in completed],
+            }
+        )
+    except Exception as e:
+        response = jsonify(
+            {"error": "Failed to complete lemma metadata", "description": safe_error_message(e, "complete lemma metadata")}
+        )
+        response.status_code = 500
+        return response
+
+
 @lemma_api_bp.route("/<target_language_code>/<lemma>/ignore", methods=["POST"])
 @api_auth_required
 def ignore_lemma_api(target_language_code: str, lemma: str):
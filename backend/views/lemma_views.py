@@ -64,15 +64,14 @@ def get_lemma_metadata_vw(target_language_code: str, lemma: str):
     try:
         # Time the database fetch with prefetch
         fetch_start = time.time()
+        # Exact match first, else a case-insensitive one (not accent-insensitive:
+        # ποτέ and πότε are different lemmas)
         lemma_model = (
-            Lemma.select()
-            .where(
-                Lemma.lemma == lemma,
-                Lemma.target_language_code == target_language_code,
-            )
+            Lemma.find_best_match(lemma, target_language_code, fold_accents=False)
             .join(LemmaExampleSentence, JOIN.LEFT_OUTER)
             .get()
         )
+        lemma = lemma_model.lemma
         fetch_time = time.time() - fetch_start
         logger.info(f"Fetched lemma with joins in {fetch_time:.2f}s")
 
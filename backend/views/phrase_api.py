@@ -6,11 +6,17 @@ These endpoints follow the standard pattern:
 """
 
 from flask import Blueprint, jsonify, request
+from config import MAX_PHRASE_PREVIEWS_PER_REQUEST
 from peewee import DoesNotExist
 from utils.auth_utils import api_auth_required
 from db_models import Phrase
 import urllib.parse
-from utils.phrase_utils import get_phrases_query, get_phrase_by_slug
+from utils.phrase_utils import (
+    find_phrase_by_surface,
+    find_phrases_by_surfaces,
+    get_phrases_query,
+    get_phrase_by_slug,
+)
 
 
 # Create a blueprint with standardized prefix
@@ -45,6 +51,18 @@ def phrases_list_api(target_language_code: str):
     return jsonify(phrases_list)
 
 
+def _phrase_preview(phrase_model: Phrase) -> dict:
+    """Preview data for phrase tooltips."""
+    return {
+        "canonical_form": phrase_model.canonical_form,
+        "translations": phrase_model.translations,
+        "part_of_speech": phrase_model.part_of_speech,
+        "usage_notes": phrase_model.usage_notes,
+        "language_level": phrase_model.language_level,
+        "register": phrase_model.register,
+    }
+
+
 @phrase_api_bp.route("/<target_language_code>/preview/<phrase>")
 def phrase_preview_api(target_language_code: str, phrase: str):
     """Get preview data for phrase tooltips."""
@@ -52,24 +70,8 @@ def phrase_preview_api(target_language_code: str, phrase: str):
     phrase = urllib.parse.unquote(phrase)
 
     try:
-        # Try to find the phrase in the database
-        phrase_model = (
-            Phrase.select()
-            .where(
-                (Phrase.canonical_form == phrase)
-                & (Phrase.target_language_code == target_language_code)
-            )
-            .first()
-        )
-
-        if phrase_model is None:
-            # Try to find it by a raw form
-            for p in Phrase.select().where(
-                Phrase.target_language_code == target_language_code
-            ):
-                if phrase in p.raw_forms:
-                    phrase_model = p
-                    break
+        # Canonical form first, then any raw form (both indexed)
+        phrase_model = find_phrase_by_surface(target_language_code, phrase)
 
         if phrase_model is None:
             response = jsonify(
@@ -78,17 +80,7 @@ def phrase_preview_api(target_language_code: str, phrase: str):
             response.status_code = 404
             return response
 
-        # Create preview data
-        preview = {
-            "canonical_form": phrase_model.canonical_form,
-            "translations": phrase_model.translations,
-            "part_of_speech": phrase_model.part_of_speech,
-            "usage_notes": phrase_model.usage_notes,
-            "language_level": phrase_model.language_level,
-            "register": phrase_model.register,
-        }
-
-        response = jsonify(preview)
+        response = jsonify(_phrase_preview(phrase_model))
         response.headers["Cache-Control"] = "public, max-age=60"  # Cache for 1 minute
         return response
     except Exception as e:
@@ -97,6 +89,41 @@ def phrase_preview_api(target_language_code: str, phrase: str):
         return response
 
 
+@phrase_api_bp.route("/<target_language_code>/previews", methods=["POST"])
+def phrase_previews_api(target_language_code: str):
+    """Get preview data for many phrase surfaces in one request.
+
+    Expects JSON `{"phrases": [...]}` (at most MAX_PHRASE_PREVIEWS_PER_REQUEST)
+    and returns `{surface: preview}` for the surfaces that were found (by
+    canonical form or raw form).
+    """
+    data = request.get_json(silent=True) or {}
+    surfaces = data.get("phrases")
+    if not isinstance(surfaces, list) or not all(isinstance(s, str) for s in surfaces):
+        response = jsonify(
+            {"error": "Bad Request", "description": "'phrases' must be a list of strings"}
+        )
+        response.status_code = 400
+        return response
+    if len(surfaces) > MAX_PHRASE_PREVIEWS_PER_REQUEST:
+        response = jsonify(
+            {
+                "error": "Bad Request",
+                "description": (
+                    f"At most {MAX_PHRASE_PREVIEWS_PER_REQUEST} phrases per request"
+                ),
+            }
+        )
+        response.status_code = 400
+        return response
+
+    found = find_phrases_by_surfaces(target_language_code, surfaces)
+    # A POST, so not cached (unlike the single-phrase GET above)
+    return jsonify(
+        {surface: _phrase_preview(phrase) for surface, phrase in found.items()}
+    )
+
+
 @phrase_api_bp.route("/<target_language_code>/detail/<slug>")
 def get_phrase_metadata_api(target_language_code: str, slug: str):
     """Get metadata for a specific phrase using its slug.
@@ -12,7 +12,10 @@ from utils.lang_utils import get_language_name
 
 # Import auth decorator and exception
 from utils.auth_utils import api_auth_optional, api_auth_required
-from utils.exceptions import AuthenticationRequiredForGenerationError
+from utils.exceptions import (
+    AuthenticationRequiredForGenerationError,
+    SingleFlightTimeout,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -118,6 +121,17 @@ def unified_search_api(target_language_code: str):
             "data": {},
         }
         return jsonify(error_response), 401
+    except SingleFlightTimeout:
+        # Another request is still generating this wordform
+        error_response = {
+            "status": "error",
+            "query": query,
+            "target_language_code": target_language_code,
+            "target_language_name": get_language_name(target_language_code),
+            "error": "This word is still being generated, please retry shortly",
+            "data": {},
+        }
+        return jsonify(error_response), 503
     except Exception as e:
         # Log and return a clear error message
         logger.exception(f"Error in unified search: {e}")
@@ -5,8 +5,7 @@ These endpoints follow the standard pattern:
 /api/lang/sentence/...
 """
 
-from flask import Blueprint, jsonify, request, send_file
-import io
+from flask import Blueprint, jsonify, request
 import logging
 from peewee import DoesNotExist
 from slugify import slugify
@@ -21,6 +20,11 @@ from utils.audio_utils import (
     ensure_sentence_audio_variants,
     stream_random_sentence_audio,
 )
+from utils.audio_http import (
+    audio_variant_response,
+    random_variant_redirect,
+    variant_columns,
+)
 from utils.exceptions import AuthenticationRequiredForGenerationError
 from utils.auth_utils import api_auth_required
 from utils.error_utils import safe_error_message
@@ -82,7 +86,8 @@ def get_sentence_audio_api(target_language_code: str, sentence_id: int):
         sentence_id: Database ID of the sentence
 
     Returns:
-        Audio file response or 404 if not found
+        The `?variant_id=` variant's audio, a redirect to a random variant's
+        URL when none is given, or 404 if not found
     """
     try:
         sentence = Sentence.get(
@@ -96,29 +101,23 @@ def get_sentence_audio_api(target_language_code: str, sentence_id: int):
 
     if variant_id_param:
         try:
-            variant = SentenceAudio.get(
-                (SentenceAudio.id == int(variant_id_param))
-                & (SentenceAudio.sentence == sentence)
+            # Without the blob, which a 304 doesn't need
+            variant = (
+                SentenceAudio.select(*variant_columns(SentenceAudio))
+                .where(
+                    (SentenceAudio.id == int(variant_id_param))
+                    & (SentenceAudio.sentence == sentence)
+                )
+                .get()
             )
         except (DoesNotExist, ValueError):
             return jsonify({"error": "Audio not found"}), 404
-    else:
-        variant = stream_random_sentence_audio(sentence.id)
+        return audio_variant_response(variant)
+
+    variant = stream_random_sentence_audio(sentence.id)
     if variant is None:
         return jsonify({"error": "Audio not found"}), 404
-
-    response = send_file(
-        io.BytesIO(variant.audio_data),
-        mimetype="audio/mpeg",
-        as_attachment=False,
-    )
-    metadata = variant.metadata or {}
-    voice_name = metadata.get("voice_name")
-    if voice_name:
-        response.headers["X-Voice-Name"] = voice_name
-    response.headers["X-Voice-Variant-Id"] = str(variant.id)
-    response.headers["X-Audio-Provider"] = variant.provider
-    return response
+    return random_variant_redirect(variant)
 
 
 @sentence_api_bp.route(
@@ -136,7 +135,7 @@ def get_sentence_audio_variants_api(target_language_code: str, sentence_id: int)
         return jsonify({"error": "Sentence not found"}), 404
 
     variants = (
-        SentenceAudio.select()
+        SentenceAudio.select_without_audio()
         .where(SentenceAudio.sentence == sentence)
         .order_by(SentenceAudio.created_at)
     )
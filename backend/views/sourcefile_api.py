@@ -48,11 +48,11 @@ from utils.sourcedir_utils import (
 from utils.sourcefile_utils import (
     _get_sourcefile_entry,
     get_sourcefile_details,
-    process_sourcefile,
     _create_text_sourcefile,
     preprocess_html_for_llm,
 )
-from utils.store_utils import load_or_generate_lemma_metadata
+from utils.sourcefile_jobs import PROCESS_ALL_STEP, enqueue_sourcefile_job
+from utils.store_utils import generate_lemma_metadata_batch
 from utils.youtube_utils import YouTubeDownloadError, download_audio
 from slugify import slugify
 from utils.types import LanguageLevel
@@ -64,6 +64,7 @@ from utils.auth_utils import api_auth_required
 from utils.url_registry import endpoint_for
 from utils.lang_utils import validate_language_level
 import utils.generate_sourcefiles as gen_sf
+from views.sourcefile_api_processing import job_to_response
 from views.sourcefile_views import inspect_sourcefile_text_vw
 from utils.error_utils import safe_error_message
 from utils.url_utils import validate_url_for_ssrf, SSRFValidationError
@@ -272,8 +273,8 @@ def inspect_sourcefile_audio_api(
 def process_sourcefile_api(
     target_language_code: str, sourcedir_slug: str, sourcefile_slug: str
 ):
-    """Process a source file to transcribe, translate, and extract wordforms and phrases.
-    This is now a synchronous operation - the request will complete after all processing is done.
+    """Queue a source file to be transcribed, translated, and have its wordforms and phrases extracted.
+    Returns 202 with the job straight away; poll the job's `status_url` for progress.
     """
     try:
         # Get the sourcefile entry using helper
@@ -303,26 +304,23 @@ def process_sourcefile_api(
             LanguageLevel
         ), f"Invalid language level: {language_level}"
 
-        # Process the sourcefile synchronously
-        process_sourcefile(
-            sourcefile_entry,
-            language_level=language_level,  # type: ignore
-            max_new_words=max_new_words,
-            max_new_phrases=max_new_phrases,
-        )
+        params = {
+            "max_new_words": max_new_words,
+            "max_new_phrases": max_new_phrases,
+            "language_level": language_level,
+        }
+        job = enqueue_sourcefile_job(sourcefile_entry, PROCESS_ALL_STEP, params)
 
-        # Return success response
         return jsonify(
             {
                 "success": True,
-                "message": "Sourcefile processing completed",
-                "params": {
-                    "max_new_words": max_new_words,
-                    "max_new_phrases": max_new_phrases,
-                    "language_level": language_level,
-                },
+                "message": "Sourcefile processing queued",
+                "params": params,
+                "job": job_to_response(
+                    job, target_language_code, sourcedir_slug, sourcefile_slug
+                ),
             }
-        )
+        ), 202
 
     except DoesNotExist:
         return jsonify({"success": False, "error": "File not found"}), 404
@@ -332,17 +330,15 @@ def process_sourcefile_api(
 
 
 def _process_individual_lemma(lemma: str, target_language_code: str):
-    """Process a single lemma, generating metadata and audio for its sentences.
+    """Generate audio for a lemma's example sentences.
 
-    Includes random jitter to avoid overwhelming external APIs."""
+    Metadata is generated beforehand for all lemmas at once, see
+    `generate_lemma_metadata_batch`. Includes random jitter to avoid
+    overwhelming external APIs."""
     # Add jitter delay between 0 and 2 seconds
     time.sleep(random.uniform(0, 2))
 
     try:
-        _ = load_or_generate_lemma_metadata(
-            lemma, target_language_code, generate_if_incomplete=True
-        )
-
         # Get example sentences
         sentences = (
             Sentence.select()
@@ -383,8 +379,18 @@ def process_individual_words_api(target_language_code, sourcedir_slug, sourcefil
         processed_lemmas = []
         failed_lemmas = []
 
+        # Generate/complete metadata for all lemmas, several per LLM call
+        completed_lemmas = generate_lemma_metadata_batch(
+            sorted(unique_lemmas), target_language_code
+        )
+
         # Process lemmas serially with a standard for loop
         for lemma in unique_lemmas:
+            if lemma not in completed_lemmas:
+                failed_lemmas.append(
+                    {"lemma": lemma, "error": "Failed to generate metadata"}
+                )
+                continue
             try:
                 _process_individual_lemma(lemma, target_language_code)
                 processed_lemmas.append(lemma)
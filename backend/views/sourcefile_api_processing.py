@@ -1,6 +1,8 @@
 """API endpoints for sourcefile processing.
 
-These endpoints handle individual processing steps for sourcefiles.
+These endpoints handle individual processing steps for sourcefiles. The steps
+run in a background worker (see utils/sourcefile_jobs.py): each POST queues a
+job and returns 202 with it, and clients poll the job status endpoint.
 """
 
 from flask import (
@@ -8,7 +10,9 @@ from flask import (
     current_app,
     jsonify,
     request,
+    url_for,
 )
+from peewee import DoesNotExist
 
 from config import (
     DEFAULT_LANGUAGE_LEVEL,
@@ -16,15 +20,13 @@ from config import (
     DEFAULT_MAX_NEW_WORDS_PER_PROCESSING,
 )
 from db_models import (
+    SourcefileJob,
     SourcefilePhrase,
     SourcefileWordform,
 )
+from utils.sourcefile_jobs import enqueue_sourcefile_job
 from utils.sourcefile_utils import (
     _get_sourcefile_entry,
-    ensure_text_extracted,
-    ensure_translation,
-    ensure_tricky_wordforms,
-    ensure_tricky_phrases,
     get_incomplete_lemmas_for_sourcefile,
 )
 from utils.types import LanguageLevel
@@ -41,6 +43,32 @@ sourcefile_processing_api_bp = Blueprint(
 )
 
 
+def job_to_response(
+    job: SourcefileJob,
+    target_language_code: str,
+    sourcedir_slug: str,
+    sourcefile_slug: str,
+) -> dict:
+    """Serialise a job for the API, with the URL to poll for its status."""
+    job_d = job.to_dict()
+    job_d["error"] = None
+    if job.last_error:
+        # Retrying jobs keep their last error too, so clients can show it
+        job_d["error"] = (
+            "Processing failed. Please try again later."
+            if current_app.config.get("IS_PRODUCTION", True)
+            else job.last_error
+        )
+    job_d["status_url"] = url_for(
+        "sourcefile_processing_api.sourcefile_job_status_api",
+        target_language_code=target_language_code,
+        sourcedir_slug=sourcedir_slug,
+        sourcefile_slug=sourcefile_slug,
+        job_id=job.id,
+    )
+    return job_d
+
+
 @sourcefile_processing_api_bp.route(
     "/<target_language_code>/<sourcedir_slug>/<sourcefile_slug>/extract_text",
     methods=["POST"],
@@ -49,26 +77,28 @@ sourcefile_processing_api_bp = Blueprint(
 def extract_text_api(
     target_language_code: str, sourcedir_slug: str, sourcefile_slug: str
 ):
-    """Extract text from a sourcefile (image or audio)."""
+    """Queue text extraction for a sourcefile (image or audio)."""
     try:
         # Get the sourcefile entry
         sourcefile_entry = _get_sourcefile_entry(
             target_language_code, sourcedir_slug, sourcefile_slug
         )
 
-        # Extract text
-        sourcefile_entry = ensure_text_extracted(sourcefile_entry)
+        job = enqueue_sourcefile_job(sourcefile_entry, "text_extraction")
 
         return jsonify(
             {
                 "success": True,
                 "has_text": bool(sourcefile_entry.text_target),
+                "job": job_to_response(
+                    job, target_language_code, sourcedir_slug, sourcefile_slug
+                ),
             }
-        )
+        ), 202
 
     except Exception as e:
-        current_app.logger.error(f"Error extracting text: {str(e)}")
-        return jsonify({"success": False, "error": safe_error_message(e, "extract text")}), 500
+        current_app.logger.error(f"Error queueing text extraction: {str(e)}")
+        return jsonify({"success": False, "error": safe_error_message(e, "queue text extraction")}), 500
 
 
 @sourcefile_processing_api_bp.route(
@@ -77,7 +107,7 @@ def extract_text_api(
 )
 @api_auth_required
 def translate_api(target_language_code: str, sourcedir_slug: str, sourcefile_slug: str):
-    """Translate the text of a sourcefile."""
+    """Queue translation of the text of a sourcefile."""
     try:
         # Get the sourcefile entry
         sourcefile_entry = _get_sourcefile_entry(
@@ -88,19 +118,21 @@ def translate_api(target_language_code: str, sourcedir_slug: str, sourcefile_slu
         if not sourcefile_entry.text_target:
             return jsonify({"success": False, "error": "No text to translate"}), 400
 
-        # Translate the text
-        sourcefile_entry = ensure_translation(sourcefile_entry)
+        job = enqueue_sourcefile_job(sourcefile_entry, "translation")
 
         return jsonify(
             {
                 "success": True,
                 "has_translation": bool(sourcefile_entry.text_english),
+                "job": job_to_response(
+                    job, target_language_code, sourcedir_slug, sourcefile_slug
+                ),
             }
-        )
+        ), 202
 
     except Exception as e:
-        current_app.logger.error(f"Error translating text: {str(e)}")
-        return jsonify({"success": False, "error": safe_error_message(e, "translate text")}), 500
+        current_app.logger.error(f"Error queueing translation: {str(e)}")
+        return jsonify({"success": False, "error": safe_error_message(e, "queue translation")}), 500
 
 
 @sourcefile_processing_api_bp.route(
@@ -111,7 +143,7 @@ def translate_api(target_language_code: str, sourcedir_slug: str, sourcefile_slu
 def process_wordforms_api(
     target_language_code: str, sourcedir_slug: str, sourcefile_slug: str
 ):
-    """Process wordforms for a sourcefile."""
+    """Queue wordform extraction for a sourcefile."""
     try:
         # Get the sourcefile entry
         sourcefile_entry = _get_sourcefile_entry(
@@ -141,34 +173,25 @@ def process_wordforms_api(
                 "error": f"Invalid language level: {language_level}. Must be one of: {', '.join(valid_levels)}"
             }), 400
 
-        # Process wordforms
-        sourcefile_entry, _ = ensure_tricky_wordforms(
-            sourcefile_entry,
-            language_level=language_level,  # type: ignore
-            max_new_words=max_new_words,
-        )
-
-        # Count the wordforms for response
-        wordforms_count = (
-            SourcefileWordform.select()
-            .where(SourcefileWordform.sourcefile == sourcefile_entry)
-            .count()
-        )
+        params = {
+            "max_new_words": max_new_words,
+            "language_level": language_level,
+        }
+        job = enqueue_sourcefile_job(sourcefile_entry, "wordforms", params)
 
         return jsonify(
             {
                 "success": True,
-                "params": {
-                    "max_new_words": max_new_words,
-                    "language_level": language_level,
-                },
-                "wordforms_count": wordforms_count,
+                "params": params,
+                "job": job_to_response(
+                    job, target_language_code, sourcedir_slug, sourcefile_slug
+                ),
             }
-        )
+        ), 202
 
     except Exception as e:
-        current_app.logger.error(f"Error processing wordforms: {str(e)}")
-        return jsonify({"success": False, "error": safe_error_message(e, "process wordforms")}), 500
+        current_app.logger.error(f"Error queueing wordforms: {str(e)}")
+        return jsonify({"success": False, "error": safe_error_message(e, "queue wordforms")}), 500
 
 
 @sourcefile_processing_api_bp.route(
@@ -179,7 +202,7 @@ def process_wordforms_api(
 def process_phrases_api(
     target_language_code: str, sourcedir_slug: str, sourcefile_slug: str
 ):
-    """Process phrases for a sourcefile."""
+    """Queue phrase extraction for a sourcefile."""
     try:
         # Get the sourcefile entry
         sourcefile_entry = _get_sourcefile_entry(
@@ -209,34 +232,25 @@ def process_phrases_api(
                 "error": f"Invalid language level: {language_level}. Must be one of: {', '.join(valid_levels)}"
             }), 400
 
-        # Process phrases
-        sourcefile_entry, _ = ensure_tricky_phrases(
-            sourcefile_entry,
-            language_level=language_level,  # type: ignore
-            max_new_phrases=max_new_phrases,
-        )
-
-        # Count the phrases for response
-        phrases_count = (
-            SourcefilePhrase.select()
-            .where(SourcefilePhrase.sourcefile == sourcefile_entry)
-            .count()
-        )
+        params = {
+            "max_new_phrases": max_new_phrases,
+            "language_level": language_level,
+        }
+        job = enqueue_sourcefile_job(sourcefile_entry, "phrases", params)
 
         return jsonify(
             {
                 "success": True,
-                "params": {
-                    "max_new_phrases": max_new_phrases,
-                    "language_level": language_level,
-                },
-                "phrases_count": phrases_count,
+                "params": params,
+                "job": job_to_response(
+                    job, target_language_code, sourcedir_slug, sourcefile_slug
+                ),
             }
-        )
+        ), 202
 
     except Exception as e:
-        current_app.logger.error(f"Error processing phrases: {str(e)}")
-        return jsonify({"success": False, "error": safe_error_message(e, "process phrases")}), 500
+        current_app.logger.error(f"Error queueing phrases: {str(e)}")
+        return jsonify({"success": False, "error": safe_error_message(e, "queue phrases")}), 500
 
 
 @sourcefile_processing_api_bp.route(
@@ -296,3 +310,36 @@ def sourcefile_status_api(
         )
         # Return 500 with the error message (as before)
         return jsonify({"success": False, "error": safe_error_message(e, "get sourcefile status")}), 500
+
+
+@sourcefile_processing_api_bp.route(
+    "/<target_language_code>/<sourcedir_slug>/<sourcefile_slug>/jobs/<int:job_id>",
+    methods=["GET"],
+)
+def sourcefile_job_status_api(
+    target_language_code: str, sourcedir_slug: str, sourcefile_slug: str, job_id: int
+):
+    """Get the status of a queued processing job for a sourcefile.
+
+    `status` is one of queued, running, succeeded or failed. A queued job with
+    an `error` is waiting to be retried.
+    """
+    try:
+        sourcefile_entry = _get_sourcefile_entry(
+            target_language_code, sourcedir_slug, sourcefile_slug
+        )
+        job = SourcefileJob.get(
+            (SourcefileJob.id == job_id)
+            & (SourcefileJob.sourcefile == sourcefile_entry)
+        )
+    except DoesNotExist:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    return jsonify(
+        {
+            "success": True,
+            "job": job_to_response(
+                job, target_language_code, sourcedir_slug, sourcefile_slug
+            ),
+        }
+    )
@@ -549,18 +549,14 @@ def play_sourcefile_audio_vw(
             target_language_code, sourcedir_slug, sourcefile_slug
         )
 
-        # Create a temporary file to store the content
+        # Streamed straight from the blob store
         audio_filename = Path(str(sourcefile_entry.filename)).with_suffix(".mp3").name
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-            # Write the audio content to the temporary file
-            if sourcefile_entry.audio_data is None:
-                abort(404, description="Audio content not found")
-            temp_file.write(bytes(sourcefile_entry.audio_data))
-            temp_file.flush()
-
-            return send_file(
-                temp_file.name, mimetype="audio/mpeg", download_name=audio_filename
-            )
+        audio_file = sourcefile_entry.open_audio()
+        if audio_file is None:
+            abort(404, description="Audio content not found")
+        return send_file(
+            audio_file, mimetype="audio/mpeg", download_name=audio_filename
+        )
     except DoesNotExist:
         abort(404, description="Audio file not found")
 
@@ -1,6 +1,8 @@
 from datetime import datetime
+import hmac
 import logging
 import json
+import os
 from flask import (
     Blueprint,
     jsonify,
@@ -8,7 +10,10 @@ from flask import (
     render_template,
 )
 
+from config import SOURCEFILE_JOB_CRON_SECONDS
 from utils.db_connection import get_db
+from utils.llm_cache import get_llm_cache_stats
+from utils.sourcefile_jobs import default_worker_id, run_worker
 
 # Create blueprint for system views with the /sys prefix
 system_views_bp = Blueprint("system_views", __name__, url_prefix="/sys")
@@ -17,6 +22,29 @@ system_views_bp = Blueprint("system_views", __name__, url_prefix="/sys")
 logger = logging.getLogger(__name__)
 
 
+@system_views_bp.route("/cron/process-sourcefile-jobs")
+def process_sourcefile_jobs_cron_vw():
+    """Drain the sourcefile job queue, for Vercel Cron (see vercel.json).
+
+    Vercel has no long-running worker process, so a cron request runs queued
+    jobs for up to SOURCEFILE_JOB_CRON_SECONDS. Vercel sends env CRON_SECRET
+    as a bearer token; without it set, the endpoint is disabled.
+    """
+    cron_secret = os.getenv("CRON_SECRET", "").strip()
+    if not cron_secret:
+        return jsonify({"error": "CRON_SECRET is not configured"}), 404
+    auth_header = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(auth_header, f"Bearer {cron_secret}"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    jobs_run = run_worker(
+        worker_id=f"cron:{default_worker_id()}",
+        once=True,
+        max_seconds=SOURCEFILE_JOB_CRON_SECONDS,
+    )
+    return jsonify({"jobs_run": jobs_run})
+
+
 @system_views_bp.route("/health-check")
 def health_check_vw():
     """Health check endpoint that verifies app and database functionality."""
@@ -28,6 +56,7 @@ def health_check_vw():
         # Get application metrics
         app_metrics = {
             "timestamp": datetime.now().isoformat(),
+            "llm_cache": get_llm_cache_stats(),
         }
 
         # Determine overall status based on database connectivity
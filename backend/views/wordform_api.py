@@ -18,7 +18,10 @@ from utils.lang_utils import get_language_name
 from utils.auth_utils import api_auth_optional, api_auth_required
 
 # Import exception
-from utils.exceptions import AuthenticationRequiredForGenerationError
+from utils.exceptions import (
+    AuthenticationRequiredForGenerationError,
+    SingleFlightTimeout,
+)
 from utils.error_utils import safe_error_message
 
 # Create a blueprint with standardized prefix
@@ -150,6 +153,15 @@ def get_wordform_metadata_api(target_language_code: str, wordform: str):
             "wordform": decoded_wordform,  # Include the original wordform searched
         }
         return jsonify(error_data), 401
+    except SingleFlightTimeout:
+        error_data = {
+            "error": "Generation in progress",
+            "description": "This wordform is still being generated, please retry shortly",
+            "target_language_code": target_language_code,
+            "target_language_name": get_language_name(target_language_code),
+            "wordform": decoded_wordform,
+        }
+        return jsonify(error_data), 503
     except Exception as e:
         logger.exception(
             f"[Flask API] Unhandled exception for '{decoded_wordform}': {e}"
@@ -1,6 +1,7 @@
 import PQueue from 'p-queue';
-import { writable } from 'svelte/store';
+import { get, writable } from 'svelte/store';
 import { getApiUrl } from './api';
+import { API_BASE_URL } from './config';
 import { RouteName } from './generated/routes';
 import type { SupabaseClient } from '@supabase/supabase-js';
 
@@ -35,6 +36,14 @@ interface SourcefileStatus {
   incomplete_lemmas_count: number;
 }
 
+// A background job queued by a processing endpoint (202 response)
+interface SourcefileJob {
+  id: number;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  error: string | null;
+  status_url: string;
+}
+
 // Monotonically increasing run ID to prevent stale updates from old runs
 let nextRunId = 1;
 
@@ -61,6 +70,9 @@ export const processingState = writable({
 // Default timeout for API requests (in ms)
 const DEFAULT_REQUEST_TIMEOUT = 60000; // 60 seconds for most steps
 const EXTRACTION_REQUEST_TIMEOUT = 120000; // 120 seconds for text extraction (can be slow)
+// Steps run in a backend worker; poll their job until it finishes
+const JOB_POLL_INTERVAL = 2000;
+const JOB_MAX_WAIT = 15 * 60 * 1000; // allows for retries with backoff
 
 export class SourcefileProcessingQueue {
   private queue: PQueue;
@@ -147,6 +159,32 @@ export class SourcefileProcessingQueue {
     return updated;
   }
 
+  // Poll a queued job until it succeeds (or throw if it fails or the run is superseded)
+  private async waitForJob(job: SourcefileJob, headers: HeadersInit, runId: number): Promise<void> {
+    const startedAt = Date.now();
+    while (job.status !== 'succeeded') {
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Processing failed');
+      }
+      if (Date.now() - startedAt > JOB_MAX_WAIT) {
+        throw new Error('Processing is taking longer than expected. Please check back later.');
+      }
+      await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+      if (get(processingState).runId !== runId) {
+        throw new Error('Processing was superseded by a newer run');
+      }
+      const response = await this.fetchWithTimeout(
+        `${API_BASE_URL}${job.status_url}`,
+        { method: 'GET', headers, cache: 'no-cache' },
+        DEFAULT_REQUEST_TIMEOUT
+      );
+      if (!response.ok) {
+        throw new Error(`Failed to check job status (HTTP ${response.status})`);
+      }
+      job = (await response.json()).job as SourcefileJob;
+    }
+  }
+
   // Fetch the current status of the sourcefile
   private async fetchSourcefileStatus(): Promise<SourcefileStatus | null> {
     try {
@@ -363,6 +401,9 @@ export class SourcefileProcessingQueue {
       } else {
         const responseData = await response.json();
         if (import.meta.env.DEV) console.log(`${step.type} response data:`, responseData);
+        if (response.status === 202 && responseData.job) {
+          await this.waitForJob(responseData.job as SourcefileJob, headers, runId);
+        }
         this.updateStateIfCurrent(runId, state => ({ ...state, progress: state.progress + 1 }));
         return true; // Step succeeded
       }